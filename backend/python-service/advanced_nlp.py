@@ -19,9 +19,13 @@ from transformers import (
 import numpy as np
 
 from config.realtime_config import realtime_config
+from tracing import mark_stage
 
 logger = logging.getLogger(__name__)
 
+# Optional stages that can be shed under load, in the order they are dropped
+SHEDDABLE_STAGES = ('summarization', 'ner', 'government_classifier')
+
 class AdvancedNLPProcessor:
     """Advanced NLP processor using Hugging Face transformers"""
 
@@ -93,8 +97,8 @@ class AdvancedNLPProcessor:
             # Fallback to keyword-based classification
             self.models['government_classifier'] = None
 
-    async def process_batch(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Process a batch of articles through the NLP pipeline"""
+    async def process_batch(self, articles: List[Dict[str, Any]], skip_stages: Tuple[str, ...] = ()) -> List[Dict[str, Any]]:
+        """Process a batch of articles through the NLP pipeline, optionally skipping sheddable stages"""
         try:
             processed_articles = []
 
@@ -103,7 +107,7 @@ class AdvancedNLPProcessor:
 
             for i in range(0, len(articles), batch_size):
                 batch = articles[i:i + batch_size]
-                processed_batch = await self._process_batch_async(batch)
+                processed_batch = await self._process_batch_async(batch, skip_stages)
                 processed_articles.extend(processed_batch)
 
             return processed_articles
@@ -112,14 +116,14 @@ class AdvancedNLPProcessor:
             logger.error(f"Error processing batch: {e}")
             return articles  # Return original articles if processing fails
 
-    async def _process_batch_async(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    async def _process_batch_async(self, batch: List[Dict[str, Any]], skip_stages: Tuple[str, ...] = ()) -> List[Dict[str, Any]]:
         """Process a batch asynchronously"""
         # Run CPU-intensive tasks in thread pool
         loop = asyncio.get_event_loop()
 
         tasks = []
         for article in batch:
-            tasks.append(loop.run_in_executor(None, self._process_single_article, article))
+            tasks.append(loop.run_in_executor(None, self._process_single_article, article, skip_stages))
 
         results = await asyncio.gather(*tasks, return_exceptions=True)
 
@@ -134,8 +138,9 @@ class AdvancedNLPProcessor:
 
         return processed_batch
 
-    def _process_single_article(self, article: Dict[str, Any]) -> Dict[str, Any]:
+    def _process_single_article(self, article: Dict[str, Any], skip_stages: Tuple[str, ...] = ()) -> Dict[str, Any]:
         """Process a single article through all NLP steps"""
+        mark_stage(article, 'nlp_started')
         try:
             text = article.get('content', '') or article.get('title', '')
             if not text:
@@ -144,14 +149,20 @@ class AdvancedNLPProcessor:
             # 1. Sentiment Analysis
             sentiment_result = self._analyze_sentiment(text)
 
-            # 2. Summarization
-            summary = self._generate_summary(text)
+            # 2. Summarization (shed first under load)
+            if 'summarization' in skip_stages:
+                summary = text[:300] + "..." if len(text) > 300 else text
+            else:
+                summary = self._generate_summary(text)
 
             # 3. Named Entity Recognition
-            entities = self._extract_entities(text)
+            entities = [] if 'ner' in skip_stages else self._extract_entities(text)
 
             # 4. Government Classification
-            is_government, gov_confidence = self._classify_government_related(text)
+            if 'government_classifier' in skip_stages:
+                is_government, gov_confidence = self._keyword_based_government_classification(text)
+            else:
+                is_government, gov_confidence = self._classify_government_related(text)
 
             # 5. Keyword Extraction (simplified)
             keywords = self._extract_keywords(text)
@@ -164,10 +175,12 @@ class AdvancedNLPProcessor:
                 'is_government_related': is_government,
                 'government_confidence': gov_confidence,
                 'keywords': keywords,
+                'skipped_stages': [stage for stage in SHEDDABLE_STAGES if stage in skip_stages],
                 'ai_processed': True,
                 'ai_confidence_score': min(sentiment_result.get('confidence', 0),
                                          gov_confidence) if gov_confidence else sentiment_result.get('confidence', 0)
             })
+            mark_stage(article, 'nlp_completed')
 
             return article
 
@@ -175,6 +188,27 @@ class AdvancedNLPProcessor:
             logger.error(f"Error processing single article: {e}")
             return article
 
+    def fallback_enrichment(self, article: Dict[str, Any]) -> Dict[str, Any]:
+        """Model-free enrichment for articles that ran out of processing time"""
+        text = article.get('content', '') or article.get('title', '')
+        is_government, gov_confidence = self._keyword_based_government_classification(text)
+        article.update({
+            'sentiment': {
+                'sentiment': 'neutral',
+                'confidence': 0.5,
+                'scores': {'positive': 0.33, 'neutral': 0.34, 'negative': 0.33}
+            },
+            'summary': text[:300] + "..." if len(text) > 300 else text,
+            'entities': [],
+            'is_government_related': is_government,
+            'government_confidence': gov_confidence,
+            'keywords': self._extract_keywords(text),
+            'skipped_stages': ['sentiment'] + list(SHEDDABLE_STAGES),
+            'ai_processed': True,
+            'ai_confidence_score': 0.0
+        })
+        return article
+
     def _analyze_sentiment(self, text: str) -> Dict[str, Any]:
         """Analyze sentiment using RoBERTa model"""
         try:
@@ -379,9 +413,9 @@ class AdvancedNLPProcessor:
 # Global instance
 nlp_processor = AdvancedNLPProcessor()
 
-async def process_articles_batch(articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+async def process_articles_batch(articles: List[Dict[str, Any]], skip_stages: Tuple[str, ...] = ()) -> List[Dict[str, Any]]:
     """Convenience function to process a batch of articles"""
-    return await nlp_processor.process_batch(articles)
+    return await nlp_processor.process_batch(articles, skip_stages)
 
 if __name__ == "__main__":
     # Test the NLP processor
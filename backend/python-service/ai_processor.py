@@ -11,7 +11,7 @@ from typing import Dict, List, Tuple, Optional
 from datetime import datetime
 
 from models.database_models import Article
-from models import SentimentLabel, Alert
+from models import SentimentLabel, Alert, NewsArticle
 import sys
 import os
 sys.path.append(os.path.dirname(__file__))
@@ -72,50 +72,77 @@ class AIProcessor:
         alerts = []
 
         try:
-            # Detect language if not set or verify existing
-            article.language = self._detect_language(article.content, article.language)
+            alerts = self._analyze(article)
+        except Exception as e:
+            logger.error(f"Error processing article {article.id}: {str(e)}")
 
-            # Set region based on language if not set
-            if not article.region and article.language in LANGUAGE_REGION_MAP:
-                article.region = LANGUAGE_REGION_MAP[article.language]
+        return article, alerts
 
-            # Translate content if needed (placeholder for now)
-            if article.language != 'en':
-                article.translated_content = self._translate_content(article.content, article.language)
+    def _analyze(self, article: Article) -> List[Alert]:
+        """Run the analysis steps on an article in place and return its alerts"""
+        # Detect language if not set or verify existing
+        article.language = self._detect_language(article.content, article.language)
 
-            # Use translated content for analysis if available
-            analysis_text = article.translated_content or article.content
+        # Set region based on language if not set
+        if not article.region and article.language in LANGUAGE_REGION_MAP:
+            article.region = LANGUAGE_REGION_MAP[article.language]
 
-            # Government filtering and classification
-            self._classify_government_content(article, analysis_text)
+        # Translate content if needed (placeholder for now)
+        if article.language != 'en':
+            article.translated_content = self._translate_content(article.content, article.language)
 
-            # Sentiment analysis
-            sentiment_result = self._analyze_sentiment(analysis_text)
-            article.sentiment = {
-                'sentiment': sentiment_result['label'].value.lower(),
-                'score': sentiment_result['score'],
-                'emotions': {}
-            }
+        # Use translated content for analysis if available
+        analysis_text = article.translated_content or article.content
 
-            # Extract keywords and entities
-            article.keywords = self._extract_keywords(analysis_text)
-            article.entities = self._extract_entities(analysis_text)
+        # Government filtering and classification
+        self._classify_government_content(article, analysis_text)
 
-            # Categorize article
-            article.category = self._categorize_article(analysis_text, article.category)
+        # Sentiment analysis
+        sentiment_result = self._analyze_sentiment(analysis_text)
+        article.sentiment = {
+            'sentiment': sentiment_result['label'].value.lower(),
+            'score': sentiment_result['score'],
+            'emotions': {}
+        }
 
-            # Generate summary
-            article.summary = self._generate_summary(analysis_text)
+        # Extract keywords and entities
+        article.keywords = self._extract_keywords(analysis_text)
+        article.entities = self._extract_entities(analysis_text)
 
-            # Check for alerts
-            alerts = self._generate_alerts(article)
+        # Categorize article
+        article.category = self._categorize_article(analysis_text, article.category)
 
-            logger.info(f"Processed article: {article.title[:50]}... | Sentiment: {article.sentiment['sentiment']} ({article.sentiment['score']:.3f}) | Government: {article.is_government_related}")
+        # Generate summary
+        article.summary = self._generate_summary(analysis_text)
 
-        except Exception as e:
-            logger.error(f"Error processing article {article.id}: {str(e)}")
+        logger.info(f"Processed article: {article.title[:50]}... | Sentiment: {article.sentiment['sentiment']} ({article.sentiment['score']:.3f}) | Government: {article.is_government_related}")
 
-        return article, alerts
+        # Check for alerts
+        return self._generate_alerts(article)
+
+    def process_articles_batch(self, articles: List[NewsArticle], db) -> Dict:
+        """Analyze collected articles, then store results, job statuses and alerts in one write to db"""
+        completed, failed, alerts = [], [], []
+        for article in articles:
+            try:
+                article_alerts = self._analyze(article)
+            except Exception as e:
+                logger.error(f"Error processing article {article.id}: {str(e)}")
+                failed.append((article.id, str(e)))
+                continue
+            # news_articles keeps the sentiment as a score and a label
+            article.sentiment_score = article.sentiment['score']
+            article.sentiment_label = SentimentLabel(article.sentiment['sentiment'])
+            completed.append(article)
+            alerts.extend(article_alerts)
+
+        db.store_analysis_results(completed, failed, alerts)
+        return {
+            'articles_processed': len(completed),
+            'articles_failed': len(failed),
+            'government_articles': sum(1 for article in completed if article.is_government_related),
+            'alerts_generated': len(alerts)
+        }
     
     def _detect_language(self, text: str, current_lang: str = None) -> str:
         """Detect language of the text"""
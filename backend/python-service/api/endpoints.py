@@ -1,28 +1,49 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import distinct, func
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import sys
 import os
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'models'))
-from models.database_models import *
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+# The top-level copy: importing the models package first would shadow models.py and fail
+from database_models import *
 import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'config'))
 import settings
 get_settings = settings.get_settings
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from rollups import GRANULARITIES, article_values, period_start, update_rollups
 
 router = APIRouter()
 
-# Dependency to get DB session
+# Process-wide engine and session factory, created once at startup
+_db_manager: Optional[DatabaseManager] = None
+
+def init_db() -> DatabaseManager:
+    global _db_manager
+    if _db_manager is None:
+        settings = get_settings()
+        _db_manager = DatabaseManager(
+            settings.database_url,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle
+        )
+    return _db_manager
+
+# Dependency to get DB session: one session per request, returned to the pool afterwards
 def get_db():
-    settings = get_settings()
-    db_manager = DatabaseManager(settings.database_url)
-    db = db_manager.get_session()
+    db = init_db().get_session()
     try:
         yield db
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
 
@@ -229,6 +250,8 @@ class ArticleCreate(BaseModel):
 def create_article(article: ArticleCreate, db: Session = Depends(get_db)):
     db_article = Article(**article.dict(), collected_date=datetime.now())
     db.add(db_article)
+    db.flush()
+    update_rollups(db.connection(), [], [article_values(db_article)])
     db.commit()
     db.refresh(db_article)
     return db_article
@@ -246,37 +269,64 @@ def read_government_articles(skip: int = 0, limit: int = 100, department: str =
         from sqlalchemy import text
         query = query.filter(text(f"JSON_EXTRACT(departments, '$[*].department') LIKE '%{department}%'"))
 
-    articles = query.offset(skip).limit(limit).all()
+    # Newest first, served by the (is_government_related, publish_date) index
+    articles = query.order_by(Article.publish_date.desc()).offset(skip).limit(limit).all()
     return articles
 
+# --- Dashboard endpoints: served from the article_rollups table maintained on every article write ---
+
+SENTIMENT_LABELS = ('positive', 'negative', 'neutral')
+
+def _rollup_filters(dimension: str, government_only: bool = False, since: datetime = None, granularity: str = 'day'):
+    filters = [ArticleRollup.granularity == granularity, ArticleRollup.dimension == dimension]
+    if since is not None:
+        filters.append(ArticleRollup.period_start >= since)
+    if government_only:
+        filters.append(ArticleRollup.is_government_related == True)
+    return filters
+
+def _sentiment_sums():
+    return [func.coalesce(func.sum(getattr(ArticleRollup, f"{label}_count")), 0) for label in SENTIMENT_LABELS]
+
+def _totals(db: Session, government_only: bool = False):
+    """Article count, distinct sources, distinct languages and sentiment distribution"""
+    article_count, *sentiment = db.query(
+        func.coalesce(func.sum(ArticleRollup.article_count), 0), *_sentiment_sums()
+    ).filter(*_rollup_filters('total', government_only)).one()
+    distinct_counts = [
+        db.query(func.count(distinct(ArticleRollup.value))).filter(
+            *_rollup_filters(dimension, government_only), ArticleRollup.article_count > 0
+        ).scalar()
+        for dimension in ('source', 'language')
+    ]
+    return article_count, distinct_counts[0], distinct_counts[1], dict(zip(SENTIMENT_LABELS, sentiment))
+
+def _value_counts(db: Session, dimension: str, government_only: bool = False, since: datetime = None,
+                  limit: int = None):
+    """(value, article count) per value of a dimension, most frequent first"""
+    total = func.sum(ArticleRollup.article_count).label('total')
+    query = db.query(ArticleRollup.value, total).filter(*_rollup_filters(dimension, government_only, since)).group_by(
+        ArticleRollup.value
+    ).having(total > 0).order_by(total.desc(), ArticleRollup.value)
+    return query.limit(limit).all() if limit else query.all()
+
 @router.get("/government/departments/")
 def get_department_analytics(db: Session = Depends(get_db)):
     """
     Get analytics for government departments.
     """
-    # This is a simplified implementation - in production you'd want more sophisticated aggregation
-    from sqlalchemy import func, text
-
-    # Get department counts
-    department_counts = {}
-    articles = db.query(Article).filter(Article.is_government_related == True).all()
-
-    for article in articles:
-        if article.departments:
-            for dept_info in article.departments:
-                dept = dept_info.get('department', 'unknown')
-                if dept not in department_counts:
-                    department_counts[dept] = {'count': 0, 'sentiment': {'positive': 0, 'negative': 0, 'neutral': 0}}
-                department_counts[dept]['count'] += 1
-
-                # Add sentiment info
-                if article.sentiment:
-                    sentiment = article.sentiment.get('sentiment', 'neutral')
-                    department_counts[dept]['sentiment'][sentiment] += 1
+    rows = db.query(
+        ArticleRollup.value, func.sum(ArticleRollup.article_count), *_sentiment_sums()
+    ).filter(*_rollup_filters('department', government_only=True)).group_by(ArticleRollup.value)
 
+    department_counts = {
+        dept: {'count': count, 'sentiment': dict(zip(SENTIMENT_LABELS, sentiment))}
+        for dept, count, *sentiment in rows if count > 0
+    }
+    total_government = _totals(db, government_only=True)[0]
     return {
         'departments': department_counts,
-        'total_government_articles': len(articles)
+        'total_government_articles': total_government
     }
 
 @router.get("/government/dashboard/stats/")
@@ -284,20 +334,12 @@ def get_government_dashboard_stats(db: Session = Depends(get_db)):
     """
     Get dashboard statistics for government news.
     """
-    government_articles = db.query(Article).filter(Article.is_government_related == True).all()
-
-    total_government = len(government_articles)
-    sentiment_distribution = {'positive': 0, 'negative': 0, 'neutral': 0}
-
-    for article in government_articles:
-        if article.sentiment:
-            sentiment = article.sentiment.get('sentiment', 'neutral')
-            sentiment_distribution[sentiment] += 1
+    total_government, total_sources, total_languages, sentiment_distribution = _totals(db, government_only=True)
 
     return {
         'total_articles': total_government,
-        'total_sources': len(set(a.source for a in government_articles)),
-        'total_languages': len(set(a.language for a in government_articles)),
+        'total_sources': total_sources,
+        'total_languages': total_languages,
         'sentiment_distribution': sentiment_distribution,
         'regional_coverage': [],  # Placeholder for regional data
         'trending_topics': [],  # Placeholder for trending topics
@@ -309,37 +351,15 @@ def get_dashboard_stats(db: Session = Depends(get_db)):
     """
     Get general dashboard statistics for all news.
     """
-    all_articles = db.query(Article).all()
-
-    total_articles = len(all_articles)
-    total_sources = len(set(a.source for a in all_articles))
-    total_languages = len(set(a.language for a in all_articles))
-
-    sentiment_distribution = {'positive': 0, 'negative': 0, 'neutral': 0}
-    regional_coverage = {}
-    trending_topics = []
-    recent_alerts = []
+    total_articles, total_sources, total_languages, sentiment_distribution = _totals(db)
+    regional_coverage_list = [{'region': region, 'count': count} for region, count in _value_counts(db, 'region')]
 
-    for article in all_articles:
-        # Sentiment distribution
-        if article.sentiment:
-            sentiment = article.sentiment.get('sentiment', 'neutral')
-            sentiment_distribution[sentiment] += 1
-
-        # Regional coverage
-        region = article.region or 'Unknown'
-        if region not in regional_coverage:
-            regional_coverage[region] = 0
-        regional_coverage[region] += 1
-
-        # Trending topics (simplified - just collect keywords)
-        if article.keywords:
-            trending_topics.extend(article.keywords)
-
-    # Convert regional_coverage to list format
-    regional_coverage_list = [{'region': region, 'count': count} for region, count in regional_coverage.items()]
+    # Trending topics: the most frequent keywords of the last few days
+    since = period_start(datetime.now(), 'day') - timedelta(days=get_settings().rollup_trending_days - 1)
+    trending_topics = [keyword for keyword, _ in _value_counts(db, 'keyword', since=since, limit=10)]
 
     # Get recent alerts
+    recent_alerts = []
     alerts = db.query(Alert).order_by(Alert.created_date.desc()).limit(5).all()
     for alert in alerts:
         recent_alerts.append({
@@ -349,10 +369,6 @@ def get_dashboard_stats(db: Session = Depends(get_db)):
             'severity': alert.severity
         })
 
-    # Limit trending topics to top 10 most common
-    from collections import Counter
-    trending_topics = [topic for topic, _ in Counter(trending_topics).most_common(10)]
-
     return {
         'total_articles': total_articles,
         'total_sources': total_sources,
@@ -362,3 +378,34 @@ def get_dashboard_stats(db: Session = Depends(get_db)):
         'trending_topics': trending_topics,
         'recent_alerts': recent_alerts
     }
+
+@router.get("/dashboard/timeseries/")
+def get_dashboard_timeseries(granularity: str = 'hour', periods: int = 24, dimension: str = 'total', value: str = '',
+                             government_only: bool = False, db: Session = Depends(get_db)):
+    """
+    Get article counts and sentiment per hour or day, optionally for one source, language, region, department or keyword.
+    """
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"granularity must be one of {', '.join(GRANULARITIES)}")
+    step = timedelta(hours=1) if granularity == 'hour' else timedelta(days=1)
+    since = period_start(datetime.now(), granularity) - step * (max(periods, 1) - 1)
+
+    rows = db.query(
+        ArticleRollup.period_start,
+        func.sum(ArticleRollup.article_count),
+        *_sentiment_sums(),
+        func.sum(ArticleRollup.sentiment_score_sum),
+        func.sum(ArticleRollup.sentiment_score_count)
+    ).filter(
+        *_rollup_filters(dimension, government_only, since, granularity), ArticleRollup.value == value
+    ).group_by(ArticleRollup.period_start).order_by(ArticleRollup.period_start)
+
+    return [
+        {
+            'period_start': start,
+            'article_count': count,
+            'sentiment_distribution': dict(zip(SENTIMENT_LABELS, (positive, negative, neutral))),
+            'avg_sentiment_score': round(score_sum / score_count, 4) if score_count else None
+        }
+        for start, count, positive, negative, neutral, score_sum, score_count in rows
+    ]
@@ -2,6 +2,7 @@
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import uvicorn
@@ -12,10 +13,14 @@ import os
 sys.path.append(os.path.dirname(__file__))
 sys.path.append(os.path.join(os.path.dirname(__file__), 'models'))
 from models.database_models import DatabaseManager, Article, Video, SocialMediaPost, Entity, Topic, SentimentAnalytic, GovernmentFeedback, Alert
+from database import DatabaseManager as NewsDatabase
 from rss_collector import RSSCollector
+from collectors.async_collectors import AsyncFeedCollector
 from ai_processor import AIProcessor
 from models import JobStatus
 from api.endpoints import router as api_router
+from migrations import migrate
+from rollups import backfill_if_empty
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -36,8 +41,11 @@ app.add_middleware(
 
 # Initialize services
 db_manager = DatabaseManager("sqlite:///../.wrangler/state/v3/d1/miniflare-D1DatabaseObject/0a63475064ba0fef38489ee0454cb2d789b28a906ef12161e40ea6ea13385173.sqlite")
+# Feed collection and job tracking use the sqlite helper with the news_articles/processing_jobs queries
+news_db = NewsDatabase()
 ai_processor = AIProcessor()
-rss_collector = RSSCollector(db_manager)
+rss_collector = RSSCollector(news_db)
+feed_collector = AsyncFeedCollector(rss_collector)
 
 class ProcessingResponse(BaseModel):
     success: bool
@@ -52,8 +60,10 @@ class JobStatusResponse(BaseModel):
 async def startup_event():
     """Initialize service on startup"""
     logger.info("Starting News Monitor API server...")
-    # Initialize database tables
+    # Initialize database tables and bring indexes up to date
     db_manager.create_all_tables()
+    migrate(db_manager.engine)
+    backfill_if_empty(db_manager.engine)
 
 @app.get("/")
 async def root():
@@ -64,8 +74,8 @@ async def root():
 async def collect_news(background_tasks: BackgroundTasks):
     """Trigger news collection from RSS sources"""
     try:
-        # Run collection in background
-        background_tasks.add_task(rss_collector.collect_news)
+        # Run collection in background; the async collector never blocks the event loop
+        background_tasks.add_task(feed_collector.fetch_all_sources)
 
         return ProcessingResponse(
             success=True,
@@ -96,9 +106,9 @@ async def process_articles(background_tasks: BackgroundTasks):
 async def run_cycle(background_tasks: BackgroundTasks):
     """Run a complete collection and processing cycle"""
     try:
-        # Run complete cycle in background
-        articles = rss_collector.collect_news()
-        result = ai_processor.process_articles_batch(articles)
+        # Sources are fetched concurrently; blocking model work runs in the threadpool
+        articles = await feed_collector.fetch_all_sources()
+        result = await run_in_threadpool(ai_processor.process_articles_batch, articles, news_db)
 
         return ProcessingResponse(
             success=True,
@@ -113,13 +123,11 @@ async def run_cycle(background_tasks: BackgroundTasks):
 async def get_job_status():
     """Get status of processing jobs"""
     try:
-        db = DatabaseManager()
-        
         # Get recent jobs
-        pending_jobs = db.get_pending_jobs()
+        pending_jobs = news_db.get_pending_jobs()
         
         # Get job statistics
-        job_stats = db.execute_query("""
+        job_stats = news_db.execute_query("""
             SELECT status, COUNT(*) as count 
             FROM processing_jobs 
             WHERE created_at >= datetime('now', '-24 hours')
@@ -144,8 +152,7 @@ async def get_job_status():
 async def get_rss_sources():
     """Get RSS sources"""
     try:
-        db = DatabaseManager()
-        sources = db.get_active_rss_sources()
+        sources = news_db.get_active_rss_sources()
         
         return {
             "success": True,
@@ -168,10 +175,8 @@ async def get_rss_sources():
 async def get_statistics():
     """Get processing statistics"""
     try:
-        db = DatabaseManager()
-        
         # Get article counts by language
-        lang_stats = db.execute_query("""
+        lang_stats = news_db.execute_query("""
             SELECT language, COUNT(*) as count 
             FROM news_articles 
             GROUP BY language 
@@ -179,7 +184,7 @@ async def get_statistics():
         """)
         
         # Get processing job stats
-        job_stats = db.execute_query("""
+        job_stats = news_db.execute_query("""
             SELECT status, COUNT(*) as count 
             FROM processing_jobs 
             WHERE created_at >= datetime('now', '-24 hours')
@@ -187,7 +192,7 @@ async def get_statistics():
         """)
         
         # Get recent activity
-        recent_articles = db.execute_query("""
+        recent_articles = news_db.execute_query("""
             SELECT COUNT(*) as count 
             FROM news_articles 
             WHERE created_at >= datetime('now', '-1 hour')
@@ -199,7 +204,7 @@ async def get_statistics():
                 "language_distribution": [{"language": row["language"], "count": row["count"]} for row in lang_stats],
                 "job_status_distribution": [{"status": row["status"], "count": row["count"]} for row in job_stats],
                 "recent_articles_count": recent_articles[0]["count"] if recent_articles else 0,
-                "timestamp": db_manager.execute_query("SELECT datetime('now') as now")[0]["now"]
+                "timestamp": news_db.execute_query("SELECT datetime('now') as now")[0]["now"]
             }
         }
     except Exception as e:
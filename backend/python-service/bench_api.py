@@ -0,0 +1,102 @@
+"""
+Load test the API's database access: a new engine per request vs the shared engine and session factory.
+Usage: python bench_api.py [--requests N] [--concurrency N] [--articles N] [--path PATH]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# The API reads its database from the environment; point it at a scratch database before importing it
+DATABASE_URL = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_api.db')}"
+os.environ['DATABASE_URL'] = DATABASE_URL
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from api.endpoints import router, get_db, init_db
+from database_models import Article
+
+def legacy_get_db():
+    """The per-request dependency this benchmark compares against: a fresh engine and pool for every request"""
+    engine = create_engine(DATABASE_URL)
+    db = sessionmaker(bind=engine)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def seed(articles: int):
+    db_manager = init_db()
+    db_manager.create_all_tables()
+    db = db_manager.get_session()
+    now = datetime.now()
+    db.add_all([
+        Article(
+            id=f"bench-{i}", title=f"Ministry announces scheme {i}", content='Policy update text. ' * 50,
+            source=f"Source {i % 25}", language='en', category='Politics', region='National',
+            url=f"https://example.gov.in/{i}", publish_date=now - timedelta(minutes=i),
+            sentiment={'sentiment': 'neutral', 'score': 0.0}, is_government_related=i % 3 == 0
+        )
+        for i in range(articles)
+    ])
+    db.commit()
+    db.close()
+
+async def load(app: FastAPI, path: str, requests: int, concurrency: int):
+    """Latencies of `requests` GETs issued by `concurrency` clients, and the wall time"""
+    latencies = []
+    remaining = iter(range(requests))
+    transport = httpx.ASGITransport(app=app)
+
+    async def client_loop(client):
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return sorted(latencies), elapsed
+
+def percentile(values, share: float) -> float:
+    return values[min(int(len(values) * share), len(values) - 1)]
+
+def run(name: str, dependency, args):
+    app = FastAPI()
+    app.include_router(router, prefix="/api/v1")
+    app.dependency_overrides[get_db] = dependency
+    # One warm-up pass so both variants start with imported modules and a populated OS cache
+    asyncio.run(load(app, args.path, args.concurrency, args.concurrency))
+    latencies, elapsed = asyncio.run(load(app, args.path, args.requests, args.concurrency))
+    print(f"{name:<8} {args.requests / elapsed:8.1f} req/s  p50 {percentile(latencies, 0.5) * 1000:7.2f} ms  "
+          f"p99 {percentile(latencies, 0.99) * 1000:7.2f} ms  {elapsed:6.2f}s wall")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--articles', type=int, default=1000, help='Rows seeded into the scratch database')
+    parser.add_argument('--path', default='/api/v1/articles/?limit=20')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    seed(args.articles)
+    print(f"{args.requests} requests to {args.path}, concurrency {args.concurrency}, {DATABASE_URL}")
+    run('legacy', legacy_get_db, args)
+    run('shared', get_db, args)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark the dashboard and department analytics endpoints as the articles table grows.
+Usage: python bench_dashboard.py [--sizes 10000,100000,1000000] [--legacy-max N] [--repeat N]
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+DATABASE_URL = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_dashboard.db')}"
+os.environ['DATABASE_URL'] = DATABASE_URL
+
+from sqlalchemy import insert
+
+from api.endpoints import init_db, get_dashboard_stats, get_government_dashboard_stats, get_department_analytics
+from migrations import migrate
+from database_models import Article
+from rollups import update_rollups
+
+SOURCES = [f"Source {n}" for n in range(40)]
+LANGUAGES = ['en', 'hi', 'ta', 'te', 'bn', 'mr', 'gu', 'kn']
+REGIONS = ['National', 'North', 'South', 'East', 'West', None]
+KEYWORDS = [f"keyword{n}" for n in range(300)]
+DEPARTMENTS = ['Ministry of Health', 'Ministry of Finance', 'Ministry of Education', 'Ministry of Defence', 'NITI Aayog']
+CONTENT = 'The ministry said the scheme would be rolled out across all districts this year. ' * 25
+
+def legacy_dashboard_stats(db):
+    """The original implementation: every article loaded and counted in Python"""
+    all_articles = db.query(Article).all()
+    sentiment_distribution = {'positive': 0, 'negative': 0, 'neutral': 0}
+    regional_coverage = Counter()
+    trending_topics = []
+    for article in all_articles:
+        if article.sentiment:
+            sentiment_distribution[article.sentiment.get('sentiment', 'neutral')] += 1
+        regional_coverage[article.region or 'Unknown'] += 1
+        if article.keywords:
+            trending_topics.extend(article.keywords)
+    return {
+        'total_articles': len(all_articles),
+        'total_sources': len(set(a.source for a in all_articles)),
+        'total_languages': len(set(a.language for a in all_articles)),
+        'sentiment_distribution': sentiment_distribution,
+        'regional_coverage': [{'region': region, 'count': count} for region, count in regional_coverage.items()],
+        'trending_topics': [topic for topic, _ in Counter(trending_topics).most_common(10)]
+    }
+
+def legacy_department_analytics(db):
+    articles = db.query(Article).filter(Article.is_government_related == True).all()
+    department_counts = {}
+    for article in articles:
+        for dept_info in article.departments or []:
+            dept = dept_info.get('department', 'unknown')
+            counts = department_counts.setdefault(dept, {'count': 0, 'sentiment': {'positive': 0, 'negative': 0, 'neutral': 0}})
+            counts['count'] += 1
+            if article.sentiment:
+                counts['sentiment'][article.sentiment.get('sentiment', 'neutral')] += 1
+    return {'departments': department_counts, 'total_government_articles': len(articles)}
+
+def seed(db_manager, start: int, end: int, rng: random.Random):
+    """Insert rows [start, end) in large Core batches, maintaining the rollups as the storage writer does"""
+    now = datetime.now()
+    with db_manager.engine.begin() as conn:
+        for batch_start in range(start, end, 5000):
+            rows = []
+            for i in range(batch_start, min(batch_start + 5000, end)):
+                government = rng.random() < 0.4
+                rows.append({
+                    'id': f"bench-{i}", 'title': f"Ministry announces scheme {i}", 'content': CONTENT,
+                    'source': rng.choice(SOURCES), 'language': rng.choice(LANGUAGES), 'region': rng.choice(REGIONS),
+                    'url': f"https://example.gov.in/{i}", 'publish_date': now - timedelta(minutes=i),
+                    'collected_date': now, 'confidence_score': 0.0,
+                    'sentiment': {'sentiment': rng.choice(('positive', 'negative', 'neutral')), 'score': rng.uniform(-1, 1)},
+                    'keywords': rng.sample(KEYWORDS, 5),
+                    'is_government_related': government,
+                    'departments': [{'department': rng.choice(DEPARTMENTS), 'confidence': 0.8}] if government else None
+                })
+            conn.execute(insert(Article.__table__), rows)
+            update_rollups(conn, [], rows)
+
+def timed(function, db, repeat: int):
+    """Best wall time over `repeat` calls and the JSON size of the response"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(db)
+        best = min(best, time.perf_counter() - started)
+        db.expire_all()
+    return best, len(json.dumps(result, default=str))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000,1000000', help='Comma-separated table sizes')
+    parser.add_argument('--legacy-max', type=int, default=100000, help='Largest size to run the legacy endpoints at')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    db_manager = init_db()
+    db_manager.create_all_tables()
+    migrate(db_manager.engine)
+    rng = random.Random(0)
+    endpoints = [
+        ('dashboard', get_dashboard_stats, legacy_dashboard_stats),
+        ('government', get_government_dashboard_stats, None),
+        ('departments', get_department_analytics, legacy_department_analytics),
+    ]
+
+    rows = 0
+    print(f"{'rows':>9}  {'endpoint':<12} {'rollups':>10} {'bytes':>7}  {'legacy':>10}")
+    for size in sorted(int(size) for size in args.sizes.split(',')):
+        seed(db_manager, rows, size, rng)
+        rows = size
+        db = db_manager.get_session()
+        for name, endpoint, legacy in endpoints:
+            elapsed, size_bytes = timed(endpoint, db, args.repeat)
+            line = f"{rows:>9}  {name:<12} {elapsed * 1000:8.1f}ms {size_bytes:>7}"
+            if legacy and rows <= args.legacy_max:
+                legacy_elapsed, _ = timed(legacy, db, 1)
+                line += f"  {legacy_elapsed * 1000:8.1f}ms"
+            print(line)
+        db.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark listing-page extraction: lxml engine vs the previous BeautifulSoup html.parser code.
+Usage: python bench_extraction.py [--fixtures DIR --source NAME] [--pages N] [--items N]
+"""
+
+import argparse
+import glob
+import os
+import random
+import sys
+import time
+from urllib.parse import urljoin
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bs4 import BeautifulSoup
+
+from config.realtime_config import realtime_config
+from html_extractor import extract_listing, LXML_AVAILABLE, CSSSELECT_AVAILABLE
+
+def legacy_extract_listing(html, base_url, selectors, limit=5):
+    """The extraction RealTimeCollector._scrape_website used before the lxml engine"""
+    soup = BeautifulSoup(html, 'html.parser')
+    items = []
+    for container in soup.select(selectors.get('article_container', 'article'))[:limit]:
+        title_elem = container.select_one(selectors.get('title', 'h1, h2, .title'))
+        link_elem = container.find('a', href=True)
+        date_elem = container.select_one(selectors.get('publish_date', 'time, .date'))
+        items.append({
+            'title': title_elem.get_text().strip() if title_elem else '',
+            'url': urljoin(base_url, link_elem['href']) if link_elem else '',
+            'date_text': (date_elem.get_text() or date_elem.get('datetime', '')) if date_elem else ''
+        })
+    return items
+
+def _class_of(selector):
+    """First simple class or tag in a selector list, for generating matching markup"""
+    first = selector.split(',')[0].strip()
+    if first.startswith('.'):
+        return 'div', first[1:]
+    return first, ''
+
+def synthetic_listing(source, items, seed):
+    """A listing page shaped like a real news homepage: scripts, ads and noise around the items"""
+    rng = random.Random(seed)
+    selectors = source['selectors']
+    container_tag, container_class = _class_of(selectors['article_container'])
+    title_tag, title_class = _class_of(selectors['title'])
+    date_tag, date_class = _class_of(selectors['publish_date'])
+
+    parts = ['<!DOCTYPE html><html><head><title>News</title>']
+    parts += [f'<script>var ad{i} = {{"slot": {rng.randint(0, 10**6)}}};</script>' for i in range(20)]
+    parts.append('</head><body><nav>' + ''.join(f'<a href="/section/{i}">Section {i}</a>' for i in range(40)) + '</nav>')
+    for i in range(items):
+        parts.append(
+            f'<{container_tag} class="{container_class}">'
+            f'<div class="ad-slot" data-token="{rng.getrandbits(64):x}"></div>'
+            f'<{title_tag} class="{title_class}"><a href="/news/story-{seed}-{i}.html">Story {i} headline {rng.random():.6f}</a></{title_tag}>'
+            f'<{date_tag} class="{date_class}">Updated {rng.randint(1, 59)} min ago</{date_tag}>'
+            f'<p>{"Lorem ipsum dolor sit amet. " * rng.randint(3, 10)}</p>'
+            f'</{container_tag}>'
+        )
+    parts.append('<footer>' + '<p>footer</p>' * 50 + '</footer></body></html>')
+    return ''.join(parts)
+
+def load_corpus(args):
+    """(html, source) pairs from a fixture directory or generated per configured source"""
+    if args.fixtures:
+        source = next(s for s in realtime_config.news_sources if s['name'] == args.source)
+        corpus = []
+        for path in sorted(glob.glob(os.path.join(args.fixtures, '*.html'))):
+            with open(path, encoding='utf-8', errors='replace') as f:
+                corpus.append((f.read(), source))
+        return corpus
+
+    scraped = [s for s in realtime_config.news_sources if s.get('selectors')]
+    return [
+        (synthetic_listing(source, args.items, seed), source)
+        for seed in range(args.pages)
+        for source in scraped
+    ]
+
+def run(label, func, corpus, limit):
+    started = time.perf_counter()
+    results = [func(html, source['url'], source['selectors'], limit) for html, source in corpus]
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {len(corpus) / elapsed:8.1f} pages/sec  ({elapsed:.2f}s for {len(corpus)} pages)")
+    return results, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--fixtures', help='Directory of saved listing pages (*.html)')
+    parser.add_argument('--source', help='Configured source whose selectors apply to the fixtures')
+    parser.add_argument('--pages', type=int, default=20, help='Synthetic pages per source')
+    parser.add_argument('--items', type=int, default=60, help='Items per synthetic page')
+    parser.add_argument('--limit', type=int, default=5, help='Items extracted per page')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args)
+    print(f"Corpus: {len(corpus)} pages, {sum(len(h) for h, _ in corpus) / 1024:.0f} KiB "
+          f"(lxml={'yes' if LXML_AVAILABLE else 'no'}, cssselect={'yes' if CSSSELECT_AVAILABLE else 'no'})")
+
+    legacy, legacy_time = run('BeautifulSoup html.parser', legacy_extract_listing, corpus, args.limit)
+    engine, engine_time = run('html_extractor', extract_listing, corpus, args.limit)
+
+    mismatches = sum(1 for a, b in zip(legacy, engine) if a != b)
+    print(f"Speedup: {legacy_time / engine_time:.1f}x, output mismatches: {mismatches}")
+
+if __name__ == '__main__':
+    main()
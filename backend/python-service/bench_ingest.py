@@ -0,0 +1,100 @@
+"""
+Benchmark feed ingestion: per-entry existence check and inserts vs the batched ingest path.
+Usage: python bench_ingest.py [--entries N] [--existing N] [--feeds N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import feedparser
+
+from database import DatabaseManager
+from models import RSSSource, ProcessingJob
+from rss_collector import RSSCollector
+
+SCHEMA = """
+CREATE TABLE news_articles (
+    id INTEGER PRIMARY KEY, title TEXT, content TEXT, source TEXT, source_url TEXT, language TEXT,
+    translated_content TEXT, author TEXT, publish_date TEXT, region TEXT, category TEXT,
+    sentiment_score REAL, sentiment_label TEXT, emotions TEXT, keywords TEXT, summary TEXT,
+    entities TEXT, is_government_related BOOLEAN, created_at TEXT, updated_at TEXT
+);
+CREATE TABLE processing_jobs (
+    id INTEGER PRIMARY KEY, job_type TEXT, status TEXT, article_id INTEGER, source_id INTEGER,
+    metadata TEXT, error_message TEXT, started_at TEXT, completed_at TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP, updated_at TEXT
+);
+"""
+
+def make_feed(feed_no: int, entries: int):
+    """Parsed feed entries with realistic titles and summaries"""
+    items = ''.join(
+        f"<item><title>Ministry announces scheme {feed_no}-{i}</title>"
+        f"<link>https://example.gov.in/{feed_no}/{i}</link>"
+        f"<pubDate>Mon, 19 Oct 2026 10:{i % 60:02d}:00 +0530</pubDate>"
+        f"<description>&lt;p&gt;{'Policy update text. ' * 20}&lt;/p&gt;</description></item>"
+        for i in range(entries)
+    )
+    return feedparser.parse(f"<rss><channel>{items}</channel></rss>").entries
+
+def make_db(existing_per_feed: int, feeds: int) -> DatabaseManager:
+    path = os.path.join(tempfile.mkdtemp(), 'bench.sqlite')
+    db = DatabaseManager(path)
+    with db.get_connection() as conn:
+        conn.executescript(SCHEMA)
+        # Background rows so the existence check searches a realistically sized table
+        conn.executemany(
+            "INSERT INTO news_articles (title, source) VALUES (?, ?)",
+            [(f"Older story {i}", f"Source {i % 20}") for i in range(existing_per_feed * 200)]
+        )
+    return db
+
+def legacy_ingest(collector: RSSCollector, source: RSSSource, entries) -> int:
+    """The per-entry loop fetch_source used before batching"""
+    new_count = 0
+    for entry in entries:
+        if collector.db.article_exists(entry.title, source.name):
+            continue
+        article = collector._parse_feed_entry(entry, source)
+        if collector._is_government_related(article):
+            article_id = collector.db.insert_news_article(article)
+            collector.db.create_processing_job(ProcessingJob(
+                id=None, job_type="analyze_article", article_id=article_id, source_id=source.id
+            ))
+            new_count += 1
+    return new_count
+
+def run(label, ingest, args):
+    db = make_db(args.existing, args.feeds)
+    collector = RSSCollector(db)
+    sources = [
+        RSSSource(id=n, name=f"Source {n}", url=f"https://example.gov.in/{n}.rss",
+                  language="en", region="National", category="Politics")
+        for n in range(args.feeds)
+    ]
+    feeds = [make_feed(n, args.entries) for n in range(args.feeds)]
+
+    for attempt in ('first poll', 'repeat poll'):
+        started = time.perf_counter()
+        stored = sum(ingest(collector, source, entries) for source, entries in zip(sources, feeds))
+        elapsed = time.perf_counter() - started
+        total = args.feeds * args.entries
+        print(f"{label:<10} {attempt:<12} {total / elapsed:9.0f} entries/sec  ({stored} stored, {elapsed:.3f}s)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--entries', type=int, default=50, help='Entries per feed')
+    parser.add_argument('--feeds', type=int, default=20, help='Feeds per poll')
+    parser.add_argument('--existing', type=int, default=100, help='Scale of pre-existing rows (x200)')
+    args = parser.parse_args()
+
+    run('legacy', legacy_ingest, args)
+    run('batched', lambda collector, source, entries: len(collector.ingest_entries(source, entries)), args)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Durable per-source collection checkpoints.
+Everything a poll learned is committed in one transaction only after its items are queued, so restarts resume incrementally.
+"""
+
+import logging
+import time
+from typing import Dict, List, Optional, Any, Tuple
+
+from conditional_fetch import NAMESPACE as VALIDATOR_NAMESPACE
+from state_store import StateStore, get_state_store
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE = "source_checkpoints"
+SCHEDULER_NAMESPACE = "scheduler_state"
+
+# GUIDs remembered per feed; comfortably more than any feed carries at once
+MAX_GUIDS = 200
+
+class CheckpointStore:
+    """Per-source checkpoints: recent GUIDs, newest publish time, listing fingerprint and page hash"""
+
+    def __init__(self, store: Optional[StateStore] = None):
+        self.store = store or get_state_store()
+        self.checkpoints: Dict[str, Dict[str, Any]] = {
+            key: self.store.get(NAMESPACE, key) for key in self.store.keys(NAMESPACE)
+        }
+        if self.checkpoints:
+            logger.info(f"Resuming collection from checkpoints for {len(self.checkpoints)} sources")
+
+    def get(self, source: str) -> Dict[str, Any]:
+        """Last committed checkpoint of a source (empty on first run)"""
+        return self.checkpoints.get(source, {})
+
+    def is_known_entry(self, checkpoint: Dict[str, Any], guid: Optional[str], published: Optional[str]) -> bool:
+        """Whether a feed entry was covered by the last committed poll"""
+        if guid:
+            return guid in checkpoint.get('guids', ())
+        # Without a GUID fall back to the publish-time watermark
+        last_published = checkpoint.get('last_published')
+        return bool(published and last_published and published <= last_published)
+
+    def commit(self, source: str, update: Dict[str, Any], queued: List[Dict[str, Any]],
+               extra_entries: List[Tuple[str, str, Any, Optional[float]]] = ()):
+        """Atomically write a poll's checkpoint, validators and any extra state entries"""
+        checkpoint = dict(self.get(source))
+        validators = update.pop('validators', {})
+        checkpoint.update(update)
+
+        guids = [article['metadata']['guid'] for article in queued if article.get('metadata', {}).get('guid')]
+        if guids:
+            previous = [guid for guid in checkpoint.get('guids', []) if guid not in guids]
+            checkpoint['guids'] = (guids + previous)[:MAX_GUIDS]
+        # Scraped items are stamped with collection time, so only feed dates form the watermark
+        published = [
+            article['publish_date'] for article in queued
+            if article.get('publish_date') and article.get('metadata', {}).get('source_type') == 'rss'
+        ]
+        if published:
+            checkpoint['last_published'] = max(published + [checkpoint.get('last_published') or ''])
+        checkpoint['updated_at'] = time.time()
+
+        entries = [(NAMESPACE, source, checkpoint, None)]
+        entries += [(VALIDATOR_NAMESPACE, url, value, None) for url, value in validators.items()]
+        entries += list(extra_entries)
+        self.store.write_batch(entries)
+        self.checkpoints[source] = checkpoint
+
+    def save_scheduler_state(self, source: str, state: Dict[str, Any]):
+        """Persist learned polling state (not tied to queueing, so written on its own)"""
+        self.store.set(SCHEDULER_NAMESPACE, source, state)
+
+    def load_scheduler_state(self) -> Dict[str, Dict[str, Any]]:
+        """Learned polling state for every source"""
+        return {key: self.store.get(SCHEDULER_NAMESPACE, key) for key in self.store.keys(SCHEDULER_NAMESPACE)}
+
+    def get_report(self) -> Dict[str, Dict[str, Any]]:
+        """Checkpoint age and size per source"""
+        now = time.time()
+        return {
+            source: {
+                'age_seconds': round(now - checkpoint.get('updated_at', now), 1),
+                'guids': len(checkpoint.get('guids', [])),
+                'last_published': checkpoint.get('last_published'),
+                'has_fingerprint': bool(checkpoint.get('fingerprint'))
+            }
+            for source, checkpoint in self.checkpoints.items()
+        }
@@ -1,9 +1,16 @@
+import asyncio
 import feedparser
 import requests
 from bs4 import BeautifulSoup
 from datetime import datetime
-import time
 import logging
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from conditional_fetch import ValidatorStore
+from content_fetcher import ContentFetcher
+from http_client import get_sync_session
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -12,10 +19,21 @@ class RSSCollector:
         self.config = config
         self.rss_feeds = config.get("rss_feeds", [])
         self.headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
+        self.validators = ValidatorStore()
+        self.session = get_sync_session()
 
-    def fetch_rss_feed(self, url):
+    def fetch_rss_feed(self, url, source_name=None):
+        source_name = source_name or url
         try:
-            feed = feedparser.parse(url)
+            headers = {**self.headers, **self.validators.request_headers(url)}
+            response = self.session.get(url, headers=headers, timeout=10)
+            if response.status_code == 304:
+                # Feed unchanged since the last poll
+                self.validators.record_not_modified(url, source_name)
+                return []
+            response.raise_for_status()
+            self.validators.record_response(url, source_name, response.headers, len(response.content))
+            feed = feedparser.parse(response.content)
             return feed.entries
         except Exception as e:
             logging.error(f"Error fetching RSS feed from {url}: {e}")
@@ -23,7 +41,7 @@ class RSSCollector:
 
     def scrape_article_content(self, url):
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = self.session.get(url, headers=self.headers, timeout=10)
             response.raise_for_status()
             soup = BeautifulSoup(response.content, 'html.parser')
             paragraphs = soup.find_all('p')
@@ -34,19 +52,22 @@ class RSSCollector:
             return None
 
     def collect_news(self):
-        collected_articles = []
+        parsed_articles = []
         for feed_source in self.rss_feeds:
             logging.info(f"Collecting news from RSS feed: {feed_source['name']} ({feed_source['url']})")
-            entries = self.fetch_rss_feed(feed_source['url'])
+            entries = self.fetch_rss_feed(feed_source['url'], feed_source['name'])
             for entry in entries:
                 article = self._parse_rss_entry(entry, feed_source)
                 if article:
-                    full_content = self.scrape_article_content(article['url'])
-                    if full_content:
-                        article['content'] = full_content
-                        collected_articles.append(article)
-                time.sleep(self.config.get("scrape_delay", 1)) # Be polite to websites
-        return collected_articles
+                    parsed_articles.append(article)
+
+        # Article bodies are fetched concurrently across hosts; politeness is enforced per host
+        collected_articles = asyncio.run(self._fetch_contents(parsed_articles))
+        return [article for article in collected_articles if article['content']]
+
+    async def _fetch_contents(self, articles):
+        async with ContentFetcher(self.headers) as fetcher:
+            return await fetcher.fill_content(articles)
 
     def _parse_rss_entry(self, entry, feed_source):
         try:
@@ -1,11 +1,53 @@
 import os
-import tweepy # For Twitter/X
+import sys
+import asyncio
+import time
+try:
+    import tweepy # For Twitter/X
+    import tweepy.asynchronous
+    TWEEPY_AVAILABLE = True
+except ImportError:
+    TWEEPY_AVAILABLE = False
 # import facebook_sdk # Placeholder for Facebook (requires proper SDK setup)
 import logging
 from datetime import datetime
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from state_store import get_state_store
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+TWEET_FIELDS = ["created_at", "author_id", "public_metrics"]
+
+TWITTER_CURSOR_NAMESPACE = "twitter_cursors"
+TWITTER_SEEN_NAMESPACE = "twitter_seen"
+
+def parse_tweet(tweet):
+    return {
+        'id': tweet.id,
+        'platform': 'Twitter',
+        'content': tweet.text,
+        'author_id': tweet.author_id,
+        'post_date': tweet.created_at,
+        'likes': tweet.public_metrics.get('like_count', 0),
+        'retweets': tweet.public_metrics.get('retweet_count', 0),
+        'replies': tweet.public_metrics.get('reply_count', 0),
+        'quotes': tweet.public_metrics.get('quote_count', 0),
+        'url': f"https://twitter.com/{tweet.author_id}/status/{tweet.id}", # This author_id needs to be resolved to username
+        'language': 'en', # Twitter API can provide language, but for simplicity, default
+        'sentiment': None
+    }
+
+def _rate_limit_reset(error):
+    """Epoch seconds at which a rate-limited endpoint frees up, or None if the error is not a 429"""
+    response = getattr(error, 'response', None)
+    status = getattr(response, 'status', None) or getattr(response, 'status_code', None)
+    if status != 429:
+        return None
+    reset = getattr(response, 'headers', {}).get('x-rate-limit-reset')
+    # Without a reset header fall back to the length of a rate-limit window
+    return float(reset) if reset else time.time() + 15 * 60
+
 class SocialMediaCollector:
     def __init__(self, config):
         self.config = config
@@ -18,7 +60,7 @@ class SocialMediaCollector:
         # self.facebook_graph = self._init_facebook_graph() # Placeholder
 
     def _init_twitter_client(self):
-        if self.twitter_bearer_token:
+        if self.twitter_bearer_token and TWEEPY_AVAILABLE:
             try:
                 client = tweepy.Client(self.twitter_bearer_token)
                 logging.info("Twitter client initialized successfully.")
@@ -50,23 +92,10 @@ class SocialMediaCollector:
 
         logging.info(f"Collecting Twitter posts for query: '{query}'")
         try:
-            response = self.twitter_client.search_recent_tweets(query, tweet_fields=["created_at", "author_id", "public_metrics"], max_results=max_results)
+            response = self.twitter_client.search_recent_tweets(query, tweet_fields=TWEET_FIELDS, max_results=max_results)
             if response.data:
                 for tweet in response.data:
-                    collected_posts.append({
-                        'id': tweet.id,
-                        'platform': 'Twitter',
-                        'content': tweet.text,
-                        'author_id': tweet.author_id,
-                        'post_date': tweet.created_at,
-                        'likes': tweet.public_metrics.get('like_count', 0),
-                        'retweets': tweet.public_metrics.get('retweet_count', 0),
-                        'replies': tweet.public_metrics.get('reply_count', 0),
-                        'quotes': tweet.public_metrics.get('quote_count', 0),
-                        'url': f"https://twitter.com/{tweet.author_id}/status/{tweet.id}", # This author_id needs to be resolved to username
-                        'language': 'en', # Twitter API can provide language, but for simplicity, default
-                        'sentiment': None
-                    })
+                    collected_posts.append(parse_tweet(tweet))
             logging.info(f"Collected {len(collected_posts)} Twitter posts.")
         except Exception as e:
             logging.error(f"Error collecting Twitter posts for query '{query}': {e}")
@@ -116,6 +145,107 @@ class SocialMediaCollector:
 
         return all_posts
 
+class IncrementalTwitterCollector:
+    """Checkpointed recent-search collection: only posts newer than each query's since_id, every page once"""
+
+    def __init__(self, config, client=None, store=None):
+        self.config = config
+        if client is None:
+            if not TWEEPY_AVAILABLE:
+                raise ImportError("tweepy is required unless a client is passed in")
+            client = tweepy.asynchronous.AsyncClient(config.get("twitter_bearer_token"))
+        # Any object with an async search_recent_tweets returning data/meta can stand in
+        self.client = client
+        self.store = store or get_state_store()
+        self.queries = config.get("twitter_queries", [])
+        self.page_size = config.get("twitter_page_size", 100)
+        self.max_pages = config.get("twitter_max_pages_per_query", 10)
+        self.seen_ttl = config.get("twitter_seen_ttl", 7 * 24 * 3600)
+        # The search endpoint's limit is shared by all queries, so one reset time covers them all
+        self.rate_limited_until = 0.0
+        self.stats = {'pages': 0, 'posts': 0, 'duplicates': 0, 'rate_limit_waits': 0}
+
+    async def _search(self, query, **params):
+        while True:
+            wait = self.rate_limited_until - time.time()
+            if wait > 0:
+                logging.info(f"Twitter search rate limited; sleeping {wait:.0f}s until reset")
+                self.stats['rate_limit_waits'] += 1
+                await asyncio.sleep(wait)
+            try:
+                return await self.client.search_recent_tweets(query, tweet_fields=TWEET_FIELDS, **params)
+            except Exception as e:
+                reset = _rate_limit_reset(e)
+                if reset is None:
+                    raise
+                self.rate_limited_until = max(self.rate_limited_until, reset + 1)
+
+    async def stream_query(self, query_info):
+        """Yield pages of new posts for one query; the cursor advances only once the caller asks for the next page"""
+        query = query_info['query']
+        cursor = self.store.get(TWITTER_CURSOR_NAMESPACE, query, {})
+        since_id = cursor.get('since_id')
+        # A run interrupted mid-pagination resumes from its saved page token
+        next_token = cursor.get('next_token')
+        newest_id = cursor.get('pending_newest_id')
+
+        for _ in range(self.max_pages):
+            params = {'max_results': query_info.get('max_results', self.page_size)}
+            if since_id:
+                params['since_id'] = since_id
+            if next_token:
+                params['next_token'] = next_token
+            response = await self._search(query, **params)
+            meta = response.meta or {}
+            newest_id = newest_id or meta.get('newest_id')
+            next_token = meta.get('next_token')
+
+            posts = [parse_tweet(tweet) for tweet in response.data or []]
+            seen = self.store.get_many(TWITTER_SEEN_NAMESPACE, [str(post['id']) for post in posts])
+            new_posts = [post for post in posts if str(post['id']) not in seen]
+            for post in new_posts:
+                post['post_date'] = post['post_date'].isoformat() if post['post_date'] else None
+                post['source'] = 'Twitter'
+                post['title'] = post['content'][:100]
+                post['metadata'] = {'source_type': 'twitter', 'query': query}
+            self.stats['pages'] += 1
+            self.stats['posts'] += len(new_posts)
+            self.stats['duplicates'] += len(posts) - len(new_posts)
+
+            if new_posts:
+                yield new_posts
+
+            # Reached after the caller has handled the page, so a crash re-delivers it rather than losing it
+            if next_token:
+                cursor = {'since_id': since_id, 'next_token': next_token, 'pending_newest_id': newest_id}
+            else:
+                cursor = {'since_id': newest_id or since_id}
+            self.store.write_batch(
+                [(TWITTER_CURSOR_NAMESPACE, query, cursor, None)] +
+                [(TWITTER_SEEN_NAMESPACE, str(post['id']), 1, self.seen_ttl) for post in new_posts]
+            )
+            if not next_token:
+                return
+
+    async def stream_posts(self):
+        """Yield pages of new posts across all configured queries"""
+        for query_info in self.queries:
+            try:
+                async for page in self.stream_query(query_info):
+                    yield page
+            except Exception as e:
+                logging.error(f"Error collecting Twitter posts for query '{query_info['query']}': {e}")
+
+    async def collect_to_queue(self, enqueue):
+        """Stream every new post into the processing queue (e.g. queue_manager.enqueue_article)"""
+        queued = 0
+        async for page in self.stream_posts():
+            for post in page:
+                await enqueue(post)
+                queued += 1
+        logging.info(f"Queued {queued} new Twitter posts {self.stats}")
+        return queued
+
 if __name__ == '__main__':
     # Example Usage (replace with actual config loading and API keys)
     sample_config = {
@@ -3,6 +3,12 @@ from bs4 import BeautifulSoup
 from datetime import datetime
 import time
 import logging
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from html_extractor import BS_PARSER
+from http_client import get_sync_session
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -10,35 +16,14 @@ class WebScraper:
     def __init__(self, config):
         self.config = config
         self.news_sources = config.get("web_scrape_sources", [])
+        self.session = get_sync_session()
         self.headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
 
     def scrape_article(self, url, source_name, language='en', category='General', region='N/A'):
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = self.session.get(url, headers=self.headers, timeout=10)
             response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            title = self._extract_title(soup)
-            content = self._extract_content(soup)
-            publish_date = self._extract_publish_date(soup)
-            author = self._extract_author(soup)
-
-            if not title or not content:
-                logging.warning(f"Could not extract title or content from {url}")
-                return None
-
-            return {
-                'title': title,
-                'url': url,
-                'source': source_name,
-                'language': language,
-                'category': category,
-                'region': region,
-                'publish_date': publish_date,
-                'collected_date': datetime.now(),
-                'author': author,
-                'content': content
-            }
+            return self.parse_article(response.content, url, source_name, language, category, region)
         except requests.exceptions.RequestException as e:
             logging.error(f"Error scraping article from {url}: {e}")
             return None
@@ -46,6 +31,31 @@ class WebScraper:
             logging.error(f"Unexpected error during scraping {url}: {e}")
             return None
 
+    def parse_article(self, html, url, source_name, language='en', category='General', region='N/A'):
+        soup = BeautifulSoup(html, BS_PARSER)
+
+        title = self._extract_title(soup)
+        content = self._extract_content(soup)
+        publish_date = self._extract_publish_date(soup)
+        author = self._extract_author(soup)
+
+        if not title or not content:
+            logging.warning(f"Could not extract title or content from {url}")
+            return None
+
+        return {
+            'title': title,
+            'url': url,
+            'source': source_name,
+            'language': language,
+            'category': category,
+            'region': region,
+            'publish_date': publish_date,
+            'collected_date': datetime.now(),
+            'author': author,
+            'content': content
+        }
+
     def _extract_title(self, soup):
         title = soup.find('h1')
         if title:
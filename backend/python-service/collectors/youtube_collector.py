@@ -1,82 +1,194 @@
 import os
-from googleapiclient.discovery import build
+import sys
 from datetime import datetime
+from zoneinfo import ZoneInfo
 import logging
 
+try:
+    from googleapiclient.discovery import build
+    GOOGLE_API_AVAILABLE = True
+except ImportError:
+    GOOGLE_API_AVAILABLE = False
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from state_store import get_state_store
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Data API quota cost of one list call per resource
+QUOTA_COSTS = {'search': 100, 'channels': 1, 'playlistItems': 1, 'videos': 1}
+MAX_IDS_PER_REQUEST = 50
+
+CHANNEL_NAMESPACE = "youtube_channel_ids"
+VIDEO_NAMESPACE = "youtube_videos"
+CHECKPOINT_NAMESPACE = "youtube_checkpoints"
+QUOTA_NAMESPACE = "youtube_quota"
+
+# The daily quota resets at midnight Pacific time
+QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+
+class QuotaExceeded(Exception):
+    """Raised when a call would take the day's usage past the configured quota"""
+
 class YouTubeCollector:
-    def __init__(self, config):
+    def __init__(self, config, client=None, store=None):
         self.config = config
         self.api_key = config.get("youtube_api_key")
-        self.youtube = build('youtube', 'v3', developerKey=self.api_key)
+        # Any object with the discovery client's resource().list().execute() shape can stand in
+        if client is None and not GOOGLE_API_AVAILABLE:
+            raise ImportError("google-api-python-client is required unless a client is passed in")
+        self.youtube = client or build('youtube', 'v3', developerKey=self.api_key)
         self.channels = config.get("youtube_channels", [])
+        self.store = store or get_state_store()
+        self.daily_quota = config.get("youtube_daily_quota", 10000)
+        self.channel_id_ttl = config.get("youtube_channel_id_ttl", 30 * 24 * 3600)
+        self.video_cache_ttl = config.get("youtube_video_cache_ttl", 6 * 3600)
+        self.cycle_quota = {}
+
+    def _quota_day(self):
+        return datetime.now(QUOTA_TIMEZONE).date().isoformat()
+
+    def _call(self, resource, **params):
+        """Execute one list call, charging its cost against the daily quota"""
+        cost = QUOTA_COSTS[resource]
+        day = self._quota_day()
+        used = self.store.get(QUOTA_NAMESPACE, day, 0)
+        if used + cost > self.daily_quota:
+            raise QuotaExceeded(f"{resource}.list needs {cost} units, {self.daily_quota - used} left today")
+
+        response = getattr(self.youtube, resource)().list(**params).execute()
+        self.store.set(QUOTA_NAMESPACE, day, used + cost, ttl=2 * 24 * 3600)
+        self.cycle_quota[resource] = self.cycle_quota.get(resource, 0) + cost
+        return response
 
     def get_channel_id(self, channel_name):
+        cached = self.store.get(CHANNEL_NAMESPACE, channel_name)
+        if cached:
+            return cached
         try:
-            request = self.youtube.search().list(
-                q=channel_name,
-                type='channel',
-                part='id',
-                maxResults=1
-            )
-            response = request.execute()
+            # Channel search costs 100 units, so resolved IDs are kept for weeks
+            response = self._call('search', q=channel_name, type='channel', part='id', maxResults=1)
             if response['items']:
-                return response['items'][0]['id']['channelId']
+                channel_id = response['items'][0]['id']['channelId']
+                self.store.set(CHANNEL_NAMESPACE, channel_name, channel_id, ttl=self.channel_id_ttl)
+                return channel_id
             return None
+        except QuotaExceeded:
+            raise
         except Exception as e:
             logging.error(f"Error getting channel ID for {channel_name}: {e}")
             return None
 
     def collect_videos(self):
         collected_videos = []
-        for channel_info in self.channels:
-            channel_name = channel_info['name']
-            channel_id = channel_info.get('id')
-            
+        self.cycle_quota = {}
+        try:
+            for channel_info in self.channels:
+                collected_videos.extend(self._collect_channel(channel_info))
+        except QuotaExceeded as e:
+            logging.warning(f"Stopping YouTube collection: {e}")
+        logging.info(
+            f"YouTube cycle collected {len(collected_videos)} videos using {sum(self.cycle_quota.values())} "
+            f"quota units {self.cycle_quota}"
+        )
+        return collected_videos
+
+    def _collect_channel(self, channel_info):
+        channel_name = channel_info['name']
+        channel_id = channel_info.get('id')
+
+        if not channel_id:
+            logging.info(f"Searching for channel ID for '{channel_name}'...")
+            channel_id = self.get_channel_id(channel_name)
             if not channel_id:
-                logging.info(f"Searching for channel ID for '{channel_name}'...")
-                channel_id = self.get_channel_id(channel_name)
-                if not channel_id:
-                    logging.warning(f"Could not find channel ID for '{channel_name}'. Skipping.")
-                    continue
-                else:
-                    channel_info['id'] = channel_id # Update config with found ID
-
-            logging.info(f"Collecting videos from YouTube channel: {channel_name} (ID: {channel_id})")
-            
+                logging.warning(f"Could not find channel ID for '{channel_name}'. Skipping.")
+                return []
+            channel_info['id'] = channel_id # Update config with found ID
+
+        logging.info(f"Collecting videos from YouTube channel: {channel_name} (ID: {channel_id})")
+
+        try:
+            checkpoint = self.store.get(CHECKPOINT_NAMESPACE, channel_id, {})
+            uploads = self._recent_uploads(channel_id, checkpoint.get('last_published'))
+            if not uploads:
+                return []
+            failed = set()
+            details = self._get_video_details_batch([video_id for video_id, _ in uploads], failed)
+            videos = [
+                self._parse_video_data(details[video_id], channel_info)
+                for video_id, _ in uploads if video_id in details
+            ]
+            # Advance only past uploads older than the oldest one whose details request failed, so it is retried
+            retry_from = min((published for video_id, published in uploads if video_id in failed), default=None)
+            done = [published for _, published in uploads if retry_from is None or published < retry_from]
+            if done:
+                self.store.set(CHECKPOINT_NAMESPACE, channel_id, {'last_published': max(done)})
+            return videos
+        except QuotaExceeded:
+            raise
+        except Exception as e:
+            logging.error(f"Error collecting videos from channel {channel_name} (ID: {channel_id}): {e}")
+            return []
+
+    def _recent_uploads(self, channel_id, since=None):
+        """(video ID, publish time) of uploads newer than since, newest first"""
+        # The uploads playlist lists a channel's videos newest first for 1 unit, against 100 for a search
+        playlist_id = 'UU' + channel_id[2:]
+        max_results = self.config.get("youtube_max_results_per_channel", 50)
+        uploads = []
+        page_token = None
+        while len(uploads) < max_results:
+            params = {'playlistId': playlist_id, 'part': 'contentDetails',
+                      'maxResults': min(MAX_IDS_PER_REQUEST, max_results - len(uploads))}
+            if page_token:
+                params['pageToken'] = page_token
+            response = self._call('playlistItems', **params)
+            for item in response.get('items', []):
+                content = item['contentDetails']
+                published = content.get('videoPublishedAt')
+                # Everything past the checkpoint was collected by an earlier cycle
+                if since and published and published <= since:
+                    return uploads
+                if published:
+                    uploads.append((content['videoId'], published))
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
+        return uploads[:max_results]
+
+    def _get_video_details_batch(self, video_ids, failed=None):
+        """Details for many videos: cached ones from the store, the rest 50 IDs per request; IDs of failed requests go into failed"""
+        details = self.store.get_many(VIDEO_NAMESPACE, video_ids)
+        missing = [video_id for video_id in video_ids if video_id not in details]
+        for i in range(0, len(missing), MAX_IDS_PER_REQUEST):
+            chunk = missing[i:i + MAX_IDS_PER_REQUEST]
             try:
-                request = self.youtube.search().list(
-                    channelId=channel_id,
-                    type='video',
-                    part='id,snippet',
-                    maxResults=self.config.get("youtube_max_results_per_channel", 50),
-                    order='date'
+                response = self._call(
+                    'videos', part='snippet,contentDetails,statistics', id=','.join(chunk), maxResults=len(chunk)
                 )
-                response = request.execute()
-
-                for item in response['items']:
-                    video_id = item['id']['videoId']
-                    video_details = self._get_video_details(video_id)
-                    if video_details:
-                        collected_videos.append(self._parse_video_data(video_details, channel_info))
+            except QuotaExceeded:
+                raise
             except Exception as e:
-                logging.error(f"Error collecting videos from channel {channel_name} (ID: {channel_id}): {e}")
-        return collected_videos
+                logging.error(f"Error fetching details for {len(chunk)} videos: {e}")
+                if failed is not None:
+                    failed.update(chunk)
+                continue
+            fetched = {item['id']: item for item in response.get('items', [])}
+            self.store.set_many(VIDEO_NAMESPACE, fetched.items(), ttl=self.video_cache_ttl)
+            details.update(fetched)
+        return details
 
     def _get_video_details(self, video_id):
-        try:
-            request = self.youtube.videos().list(
-                part='snippet,contentDetails,statistics',
-                id=video_id
-            )
-            response = request.execute()
-            if response['items']:
-                return response['items'][0]
-            return None
-        except Exception as e:
-            logging.error(f"Error fetching details for video {video_id}: {e}")
-            return None
+        return self._get_video_details_batch([video_id]).get(video_id)
+
+    def get_quota_report(self):
+        """Quota units used by the last cycle and so far today"""
+        return {
+            'last_cycle': dict(self.cycle_quota),
+            'last_cycle_total': sum(self.cycle_quota.values()),
+            'today': self.store.get(QUOTA_NAMESPACE, self._quota_day(), 0),
+            'daily_quota': self.daily_quota
+        }
 
     def _parse_video_data(self, video_details, channel_info):
         snippet = video_details['snippet']
@@ -0,0 +1,91 @@
+"""
+HTTP validator store for conditional polling of feeds and listing pages.
+Remembers ETag / Last-Modified per URL so unchanged resources come back as 304 without a body.
+"""
+
+import logging
+import time
+from typing import Dict, Optional, Any, Mapping
+
+from metrics import metrics
+from state_store import StateStore, get_state_store
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE = "http_validators"
+
+class ValidatorStore:
+    """Persistent per-URL ETag / Last-Modified validators with per-source savings stats"""
+
+    def __init__(self, store: Optional[StateStore] = None):
+        self.store = store or get_state_store()
+        self.source_stats: Dict[str, Dict[str, int]] = {}
+
+    def request_headers(self, url: str) -> Dict[str, str]:
+        """Conditional request headers for a URL (empty on first fetch)"""
+        validators = self.store.get(NAMESPACE, url) or {}
+        headers = {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        return headers
+
+    def get_validators(self, url: str) -> Dict[str, Any]:
+        """Stored validators for a URL"""
+        return self.store.get(NAMESPACE, url) or {}
+
+    def _stats(self, source: str) -> Dict[str, int]:
+        return self.source_stats.setdefault(source, {
+            'requests': 0, 'not_modified': 0, 'bytes_downloaded': 0, 'bytes_saved': 0
+        })
+
+    def record_not_modified(self, url: str, source: str):
+        """Record a 304; bandwidth saved is estimated from the last full response"""
+        validators = self.get_validators(url)
+        saved = validators.get('content_length', 0)
+
+        stats = self._stats(source)
+        stats['requests'] += 1
+        stats['not_modified'] += 1
+        stats['bytes_saved'] += saved
+
+        metrics.increment('http_conditional_requests_total', labels={'source': source})
+        metrics.increment('http_not_modified_total', labels={'source': source})
+        metrics.increment('http_bytes_saved_total', saved, labels={'source': source})
+        logger.debug(f"{source}: 304 Not Modified for {url}")
+
+    def record_response(self, url: str, source: str, headers: Mapping[str, str], content_length: int,
+                        persist: bool = True) -> Optional[Dict[str, Any]]:
+        """Record a full 200 response and return its validators (stored unless persist is False)"""
+        stats = self._stats(source)
+        stats['requests'] += 1
+        stats['bytes_downloaded'] += content_length
+
+        metrics.increment('http_conditional_requests_total', labels={'source': source})
+        metrics.increment('http_bytes_downloaded_total', content_length, labels={'source': source})
+
+        etag = headers.get('ETag') or headers.get('etag')
+        last_modified = headers.get('Last-Modified') or headers.get('last-modified')
+        if not etag and not last_modified:
+            return None
+
+        validators = {
+            'etag': etag,
+            'last_modified': last_modified,
+            'content_length': content_length,
+            'updated_at': time.time()
+        }
+        if persist:
+            self.store.set(NAMESPACE, url, validators)
+        return validators
+
+    def get_report(self) -> Dict[str, Dict[str, Any]]:
+        """Per-source 304 ratio and bandwidth saved"""
+        report = {}
+        for source, stats in self.source_stats.items():
+            report[source] = {
+                **stats,
+                'not_modified_ratio': round(stats['not_modified'] / stats['requests'], 3) if stats['requests'] else 0.0
+            }
+        return report
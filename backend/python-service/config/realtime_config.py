@@ -26,6 +26,66 @@ class RealTimeConfig(BaseModel):
     redis_stream_key: str = Field("news_stream", description="Redis stream key for news articles")
     redis_max_len: int = Field(10000, description="Maximum length of Redis stream")
 
+    # Stream sharding for multi-process processing
+    stream_shards: int = Field(4, description="Number of Redis streams articles are sharded across")
+    shard_key: str = Field("source", description="Article field used for sharding: source, language or url")
+    shard_lease_ttl: int = Field(30, description="Seconds a worker process holds a shard lease without renewing")
+
+    # Adaptive per-source polling
+    scheduler_min_interval: int = Field(15, description="Shortest per-source polling interval in seconds")
+    scheduler_max_interval: int = Field(900, description="Longest per-source polling interval in seconds")
+    scheduler_target_items_per_poll: float = Field(1.0, description="New items a poll should find on average")
+    scheduler_rate_alpha: float = Field(0.3, description="EWMA weight for the observed publish rate")
+    scheduler_change_boost: float = Field(0.5, description="Interval multiplier applied right after new items are seen")
+    scheduler_idle_backoff: float = Field(1.5, description="Interval multiplier while a source has shown no new items")
+
+    # Backpressure between collector and processing queue
+    backpressure_high_watermark: int = Field(2000, description="Queue lag at which low-priority sources are slowed down")
+    backpressure_low_watermark: int = Field(500, description="Queue lag at which normal polling resumes")
+    backpressure_slowdown_factor: int = Field(4, description="Polling interval multiplier for low-priority sources while throttled")
+    backpressure_check_interval: int = Field(5, description="Seconds between queue lag checks")
+
+    # Per-source health and circuit breaking
+    source_health_alpha: float = Field(0.2, description="EWMA weight for per-source success rate and latency")
+    circuit_failure_threshold: int = Field(3, description="Consecutive failed requests that open a source's circuit")
+    circuit_open_seconds: int = Field(60, description="Seconds a circuit stays open before the first probe")
+    circuit_max_open_seconds: int = Field(3600, description="Upper bound of the doubling open period")
+
+    # Persistent collector state (validators, seen items, checkpoints)
+    state_db_path: str = Field("./collector_state.db", description="SQLite file for persistent collector state")
+    seen_item_ttl: int = Field(7 * 24 * 3600, description="Seconds an item URL/GUID is remembered as already collected")
+    seen_bloom_capacity: int = Field(200000, description="Items the seen-index Bloom filter is sized for")
+    seen_bloom_error_rate: float = Field(0.001, description="Target false-positive rate of the seen-index Bloom filter")
+
+    # Shared HTTP client (http_client.py)
+    http_pool_limit: int = Field(100, description="Total pooled connections per client")
+    http_pool_limit_per_host: int = Field(8, description="Pooled connections per host")
+    http_keepalive_timeout: float = Field(30, description="Seconds an idle pooled connection is kept open")
+    http_dns_ttl: int = Field(300, description="Seconds DNS lookups are cached")
+    http_max_response_bytes: int = Field(10 * 1024 * 1024, description="Responses larger than this are refused")
+    http_retries: int = Field(2, description="Retries for connection errors and retryable statuses")
+    # Off by default: the httpx client multiplexes requests over fewer connections but has no per-host limit or DNS cache
+    http2_enabled: bool = Field(False, description="Use HTTP/2 where servers support it (needs httpx[http2]); ignores http_pool_limit_per_host and http_dns_ttl")
+
+    # Full-article content fetching
+    content_fetch_enabled: bool = Field(True, description="Fetch full article text before queueing")
+    content_fetch_min_length: int = Field(500, description="Content shorter than this (e.g. feed summaries) is refetched")
+    content_fetch_concurrency: int = Field(50, description="Concurrent article requests across all hosts, separate from max_concurrent_scrapers")
+    content_fetch_per_host: int = Field(2, description="Concurrent article fetches per host")
+    content_fetch_host_delay: float = Field(0.5, description="Minimum seconds between requests to one host")
+    extraction_workers: int = Field(2, description="Worker processes used for HTML/feed parsing and text extraction")
+    feed_max_entries: int = Field(10, description="Newest feed entries parsed per poll; the rest of the feed is skipped")
+
+    # Site-wide crawling
+    crawl_host_delay: float = Field(1.0, description="Seconds between the end of one request to a host and the next")
+    crawl_max_depth: int = Field(1, description="Link depth followed from a crawl seed (listing pages are depth 0)")
+    crawl_workers: int = Field(20, description="Concurrent crawl requests across all hosts")
+    crawl_seen_ttl: int = Field(7 * 24 * 3600, description="Seconds a crawled URL is remembered and not queued again")
+
+    # Event loop health
+    loop_lag_check_interval: float = Field(0.5, description="Seconds between event loop lag samples")
+    loop_lag_warn_threshold: float = Field(0.1, description="Loop lag in seconds that is logged as a blocked loop")
+
     # WebSocket configuration
     websocket_host: str = Field("localhost", description="WebSocket server host")
     websocket_port: int = Field(8765, description="WebSocket server port")
@@ -50,7 +110,8 @@ class RealTimeConfig(BaseModel):
             },
             "language": "en",
             "region": "National",
-            "category": "Politics"
+            "category": "Politics",
+            "priority": "high"
         },
         {
             "name": "Economic Times - Government",
@@ -64,7 +125,8 @@ class RealTimeConfig(BaseModel):
             },
             "language": "en",
             "region": "National",
-            "category": "Economy & Finance"
+            "category": "Economy & Finance",
+            "priority": "normal"
         },
         {
             "name": "PIB Press Releases",
@@ -78,7 +140,8 @@ class RealTimeConfig(BaseModel):
             },
             "language": "en",
             "region": "National",
-            "category": "Government Press Release"
+            "category": "Government Press Release",
+            "priority": "high"
         },
         {
             "name": "Hindustan Times - India",
@@ -92,7 +155,8 @@ class RealTimeConfig(BaseModel):
             },
             "language": "en",
             "region": "National",
-            "category": "General"
+            "category": "General",
+            "priority": "low"
         },
         {
             "name": "NDTV India",
@@ -106,7 +170,8 @@ class RealTimeConfig(BaseModel):
             },
             "language": "en",
             "region": "National",
-            "category": "General"
+            "category": "General",
+            "priority": "low"
         }
     ], description="List of news sources for real-time monitoring")
 
@@ -137,10 +202,23 @@ class RealTimeConfig(BaseModel):
     }, description="Configuration for AI models")
 
     # Processing pipeline settings
-    processing_workers: int = Field(4, description="Number of processing workers")
     queue_prefetch_count: int = Field(10, description="Number of items to prefetch from queue")
     processing_timeout: int = Field(300, description="Processing timeout in seconds")
 
+    # Load shedding: backlog at which summarization, then NER, then the BERT classifier are skipped
+    degradation_backlog_thresholds: List[int] = Field(default_factory=lambda: [500, 1500, 3000], description="Queue backlog thresholds for each degradation level")
+    degradation_recovery_ratio: float = Field(0.5, description="Fraction of a level's threshold the backlog must fall below to recover")
+    reenrich_batch_size: int = Field(5, description="Degraded articles re-enriched per batch once the backlog clears")
+    reenrich_interval: int = Field(10, description="Seconds between re-enrichment batches")
+    reenrich_claim_idle: int = Field(300, description="Seconds a re-enrichment entry stays unacknowledged before another consumer claims it")
+
+    # Storage writer (group commit) settings
+    storage_batch_size: int = Field(100, description="Processed articles buffered before a forced flush")
+    storage_flush_interval: float = Field(1.0, description="Maximum seconds an article waits in the write buffer")
+    storage_retry_backoff: float = Field(0.5, description="Initial seconds before retrying a batch whose commit failed")
+    storage_retry_max_backoff: float = Field(30.0, description="Maximum seconds between retries of a failing batch")
+    storage_max_buffered: int = Field(1000, description="Buffered articles at which submitters wait for a flush")
+
     # Alert and notification settings
     real_time_alerts: bool = Field(True, description="Enable real-time alerts")
     alert_debounce_seconds: int = Field(60, description="Minimum seconds between similar alerts")
@@ -164,12 +242,19 @@ def load_from_env():
     ai_batch_size = int(os.getenv("AI_BATCH_SIZE", realtime_config.ai_batch_size))
     ai_confidence_threshold = float(os.getenv("AI_CONFIDENCE_THRESHOLD", realtime_config.ai_confidence_threshold))
 
+    # Sharding settings
+    stream_shards = int(os.getenv("STREAM_SHARDS", realtime_config.stream_shards))
+    shard_key = os.getenv("SHARD_KEY", realtime_config.shard_key)
+
     # Update config
     realtime_config.redis_host = redis_host
     realtime_config.redis_port = redis_port
     realtime_config.websocket_port = websocket_port
     realtime_config.ai_batch_size = ai_batch_size
     realtime_config.ai_confidence_threshold = ai_confidence_threshold
+    realtime_config.state_db_path = os.getenv("STATE_DB_PATH", realtime_config.state_db_path)
+    realtime_config.stream_shards = stream_shards
+    realtime_config.shard_key = shard_key
 
 # Load environment configuration on import
 load_from_env()
@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 from pydantic import Field
 from typing import List, Dict, Any
@@ -10,6 +11,11 @@ class Settings(BaseSettings):
 
     # Database settings
     database_url: str = Field("sqlite:///./sql_app.db", env="DATABASE_URL")
+    db_pool_size: int = Field(10, env="DB_POOL_SIZE") # Connections kept open per process
+    db_max_overflow: int = Field(20, env="DB_MAX_OVERFLOW") # Extra connections allowed under burst load
+    db_pool_timeout: int = Field(30, env="DB_POOL_TIMEOUT") # Seconds to wait for a free connection
+    db_pool_recycle: int = Field(1800, env="DB_POOL_RECYCLE") # Seconds before a connection is replaced
+    rollup_trending_days: int = Field(7, env="ROLLUP_TRENDING_DAYS") # Days of keyword rollups behind trending topics
 
     # API Keys and Tokens (use environment variables for production)
     google_translate_api_key: str = Field("", env="GOOGLE_APPLICATION_CREDENTIALS") # Path to credentials file
@@ -89,5 +95,7 @@ class Settings(BaseSettings):
         env_file = ".env"
         env_file_encoding = 'utf-8'
 
+@lru_cache()
 def get_settings() -> Settings:
+    # Parsed once per process; the .env file is not re-read on every call
     return Settings()
@@ -0,0 +1,152 @@
+"""
+Async full-article content fetching for collected news items.
+Per-host concurrency and politeness over one pooled connector, with text extraction off the event loop.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Any
+from urllib.parse import urlparse
+
+try:
+    from newspaper import Article as NewspaperArticle
+    NEWSPAPER_AVAILABLE = True
+except ImportError:
+    NEWSPAPER_AVAILABLE = False
+
+from config.realtime_config import realtime_config
+from html_extractor import extract_article_text, run_extraction
+from http_client import FetchResult, create_session, fetch as http_fetch
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+def extract_page_text(url: str, html: str) -> Optional[str]:
+    """Extract the main article text from a page (runs in the extraction pool)"""
+    if NEWSPAPER_AVAILABLE:
+        try:
+            article = NewspaperArticle(url)
+            article.download(input_html=html)
+            article.parse()
+            if article.text:
+                return article.text
+        except Exception as e:
+            logger.debug(f"newspaper extraction failed for {url}: {e}")
+
+    return extract_article_text(html)
+
+class HostLimiter:
+    """Concurrency cap and minimum spacing between requests to one host"""
+
+    def __init__(self, concurrency: int, min_delay: float):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.min_delay = min_delay
+        self.next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        async with self._lock:
+            wait = self.next_slot - time.monotonic()
+            self.next_slot = max(self.next_slot, time.monotonic()) + self.min_delay
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.semaphore.release()
+
+class ContentFetcher:
+    """Fetches article bodies concurrently across hosts, politely within each host"""
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None, session_factory=None):
+        self.headers = headers or {'User-Agent': realtime_config.user_agent}
+        self.session_factory = session_factory
+        self.session = None
+        self.host_limiters: Dict[str, HostLimiter] = {}
+        # Taken after the host's politeness wait, so only requests in flight hold a slot
+        self.request_slots = asyncio.Semaphore(realtime_config.content_fetch_concurrency)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def start(self):
+        """Open the keep-alive connection pool"""
+        if self.session is None or self.session.closed:
+            self.session = (self.session_factory or create_session)(headers=self.headers)
+
+    async def close(self):
+        """Close the connection pool"""
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    def _limiter(self, host: str) -> HostLimiter:
+        if host not in self.host_limiters:
+            self.host_limiters[host] = HostLimiter(
+                realtime_config.content_fetch_per_host,
+                realtime_config.content_fetch_host_delay
+            )
+        return self.host_limiters[host]
+
+    @asynccontextmanager
+    async def _request_slot(self, host: str):
+        """Per-host limits first, then one of the stage-wide request slots"""
+        async with self._limiter(host):
+            async with self.request_slots:
+                yield
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> Optional[FetchResult]:
+        """GET a URL with per-host limits and retries on transient failures"""
+        await self.start()
+        host = urlparse(url).netloc
+        started = time.monotonic()
+        result = await http_fetch(self.session, url, headers, limiter=lambda: self._request_slot(host))
+        if result is None:
+            metrics.increment('content_fetch_total', labels={'host': host, 'status': 'failed'})
+            return None
+        metrics.observe('content_fetch_seconds', time.monotonic() - started, labels={'host': host})
+        metrics.increment('content_fetch_total', labels={'host': host, 'status': str(result.status)})
+        return result
+
+    async def fetch_html(self, url: str) -> Optional[str]:
+        """GET a page and decode it, or None unless it returned 200"""
+        result = await self.fetch(url)
+        if result is None or result.status != 200:
+            return None
+        return result.body.decode(result.encoding or 'utf-8', errors='replace')
+
+    async def fetch_text(self, url: str) -> Optional[str]:
+        """Fetch a page and extract its article text in the worker pool"""
+        html = await self.fetch_html(url)
+        if not html:
+            return None
+        return await run_extraction(extract_page_text, url, html)
+
+    async def fill_content(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Fetch full text for articles with no or summary-only content"""
+        pending = [
+            article for article in articles
+            if len(article.get('content') or '') < realtime_config.content_fetch_min_length
+        ]
+        if not pending:
+            return articles
+
+        texts = await asyncio.gather(
+            *(self.fetch_text(article['url']) for article in pending),
+            return_exceptions=True
+        )
+        for article, text in zip(pending, texts):
+            if isinstance(text, Exception):
+                logger.error(f"Content fetch failed for {article['url']}: {text}")
+                continue
+            if text and len(text) > len(article.get('content') or ''):
+                article['content'] = text
+                article.setdefault('metadata', {})['content_fetched'] = True
+        return articles
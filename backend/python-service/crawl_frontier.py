@@ -0,0 +1,154 @@
+"""
+Crawl frontier for site-wide scraping.
+Per-host priority queues behind a host ready-time heap, so crawl throughput grows with host diversity while each host sees its own politeness delay.
+"""
+
+import heapq
+import itertools
+import logging
+import time
+from typing import Dict, List, Optional, Any, NamedTuple
+from urllib.parse import urlsplit
+
+from config.realtime_config import realtime_config
+from seen_index import normalize_url
+from state_store import StateStore, get_state_store
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE = "crawl_frontier"
+SEEN_NAMESPACE = "crawl_seen"
+
+# Priority is depth first; freshness orders URLs within a depth
+DEPTH_WEIGHT = 1.0
+
+class CrawlRequest(NamedTuple):
+    """A URL waiting in the frontier"""
+    priority: float
+    url: str
+    depth: int
+    kind: str  # 'listing' pages yield links, 'article' pages yield articles
+    source: Dict[str, Any]
+    revisit: bool = False  # Fetched again every crawl, so never recorded as seen
+
+class CrawlFrontier:
+    """Deduplicated per-host priority queues with per-host politeness"""
+
+    def __init__(self, store: Optional[StateStore] = None):
+        self.store = store or get_state_store()
+        self.queues: Dict[str, List[tuple]] = {}
+        # One (ready_at, host) entry per host with queued URLs and no request in flight
+        self.ready: List[tuple] = []
+        self.in_flight: set = set()
+        self.pending: Dict[str, CrawlRequest] = {}
+        self.next_allowed: Dict[str, float] = {}
+        self.delays: Dict[str, float] = {}
+        # URLs crawled successfully, and URLs queued or in flight
+        self.seen: set = set()
+        self.queued: set = set()
+        self._unsaved_seen: List[str] = []
+        self._counter = itertools.count()
+        self.stats = {'added': 0, 'duplicates': 0, 'dispatched': 0}
+        self._restore()
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self.queues.values())
+
+    @property
+    def idle(self) -> bool:
+        """Nothing queued and nothing in flight"""
+        return not self.in_flight and not len(self)
+
+    def add(self, url: str, source: Dict[str, Any], depth: int = 0, kind: str = 'article',
+            freshness: float = 0.0, revisit: bool = False) -> bool:
+        """Queue a URL unless already queued or crawled; freshness in [0, 1] orders URLs of equal depth (0 = newest)"""
+        key = normalize_url(url)
+        if key in self.queued or (not revisit and (key in self.seen or self.store.get(SEEN_NAMESPACE, key))):
+            self.stats['duplicates'] += 1
+            return False
+        self.queued.add(key)
+
+        host = urlsplit(url).netloc.lower()
+        if 'crawl_delay' in source:
+            self.delays[host] = source['crawl_delay']
+        request = CrawlRequest(depth * DEPTH_WEIGHT + min(max(freshness, 0.0), 0.99), url, depth, kind, source, revisit)
+        queue = self.queues.setdefault(host, [])
+        if not queue and host not in self.in_flight:
+            heapq.heappush(self.ready, (self.next_allowed.get(host, 0.0), host))
+        heapq.heappush(queue, (request.priority, next(self._counter), request))
+        self.stats['added'] += 1
+        return True
+
+    def pop_ready(self, now: Optional[float] = None) -> Optional[CrawlRequest]:
+        """Highest-priority URL of the host that became ready first, or None if no host is ready"""
+        now = time.monotonic() if now is None else now
+        while self.ready and self.ready[0][0] <= now:
+            _, host = heapq.heappop(self.ready)
+            _, _, request = heapq.heappop(self.queues[host])
+            # The host is re-armed only when its request finishes, see release()
+            self.in_flight.add(host)
+            self.pending[request.url] = request
+            self.stats['dispatched'] += 1
+            return request
+        return None
+
+    def release(self, url: str, now: Optional[float] = None, succeeded: bool = True):
+        """Mark a request to a host finished and schedule the host's next request; only successes are recorded as seen"""
+        now = time.monotonic() if now is None else now
+        host = urlsplit(url).netloc.lower()
+        request = self.pending.pop(url, None)
+        key = normalize_url(url)
+        self.queued.discard(key)
+        if succeeded and request and not request.revisit:
+            self.seen.add(key)
+            self._unsaved_seen.append(key)
+        self.in_flight.discard(host)
+        self.next_allowed[host] = now + self.delays.get(host, realtime_config.crawl_host_delay)
+        if self.queues.get(host):
+            heapq.heappush(self.ready, (self.next_allowed[host], host))
+
+    def seconds_until_ready(self, now: Optional[float] = None) -> Optional[float]:
+        """Wait until the next host is ready; None when nothing is queued"""
+        now = time.monotonic() if now is None else now
+        if not self.ready:
+            return None
+        return max(self.ready[0][0] - now, 0.0)
+
+    def save(self):
+        """Persist queued and in-flight URLs and newly seen URLs in one transaction"""
+        by_host: Dict[str, List[CrawlRequest]] = {host: [r for _, _, r in sorted(queue)] for host, queue in self.queues.items()}
+        for request in self.pending.values():
+            by_host[urlsplit(request.url).netloc.lower()].insert(0, request)
+        entries = [
+            (NAMESPACE, host, [
+                {'url': r.url, 'depth': r.depth, 'kind': r.kind, 'priority': r.priority, 'source': r.source, 'revisit': r.revisit}
+                for r in requests
+            ], None)
+            for host, requests in by_host.items()
+        ]
+        entries += [(SEEN_NAMESPACE, key, 1, realtime_config.crawl_seen_ttl) for key in self._unsaved_seen]
+        self.store.write_batch(entries)
+        self._unsaved_seen = []
+
+    def _restore(self):
+        restored = 0
+        for host in self.store.keys(NAMESPACE):
+            for item in self.store.get(NAMESPACE, host, []):
+                request = CrawlRequest(item['priority'], item['url'], item['depth'], item['kind'], item['source'],
+                                       item.get('revisit', False))
+                queue = self.queues.setdefault(host, [])
+                if not queue:
+                    heapq.heappush(self.ready, (0.0, host))
+                heapq.heappush(queue, (request.priority, next(self._counter), request))
+                self.queued.add(normalize_url(request.url))
+                restored += 1
+        if restored:
+            logger.info(f"Resuming crawl with {restored} queued URLs across {len(self.queues)} hosts")
+
+    def get_report(self) -> Dict[str, Any]:
+        """Queue sizes and dispatch counts"""
+        return {
+            **self.stats,
+            'queued': len(self),
+            'hosts': len([host for host, queue in self.queues.items() if queue])
+        }
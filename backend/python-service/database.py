@@ -6,9 +6,13 @@ from models import RSSSource, NewsArticle, ProcessingJob, Alert, JobStatus, Sent
 import os
 DATABASE_PATH = os.getenv('DATABASE_PATH', '../.wrangler/state/v3/d1/miniflare-D1DatabaseObject/0a63475064ba0fef38489ee0454cb2d789b28a906ef12161e40ea6ea13385173.sqlite')
 
+# SQLite's default limit on bound parameters is 999
+PARAM_CHUNK = 500
+
 class DatabaseManager:
     def __init__(self, db_path: str = DATABASE_PATH):
         self.db_path = db_path
+        self._indexes_ready = False
         
     def get_connection(self):
         conn = sqlite3.connect(self.db_path)
@@ -85,6 +89,114 @@ class DatabaseManager:
         result = self.execute_query(query, (title, source))
         return result[0]['count'] > 0
     
+    def ensure_ingest_indexes(self, conn: sqlite3.Connection):
+        """Index the (source, title) lookup used for duplicate checks"""
+        if not self._indexes_ready:
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_news_articles_source_title ON news_articles (source, title)")
+            self._indexes_ready = True
+    
+    def _titles_in(self, conn: sqlite3.Connection, source: str, titles: List[str]) -> Dict[str, int]:
+        found = {}
+        for i in range(0, len(titles), PARAM_CHUNK):
+            chunk = titles[i:i + PARAM_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            rows = conn.execute(
+                f"SELECT id, title FROM news_articles WHERE source = ? AND title IN ({placeholders}) ORDER BY id",
+                (source, *chunk)
+            ).fetchall()
+            found.update((row['title'], row['id']) for row in rows)
+        return found
+    
+    def existing_titles(self, source: str, titles: List[str]) -> set:
+        """Titles from one source that are already stored, in one indexed query"""
+        titles = list(dict.fromkeys(titles))
+        if not titles:
+            return set()
+        conn = self.get_connection()
+        try:
+            self.ensure_ingest_indexes(conn)
+            return set(self._titles_in(conn, source, titles))
+        finally:
+            conn.close()
+    
+    def insert_articles_with_jobs(self, articles: List[NewsArticle], job_type: str, source_id: Optional[int]) -> List[int]:
+        """Insert articles and one pending processing job each in a single transaction"""
+        if not articles:
+            return []
+        now = datetime.now().isoformat()
+        article_rows = [(
+            article.title, article.content, article.source, article.source_url,
+            article.language, article.translated_content, article.author,
+            article.publish_date.isoformat() if article.publish_date else now,
+            article.region, article.category, article.sentiment_score,
+            article.sentiment_label.value if article.sentiment_label else None,
+            article.emotions, article.keywords, article.summary, article.entities,
+            article.is_government_related, now, now
+        ) for article in articles]
+        
+        conn = self.get_connection()
+        try:
+            self.ensure_ingest_indexes(conn)
+            with conn:
+                conn.executemany("""
+                INSERT INTO news_articles (
+                    title, content, source, source_url, language, translated_content,
+                    author, publish_date, region, category, sentiment_score, sentiment_label,
+                    emotions, keywords, summary, entities, is_government_related, created_at, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, article_rows)
+                
+                # executemany gives no row ids; read them back through the (source, title) index
+                ids = {}
+                for source in {article.source for article in articles}:
+                    titles = [article.title for article in articles if article.source == source]
+                    ids.update({(source, title): row_id for title, row_id in self._titles_in(conn, source, titles).items()})
+                article_ids = [ids[(article.source, article.title)] for article in articles]
+                
+                conn.executemany(
+                    "INSERT INTO processing_jobs (job_type, status, article_id, source_id, metadata) VALUES (?, ?, ?, ?, ?)",
+                    [(job_type, JobStatus.PENDING.value, article_id, source_id, None) for article_id in article_ids]
+                )
+            return article_ids
+        finally:
+            conn.close()
+    
+    def store_analysis_results(self, articles: List[NewsArticle], failed: List[tuple], alerts: List[Alert],
+                               job_type: str = "analyze_article"):
+        """Write analyzed articles, their job outcomes and alerts in one transaction; failed holds (article_id, error) pairs"""
+        now = datetime.now().isoformat()
+        open_statuses = (JobStatus.PENDING.value, JobStatus.PROCESSING.value)
+        conn = self.get_connection()
+        try:
+            with conn:
+                conn.executemany("""
+                UPDATE news_articles SET
+                    language = ?, translated_content = ?, region = ?, category = ?, sentiment_score = ?,
+                    sentiment_label = ?, keywords = ?, summary = ?, entities = ?, is_government_related = ?, updated_at = ?
+                WHERE id = ?
+                """, [(
+                    article.language, article.translated_content, article.region, article.category,
+                    article.sentiment_score, article.sentiment_label.value if article.sentiment_label else None,
+                    article.keywords, article.summary, article.entities, article.is_government_related, now, article.id
+                ) for article in articles])
+
+                conn.executemany("""
+                UPDATE processing_jobs SET status = ?, completed_at = ?, updated_at = ?, error_message = ?
+                WHERE article_id = ? AND job_type = ? AND status IN (?, ?)
+                """, [
+                    (JobStatus.COMPLETED.value, now, now, None, article.id, job_type, *open_statuses) for article in articles
+                ] + [
+                    (JobStatus.FAILED.value, now, now, error, article_id, job_type, *open_statuses) for article_id, error in failed
+                ])
+
+                conn.executemany(
+                    "INSERT INTO alerts (alert_type, severity, title, content, article_id, threshold_triggered) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(alert.alert_type, alert.severity, alert.title, alert.content, alert.article_id, alert.threshold_triggered)
+                     for alert in alerts]
+                )
+        finally:
+            conn.close()
+
     # Processing Jobs
     def create_processing_job(self, job: ProcessingJob) -> int:
         query = """
@@ -1,6 +1,8 @@
-from sqlalchemy import create_engine, Column, String, Text, DateTime, Integer, Float, Boolean, JSON
+from sqlalchemy import create_engine, event, Index, Column, String, Text, DateTime, Integer, Float, Boolean, JSON
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from datetime import datetime
 import logging
 
@@ -34,6 +36,15 @@ class Article(Base):
     policy_type = Column(String)
     confidence_score = Column(Float, default=0.0)
 
+    # Composite indexes for the hot endpoint queries; existing databases get them from migrations.py
+    __table_args__ = (
+        Index('ix_articles_government_publish_date', 'is_government_related', 'publish_date'),
+        Index('ix_articles_source_title', 'source', 'title'),
+        Index('ix_articles_language_region_publish_date', 'language', 'region', 'publish_date'),
+        Index('ix_articles_region', 'region'),
+        Index('ix_articles_government_source_language', 'is_government_related', 'source', 'language'),
+    )
+
     def __repr__(self):
         return f"<Article(title='{self.title}', source='{self.source}')>"
 
@@ -117,6 +128,24 @@ class SentimentAnalytic(Base):
     def __repr__(self):
         return f"<SentimentAnalytic(date='{self.date.date()}', category='{self.category}', region='{self.region}')>"
 
+class ArticleRollup(Base):
+    __tablename__ = 'article_rollups'
+    # Key order serves the dashboard reads: one dimension, optionally a period range
+    granularity = Column(String, primary_key=True) # 'hour' or 'day'
+    dimension = Column(String, primary_key=True) # 'total', 'source', 'language', 'region', 'department', 'keyword'
+    period_start = Column(DateTime, primary_key=True)
+    is_government_related = Column(Boolean, primary_key=True)
+    value = Column(String, primary_key=True) # '' for the 'total' dimension
+    article_count = Column(Integer, nullable=False, default=0)
+    positive_count = Column(Integer, nullable=False, default=0)
+    negative_count = Column(Integer, nullable=False, default=0)
+    neutral_count = Column(Integer, nullable=False, default=0)
+    sentiment_score_sum = Column(Float, nullable=False, default=0.0)
+    sentiment_score_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ArticleRollup({self.granularity} {self.period_start}, {self.dimension}='{self.value}', count={self.article_count})>"
+
 class GovernmentFeedback(Base):
     __tablename__ = 'government_feedback'
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
@@ -145,9 +174,38 @@ class Alert(Base):
     def __repr__(self):
         return f"<Alert(type='{self.alert_type}', severity='{self.severity}', status='{self.status}')>"
 
+def engine_options(database_url, pool_size=5, max_overflow=10, pool_timeout=30, pool_recycle=1800):
+    """create_engine arguments for a URL: a sized, pre-pinged pool, or thread-safe settings for SQLite"""
+    url = make_url(database_url)
+    if url.get_backend_name() != 'sqlite':
+        return {
+            'pool_size': pool_size,
+            'max_overflow': max_overflow,
+            'pool_timeout': pool_timeout,
+            'pool_recycle': pool_recycle,
+            'pool_pre_ping': True
+        }
+    # Request handlers run in a thread pool, so connections must not be pinned to their creating thread
+    options = {'connect_args': {'check_same_thread': False}}
+    if url.database in (None, '', ':memory:'):
+        # Every connection to :memory: is a separate database; share a single one
+        options['poolclass'] = StaticPool
+    else:
+        options.update(pool_size=pool_size, max_overflow=max_overflow, pool_timeout=pool_timeout)
+    return options
+
 class DatabaseManager:
-    def __init__(self, database_url):
-        self.engine = create_engine(database_url)
+    def __init__(self, database_url, **pool_options):
+        self.engine = create_engine(database_url, **engine_options(database_url, **pool_options))
+        if self.engine.dialect.name == 'sqlite':
+            # WAL lets readers run alongside a writer; busy_timeout waits out the writer instead of failing
+            @event.listens_for(self.engine, "connect")
+            def _set_sqlite_pragmas(dbapi_connection, connection_record):
+                cursor = dbapi_connection.cursor()
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute("PRAGMA synchronous=NORMAL")
+                cursor.execute("PRAGMA busy_timeout=5000")
+                cursor.close()
         self.Session = sessionmaker(bind=self.engine)
         logging.info(f"DatabaseManager initialized for {database_url}")
 
@@ -0,0 +1,60 @@
+"""
+Bounded feed parsing for the real-time collector.
+Cuts feeds down to the newest entries before feedparser sees them and runs parsing in the extraction pool.
+"""
+
+import logging
+import re
+from types import SimpleNamespace
+from typing import List
+
+import feedparser
+
+from html_extractor import run_extraction
+
+logger = logging.getLogger(__name__)
+
+# Fields the collector reads from an entry; everything else stays in the worker
+ENTRY_FIELDS = ('title', 'link', 'id', 'summary', 'published_parsed', 'updated_parsed')
+
+_ENTRY_END = re.compile(rb'</(?:\w+:)?(item|entry)\s*>', re.IGNORECASE)
+_ROOT_START = re.compile(rb'<(?:\w+:)?(rss|feed|rdf:RDF)[\s>]', re.IGNORECASE)
+
+def truncate_feed(body: bytes, max_entries: int) -> bytes:
+    """Drop everything after the Nth entry, closing the document so it still parses"""
+    end = None
+    for count, match in enumerate(_ENTRY_END.finditer(body), start=1):
+        if count == max_entries:
+            end = match.end()
+            break
+    if end is None:
+        return body
+
+    root = _ROOT_START.search(body)
+    if root is None:
+        return body
+    name = root.group(1).decode()
+    closing = {'rss': b'</channel></rss>', 'feed': b'</feed>'}.get(name.lower(), b'</rdf:RDF>')
+    return body[:end] + closing
+
+def parse_feed(body: bytes, max_entries: int) -> List[SimpleNamespace]:
+    """Parse at most max_entries entries into plain, picklable entry objects"""
+    feed = feedparser.parse(truncate_feed(body, max_entries))
+    if feed.bozo and not feed.entries:
+        logger.debug(f"Feed did not parse: {feed.get('bozo_exception')}")
+    return [
+        SimpleNamespace(**{field: entry.get(field) for field in ENTRY_FIELDS if entry.get(field) is not None})
+        for entry in feed.entries[:max_entries]
+    ]
+
+def parse_feed_entries(body: bytes, max_entries: int) -> list:
+    """Parse at most max_entries full feedparser entries (for collectors that read every field)"""
+    return feedparser.parse(truncate_feed(body, max_entries)).entries[:max_entries]
+
+async def parse_feed_async(body: bytes, max_entries: int) -> List[SimpleNamespace]:
+    """Parse a feed in the extraction pool"""
+    return await run_extraction(parse_feed, body, max_entries)
+
+async def parse_feed_entries_async(body: bytes, max_entries: int) -> list:
+    """Parse full feed entries in the extraction pool"""
+    return await run_extraction(parse_feed_entries, body, max_entries)
@@ -0,0 +1,197 @@
+"""
+HTML extraction engine for listing pages and article bodies.
+Uses lxml with per-source selectors compiled once to XPath; falls back to BeautifulSoup when lxml is unavailable.
+"""
+
+import asyncio
+import logging
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+try:
+    from cssselect import HTMLTranslator, SelectorError
+    CSSSELECT_AVAILABLE = True
+except ImportError:
+    CSSSELECT_AVAILABLE = False
+    SelectorError = ValueError
+
+from config.realtime_config import realtime_config
+
+logger = logging.getLogger(__name__)
+
+# Parser name for code that still needs a BeautifulSoup tree
+BS_PARSER = 'lxml' if LXML_AVAILABLE else 'html.parser'
+
+UNWANTED_TAGS = ('script', 'style', 'nav', 'header', 'footer', 'aside', 'noscript')
+
+# Containers tried in order when a page has no source-specific content selector
+ARTICLE_BODY_SELECTORS = (
+    'article', '.article-content', '.story-content', '.entry-content',
+    '.post-content', '.content', 'main'
+)
+
+_SIMPLE_COMPOUND = re.compile(r'^([a-zA-Z][\w-]*|\*)?((?:[.#][\w-]+)*)$')
+
+def _simple_css_to_xpath(selector: str) -> str:
+    """Translate tag/.class/#id descendant selectors (all our configs use) without cssselect"""
+    groups = []
+    for group in selector.split(','):
+        steps = []
+        for compound in group.split():
+            match = _SIMPLE_COMPOUND.match(compound)
+            if not match:
+                raise ValueError(f"Unsupported selector: {selector}")
+            tag, qualifiers = match.group(1) or '*', match.group(2)
+            predicates = []
+            for kind, name in re.findall(r'([.#])([\w-]+)', qualifiers):
+                if kind == '.':
+                    predicates.append(f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')")
+                else:
+                    predicates.append(f"@id='{name}'")
+            steps.append(tag + ''.join(f'[{p}]' for p in predicates))
+        groups.append('descendant::' + '/descendant::'.join(steps) if steps else '')
+    return ' | '.join(g for g in groups if g)
+
+@lru_cache(maxsize=256)
+def compile_selector(selector: str):
+    """Compile a CSS selector to an lxml XPath evaluator (cached per process)"""
+    if CSSSELECT_AVAILABLE:
+        expression = HTMLTranslator().css_to_xpath(selector, prefix='descendant::')
+    else:
+        expression = _simple_css_to_xpath(selector)
+    return etree.XPath(expression)
+
+def _select_one(node, selector: str):
+    matches = compile_selector(selector)(node)
+    return matches[0] if matches else None
+
+def _clean_text(text: str) -> str:
+    return re.sub(r'\s+', ' ', text).strip()
+
+def _parse(html: str):
+    # Parse from bytes so pages carrying an XML encoding declaration are accepted
+    parser = lxml.html.HTMLParser(encoding='utf-8', remove_comments=True)
+    return lxml.html.document_fromstring(html.encode('utf-8'), parser=parser)
+
+def extract_listing(html: str, base_url: str, selectors: Dict[str, str], limit: int = 5) -> List[Dict[str, Any]]:
+    """Extract title, URL and date text of the newest items on a listing page"""
+    if LXML_AVAILABLE:
+        try:
+            return _extract_listing_lxml(html, base_url, selectors, limit)
+        except (ValueError, SelectorError, etree.XPathError) as e:
+            logger.debug(f"Falling back to BeautifulSoup: {e}")
+    return _extract_listing_bs4(html, base_url, selectors, limit)
+
+def _extract_listing_lxml(html: str, base_url: str, selectors: Dict[str, str], limit: int) -> List[Dict[str, Any]]:
+    root = _parse(html)
+    containers = compile_selector(selectors.get('article_container', 'article'))(root)
+    title_selector = selectors.get('title', 'h1, h2, .title')
+    date_selector = selectors.get('publish_date', 'time, .date')
+
+    items = []
+    for container in containers[:limit]:
+        title_elem = _select_one(container, title_selector)
+        # Descendant links only, matching BeautifulSoup's find('a', href=True)
+        links = container.xpath('.//a[@href]')
+        date_elem = _select_one(container, date_selector)
+        items.append({
+            'title': title_elem.text_content().strip() if title_elem is not None else '',
+            'url': urljoin(base_url, links[0].get('href')) if links else '',
+            'date_text': (date_elem.text_content() or date_elem.get('datetime', '')) if date_elem is not None else ''
+        })
+    return items
+
+def _extract_listing_bs4(html: str, base_url: str, selectors: Dict[str, str], limit: int) -> List[Dict[str, Any]]:
+    soup = BeautifulSoup(html, BS_PARSER)
+    items = []
+    for container in soup.select(selectors.get('article_container', 'article'))[:limit]:
+        title_elem = container.select_one(selectors.get('title', 'h1, h2, .title'))
+        link_elem = container.find('a', href=True)
+        date_elem = container.select_one(selectors.get('publish_date', 'time, .date'))
+        items.append({
+            'title': title_elem.get_text().strip() if title_elem else '',
+            'url': urljoin(base_url, link_elem['href']) if link_elem else '',
+            'date_text': (date_elem.get_text() or date_elem.get('datetime', '')) if date_elem else ''
+        })
+    return items
+
+def html_to_text(html: str) -> str:
+    """Plain text of an HTML fragment with scripts and styles removed"""
+    if not html:
+        return ""
+    if LXML_AVAILABLE:
+        try:
+            root = _parse(html)
+        except (etree.ParserError, ValueError):
+            return _clean_text(html)
+        etree.strip_elements(root, 'script', 'style', with_tail=False)
+        return _clean_text(root.text_content())
+
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup(['script', 'style']):
+        tag.decompose()
+    return _clean_text(soup.get_text(' '))
+
+def extract_article_text(html: str, selectors: Tuple[str, ...] = ARTICLE_BODY_SELECTORS,
+                         min_length: int = 200) -> Optional[str]:
+    """Main text of an article page: first substantial body container, else all paragraphs"""
+    if LXML_AVAILABLE:
+        try:
+            root = _parse(html)
+        except (etree.ParserError, ValueError):
+            return None
+        etree.strip_elements(root, *UNWANTED_TAGS, with_tail=False)
+        for selector in selectors:
+            elem = _select_one(root, selector)
+            if elem is not None:
+                text = _clean_text(elem.text_content())
+                if len(text) > min_length:
+                    return text
+        paragraphs = [_clean_text(p.text_content()) for p in root.iter('p')]
+    else:
+        soup = BeautifulSoup(html, 'html.parser')
+        for tag in soup(list(UNWANTED_TAGS)):
+            tag.decompose()
+        for selector in selectors:
+            elem = soup.select_one(selector)
+            if elem:
+                text = _clean_text(elem.get_text(' '))
+                if len(text) > min_length:
+                    return text
+        paragraphs = [_clean_text(p.get_text(' ')) for p in soup.find_all('p')]
+
+    text = '\n'.join(p for p in paragraphs if p)
+    return text or None
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+def get_extraction_pool() -> ProcessPoolExecutor:
+    """Process pool for parsing so large pages never block the event loop"""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=realtime_config.extraction_workers)
+    return _pool
+
+async def run_extraction(func, *args):
+    """Run an extraction function in the worker pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_extraction_pool(), func, *args)
+
+def shutdown_extraction_pool():
+    """Stop the worker pool"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,375 @@
+"""
+Shared HTTP client layer for all collectors.
+Tuned pooled sessions (aiohttp, or httpx for HTTP/2 when enabled) plus a pooled requests session, with size caps, one retry policy and per-host reuse/TTFB stats.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Dict, Optional, Any, Callable, Mapping, NamedTuple, Iterator, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+import requests
+from multidict import CIMultiDict, CIMultiDictProxy
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+    import h2  # noqa: F401  (httpx only negotiates HTTP/2 when h2 is installed)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+from config.realtime_config import realtime_config
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+TTFB_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class FetchResult(NamedTuple):
+    status: int
+    headers: Mapping[str, str]
+    body: bytes
+    encoding: Optional[str]
+
+class ResponseTooLarge(requests.RequestException):
+    """Raised by the sync session when a body exceeds http_max_response_bytes"""
+
+class PayloadTooLarge(aiohttp.ClientPayloadError):
+    """Raised by the async sessions when a body exceeds http_max_response_bytes"""
+
+class HostStats:
+    """Requests, connection reuse and time to first byte per host"""
+
+    def __init__(self):
+        self.hosts: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, host: str, ttfb: float, reused: Optional[bool]):
+        with self._lock:
+            stats = self.hosts.setdefault(host, {'requests': 0, 'reused': 0, 'new': 0, 'ttfb_total': 0.0})
+            stats['requests'] += 1
+            stats['ttfb_total'] += ttfb
+            if reused is not None:
+                stats['reused' if reused else 'new'] += 1
+        metrics.observe('http_ttfb_seconds', ttfb, labels={'host': host}, buckets=TTFB_BUCKETS)
+        if reused is not None:
+            metrics.increment('http_connections_total', labels={'host': host, 'reused': str(reused).lower()})
+
+    def get_report(self) -> Dict[str, Dict[str, Any]]:
+        """Connection reuse rate and average time to first byte per host"""
+        with self._lock:
+            return {
+                host: {
+                    'requests': int(stats['requests']),
+                    'reuse_rate': round(stats['reused'] / (stats['reused'] + stats['new']), 3)
+                    if stats['reused'] + stats['new'] else None,
+                    'avg_ttfb_ms': round(stats['ttfb_total'] / stats['requests'] * 1000, 1)
+                }
+                for host, stats in self.hosts.items()
+            }
+
+host_stats = HostStats()
+
+def retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Backoff before the next attempt: Retry-After when given in seconds, else exponential with jitter"""
+    if retry_after and retry_after.isdigit():
+        return float(retry_after)
+    return 2 ** attempt + random.uniform(0, 0.5)
+
+def _check_declared_length(length: Optional[int], url: str, limit: int):
+    if length is not None and length > limit:
+        raise ValueError(f"{url} declares {length} bytes, over the {limit} byte cap")
+
+def _cap_chunk(size: int, url: str, limit: int):
+    if size > limit:
+        raise ValueError(f"{url} exceeded the {limit} byte cap")
+
+# Async sessions
+
+class CappedResponse(aiohttp.ClientResponse):
+    """aiohttp response whose body is read in chunks and refused past http_max_response_bytes"""
+
+    async def read(self) -> bytes:
+        if self._body is None:
+            limit = realtime_config.http_max_response_bytes
+            chunks = []
+            size = 0
+            try:
+                _check_declared_length(self.content_length, str(self.url), limit)
+                async for chunk in self.content.iter_chunked(64 * 1024):
+                    size += len(chunk)
+                    _cap_chunk(size, str(self.url), limit)
+                    chunks.append(chunk)
+            except ValueError as e:
+                self.close()
+                raise PayloadTooLarge(str(e)) from e
+            self._body = b''.join(chunks)
+        return await super().read()
+
+def _trace_config() -> aiohttp.TraceConfig:
+    """Time to first byte and connection reuse for every aiohttp request"""
+    async def on_request_start(session, ctx, params):
+        ctx.started = time.monotonic()
+        ctx.reused = None
+
+    async def on_connection_create_end(session, ctx, params):
+        ctx.reused = False
+
+    async def on_connection_reuseconn(session, ctx, params):
+        ctx.reused = True
+
+    async def on_request_end(session, ctx, params):
+        # Fired once the response headers have arrived
+        host_stats.record(params.url.host or '', time.monotonic() - ctx.started, ctx.reused)
+
+    trace = aiohttp.TraceConfig()
+    trace.on_request_start.append(on_request_start)
+    trace.on_connection_create_end.append(on_connection_create_end)
+    trace.on_connection_reuseconn.append(on_connection_reuseconn)
+    trace.on_request_end.append(on_request_end)
+    return trace
+
+class RequestContext:
+    """Awaitable async context manager, like the object aiohttp's session.get returns"""
+
+    def __init__(self, coro):
+        self._coro = coro
+
+    def __await__(self):
+        return self._coro.__await__()
+
+    async def __aenter__(self):
+        return await self._coro
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+class Http2Response:
+    """Buffered httpx response exposing the aiohttp.ClientResponse subset the collectors use"""
+
+    def __init__(self, url: str, status: int, headers: CIMultiDictProxy, body: bytes):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self._body = body
+
+    async def read(self) -> bytes:
+        return self._body
+
+    def get_encoding(self) -> str:
+        content_type = self.headers.get('Content-Type', '')
+        if 'charset=' in content_type:
+            return content_type.split('charset=')[-1].split(';')[0].strip()
+        return 'utf-8'
+
+    async def text(self, encoding: Optional[str] = None, errors: str = 'strict') -> str:
+        return self._body.decode(encoding or self.get_encoding(), errors=errors)
+
+    def release(self):
+        pass
+
+class Http2Session:
+    """httpx-backed session with aiohttp's get() interface; HTTP/2 is negotiated via ALPN, without per-host limits or DNS caching"""
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None):
+        self.client = httpx.AsyncClient(
+            http2=True,
+            headers=headers,
+            follow_redirects=True,
+            timeout=timeout or realtime_config.request_timeout,
+            limits=httpx.Limits(
+                max_connections=realtime_config.http_pool_limit,
+                max_keepalive_connections=realtime_config.http_pool_limit,
+                keepalive_expiry=realtime_config.http_keepalive_timeout
+            )
+        )
+
+    @property
+    def closed(self) -> bool:
+        return self.client.is_closed
+
+    def get(self, url, headers: Optional[Dict[str, str]] = None, timeout=None, **kwargs) -> RequestContext:
+        return RequestContext(self._get(str(url), headers, getattr(timeout, 'total', timeout)))
+
+    async def _get(self, url: str, headers: Optional[Dict[str, str]], timeout: Optional[float]) -> Http2Response:
+        connected = []
+
+        async def trace(event: str, info: Dict[str, Any]):
+            if event == 'connection.connect_tcp.started':
+                connected.append(True)
+
+        started = time.monotonic()
+        limit = realtime_config.http_max_response_bytes
+        kwargs = {'timeout': timeout} if timeout else {}
+        try:
+            async with self.client.stream('GET', url, headers=headers, extensions={'trace': trace}, **kwargs) as response:
+                host_stats.record(urlsplit(url).hostname or '', time.monotonic() - started, not connected)
+                declared = response.headers.get('Content-Length')
+                _check_declared_length(int(declared) if declared and declared.isdigit() else None, url, limit)
+                chunks = []
+                size = 0
+                async for chunk in response.aiter_bytes():
+                    size += len(chunk)
+                    _cap_chunk(size, url, limit)
+                    chunks.append(chunk)
+        # Callers handle aiohttp's exception types, so translate httpx's
+        except httpx.TimeoutException as e:
+            raise asyncio.TimeoutError(str(e)) from e
+        except ValueError as e:
+            raise PayloadTooLarge(str(e)) from e
+        except httpx.HTTPError as e:
+            raise aiohttp.ClientConnectionError(str(e)) from e
+
+        # Bodies are already decompressed, so drop the headers describing the wire encoding
+        headers = CIMultiDict(
+            (key, value) for key, value in response.headers.multi_items()
+            if key.lower() not in ('content-encoding', 'content-length')
+        )
+        return Http2Response(url, response.status_code, CIMultiDictProxy(headers), b''.join(chunks))
+
+    async def close(self):
+        await self.client.aclose()
+
+def create_session(headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None):
+    """Pooled async session for collectors: tuned aiohttp, or HTTP/2-capable httpx when http2_enabled"""
+    headers = {'Accept-Encoding': ACCEPT_ENCODING, **(headers or {})}
+    if realtime_config.http2_enabled and HTTP2_AVAILABLE:
+        return Http2Session(headers=headers, timeout=timeout)
+
+    connector = aiohttp.TCPConnector(
+        limit=realtime_config.http_pool_limit,
+        limit_per_host=realtime_config.http_pool_limit_per_host,
+        ttl_dns_cache=realtime_config.http_dns_ttl,
+        keepalive_timeout=realtime_config.http_keepalive_timeout,
+        enable_cleanup_closed=True
+    )
+    return aiohttp.ClientSession(
+        headers=headers,
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=timeout or realtime_config.request_timeout),
+        response_class=CappedResponse,
+        trace_configs=[_trace_config()],
+        auto_decompress=True
+    )
+
+async def fetch(session, url: str, headers: Optional[Dict[str, str]] = None,
+                limiter: Optional[Callable[[], Any]] = None) -> Optional[FetchResult]:
+    """GET with the shared retry policy; limiter() returns an async context entered around each attempt"""
+    attempts = realtime_config.http_retries + 1
+    for attempt in range(attempts):
+        retry_after = None
+        try:
+            if limiter:
+                async with limiter():
+                    result, retry_after = await _fetch_once(session, url, headers)
+            else:
+                result, retry_after = await _fetch_once(session, url, headers)
+            if result is not None:
+                return result
+        except PayloadTooLarge as e:
+            # The same body would be refused again
+            logger.warning(str(e))
+            return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.debug(f"Fetch attempt {attempt + 1} failed for {url}: {e}")
+
+        if attempt < attempts - 1:
+            await asyncio.sleep(retry_delay(attempt, retry_after))
+
+    logger.warning(f"Giving up fetching {url} after {attempts} attempts")
+    return None
+
+async def _fetch_once(session, url: str, headers: Optional[Dict[str, str]]) -> Tuple[Optional[FetchResult], Optional[str]]:
+    """(result, None), or (None, Retry-After) for a retryable status"""
+    async with session.get(url, headers=headers) as response:
+        if response.status in RETRY_STATUSES:
+            return None, response.headers.get('Retry-After')
+        body = await response.read() if response.status == 200 else b''
+        return FetchResult(response.status, response.headers, body, response.get_encoding() if body else None), None
+
+# Sync session
+
+class PooledSession(requests.Session):
+    """requests session with tuned pools, the shared retry policy, a body size cap and per-host stats"""
+
+    def __init__(self):
+        super().__init__()
+        adapter = HTTPAdapter(
+            pool_connections=realtime_config.http_pool_limit,
+            pool_maxsize=realtime_config.http_pool_limit_per_host,
+            max_retries=0  # Retries follow the shared policy in request()
+        )
+        self.mount('http://', adapter)
+        self.mount('https://', adapter)
+        self.headers['Accept-Encoding'] = ACCEPT_ENCODING
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', realtime_config.request_timeout)
+        kwargs.pop('stream', None)
+        attempts = realtime_config.http_retries + 1
+        for attempt in range(attempts):
+            pool = self.get_adapter(url).poolmanager.connection_from_url(url)
+            connections_before = pool.num_connections
+            started = time.monotonic()
+            try:
+                response = super().request(method, url, stream=True, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == attempts - 1:
+                    raise
+                time.sleep(retry_delay(attempt))
+                continue
+            host_stats.record(urlsplit(url).hostname or '', time.monotonic() - started,
+                              pool.num_connections == connections_before)
+
+            if response.status_code in RETRY_STATUSES and attempt < attempts - 1:
+                delay = retry_delay(attempt, response.headers.get('Retry-After'))
+                response.close()
+                time.sleep(delay)
+                continue
+
+            try:
+                response._content = b''.join(self._read_capped(response, url))
+            except ValueError as e:
+                response.close()
+                raise ResponseTooLarge(str(e), response=response) from e
+            response._content_consumed = True
+            return response
+
+    @staticmethod
+    def _read_capped(response: requests.Response, url: str) -> Iterator[bytes]:
+        limit = realtime_config.http_max_response_bytes
+        declared = response.headers.get('Content-Length')
+        _check_declared_length(int(declared) if declared and declared.isdigit() else None, url, limit)
+        size = 0
+        for chunk in response.iter_content(64 * 1024):
+            size += len(chunk)
+            _cap_chunk(size, url, limit)
+            yield chunk
+
+_sync_session: Optional[PooledSession] = None
+_sync_lock = threading.Lock()
+
+def get_sync_session() -> PooledSession:
+    """Process-wide pooled session for the blocking collectors"""
+    global _sync_session
+    with _sync_lock:
+        if _sync_session is None:
+            _sync_session = PooledSession()
+    return _sync_session
+
+def get_report() -> Dict[str, Dict[str, Any]]:
+    """Per-host connection reuse and time to first byte across all shared clients"""
+    return host_stats.get_report()
@@ -0,0 +1,163 @@
+"""
+Record-and-replay HTTP fixtures for offline collector benchmarking.
+RecordingSession captures live responses into a gzip JSONL archive; ReplaySession serves them as an aiohttp stand-in.
+"""
+
+import asyncio
+import base64
+import gzip
+import json
+import logging
+import random
+import time
+from typing import Dict, List, Optional, Any
+
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+
+from http_client import RequestContext
+
+logger = logging.getLogger(__name__)
+
+class FixtureArchive:
+    """Recorded responses keyed by URL, plus the source list they were recorded for"""
+
+    def __init__(self, sources: Optional[List[Dict[str, Any]]] = None):
+        self.sources: List[Dict[str, Any]] = sources or []
+        self.responses: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, url: str, status: int, headers: Dict[str, str], body: bytes, elapsed: float):
+        self.responses[url] = {
+            'url': url,
+            'status': status,
+            'headers': headers,
+            'body': body,
+            'elapsed': round(elapsed, 4)
+        }
+
+    def save(self, path: str):
+        """Write the archive as gzip-compressed JSON lines"""
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            f.write(json.dumps({'type': 'meta', 'sources': self.sources}) + '\n')
+            for response in self.responses.values():
+                f.write(json.dumps({
+                    'type': 'response',
+                    **response,
+                    'body': base64.b64encode(response['body']).decode('ascii')
+                }) + '\n')
+        logger.info(f"Saved {len(self.responses)} responses for {len(self.sources)} sources to {path}")
+
+    @classmethod
+    def load(cls, path: str) -> 'FixtureArchive':
+        archive = cls()
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                if record['type'] == 'meta':
+                    archive.sources = record['sources']
+                else:
+                    record['body'] = base64.b64decode(record['body'])
+                    archive.responses[record['url']] = record
+        return archive
+
+class FixtureResponse:
+    """The subset of aiohttp.ClientResponse the collectors use"""
+
+    def __init__(self, url: str, status: int, headers: Dict[str, str], body: bytes):
+        self.url = url
+        self.status = status
+        self.headers = CIMultiDictProxy(CIMultiDict(headers))
+        self._body = body
+
+    async def read(self) -> bytes:
+        return self._body
+
+    def get_encoding(self) -> str:
+        content_type = self.headers.get('Content-Type', '')
+        if 'charset=' in content_type:
+            return content_type.split('charset=')[-1].split(';')[0].strip()
+        return 'utf-8'
+
+    async def text(self, encoding: Optional[str] = None, errors: str = 'strict') -> str:
+        return self._body.decode(encoding or self.get_encoding(), errors=errors)
+
+    def release(self):
+        pass
+
+def _replay(record: Dict[str, Any], headers: Dict[str, str]) -> FixtureResponse:
+    """Recorded response, or 304 when the request's validators match it"""
+    recorded_headers = CIMultiDict(record['headers'])
+    etag = recorded_headers.get('ETag')
+    last_modified = recorded_headers.get('Last-Modified')
+    if (etag and headers.get('If-None-Match') == etag) or \
+            (last_modified and headers.get('If-Modified-Since') == last_modified):
+        return FixtureResponse(record['url'], 304, record['headers'], b'')
+    return FixtureResponse(record['url'], record['status'], record['headers'], record['body'])
+
+class ReplaySession:
+    """aiohttp.ClientSession stand-in serving an archive with injected latency and failures"""
+
+    def __init__(self, archive: FixtureArchive, latency: Optional[float] = None, latency_scale: float = 1.0,
+                 failure_rate: float = 0.0, error_status: int = 503, seed: int = 0, **session_kwargs):
+        self.archive = archive
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self.failure_rate = failure_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.closed = False
+        self.requests = 0
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, **kwargs) -> RequestContext:
+        return RequestContext(self._respond(str(url), headers or {}))
+
+    async def _respond(self, url: str, headers: Dict[str, str]) -> FixtureResponse:
+        self.requests += 1
+        record = self.archive.responses.get(url)
+        delay = self.latency if self.latency is not None else (record['elapsed'] if record else 0.0)
+        await asyncio.sleep(delay * self.latency_scale)
+
+        if self.failure_rate and self.random.random() < self.failure_rate:
+            # Half the injected failures are connection errors, half are server errors
+            if self.random.random() < 0.5:
+                raise aiohttp.ClientConnectionError(f"Injected failure for {url}")
+            return FixtureResponse(url, self.error_status, {}, b'')
+
+        if record is None:
+            return FixtureResponse(url, 404, {}, b'')
+        return _replay(record, headers)
+
+    async def close(self):
+        self.closed = True
+
+class RecordingSession:
+    """Real aiohttp session that records every response it returns"""
+
+    def __init__(self, archive: FixtureArchive, **session_kwargs):
+        self.archive = archive
+        self.session = aiohttp.ClientSession(**session_kwargs)
+
+    @property
+    def closed(self) -> bool:
+        return self.session.closed
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, **kwargs) -> RequestContext:
+        return RequestContext(self._record(str(url), headers, kwargs))
+
+    async def _record(self, url: str, headers: Optional[Dict[str, str]], kwargs: Dict[str, Any]) -> FixtureResponse:
+        # Record unconditional responses so replay can answer both full and conditional requests
+        request_headers = {
+            k: v for k, v in (headers or {}).items() if k not in ('If-None-Match', 'If-Modified-Since')
+        }
+        started = time.monotonic()
+        async with self.session.get(url, headers=request_headers, **kwargs) as response:
+            body = await response.read()
+            response_headers = {
+                k: v for k, v in response.headers.items()
+                if k.lower() not in ('content-encoding', 'transfer-encoding', 'content-length', 'set-cookie')
+            }
+            self.archive.add(url, response.status, response_headers, body, time.monotonic() - started)
+        return _replay(self.archive.responses[url], headers or {})
+
+    async def close(self):
+        await self.session.close()
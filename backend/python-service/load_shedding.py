@@ -0,0 +1,81 @@
+"""
+Load shedding for the NLP workers.
+Steps processing down through degradation levels as queue backlog grows and back up as it clears.
+"""
+
+import logging
+import time
+from typing import Dict, List, Tuple, Any
+
+from config.realtime_config import realtime_config
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Stages skipped at each degradation level (level 0 = full processing)
+DEGRADATION_LEVELS: List[Tuple[str, ...]] = [
+    (),
+    ('summarization',),
+    ('summarization', 'ner'),
+    ('summarization', 'ner', 'government_classifier'),
+]
+
+class LoadShedder:
+    """Chooses which NLP stages to skip based on queue backlog"""
+
+    def __init__(self, queue_manager):
+        self.queue_manager = queue_manager
+        self.level = 0
+        self.backlog = 0
+        self.last_check = 0.0
+
+    def _target_level(self, backlog: int) -> int:
+        """Degradation level for a backlog, with hysteresis when stepping back up"""
+        thresholds = realtime_config.degradation_backlog_thresholds
+        level = min(sum(1 for threshold in thresholds if backlog >= threshold), len(DEGRADATION_LEVELS) - 1)
+
+        # Only recover once backlog is well below the threshold that triggered the current level
+        if level < self.level:
+            if backlog > thresholds[self.level - 1] * realtime_config.degradation_recovery_ratio:
+                return self.level
+        return level
+
+    async def update(self) -> int:
+        """Refresh backlog from queue stats and adjust the degradation level"""
+        now = time.monotonic()
+        if now - self.last_check < realtime_config.backpressure_check_interval:
+            return self.level
+        self.last_check = now
+
+        stats = await self.queue_manager.get_queue_stats()
+        if not stats:
+            return self.level
+
+        self.backlog = stats.get('backlog', 0)
+        new_level = self._target_level(self.backlog)
+        if new_level != self.level:
+            direction = 'down' if new_level > self.level else 'up'
+            log = logger.warning if direction == 'down' else logger.info
+            log(
+                f"NLP degradation level {self.level} -> {new_level} at backlog {self.backlog} "
+                f"(skipping: {', '.join(DEGRADATION_LEVELS[new_level]) or 'nothing'})"
+            )
+            metrics.increment('nlp_degradation_changes_total', labels={'direction': direction})
+            self.level = new_level
+
+        metrics.set_gauge('nlp_degradation_level', self.level)
+        return self.level
+
+    @property
+    def skip_stages(self) -> Tuple[str, ...]:
+        """Stages to skip at the current level"""
+        return DEGRADATION_LEVELS[self.level]
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get current load shedding state"""
+        return {
+            'level': self.level,
+            'backlog': self.backlog,
+            'skipped_stages': list(self.skip_stages),
+            'thresholds': realtime_config.degradation_backlog_thresholds
+        }
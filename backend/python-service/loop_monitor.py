@@ -0,0 +1,60 @@
+"""
+Event-loop lag monitor for the real-time system.
+Measures how late a periodic timer fires so blocking work on the loop shows up in metrics.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Any
+
+from config.realtime_config import realtime_config
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+class EventLoopMonitor:
+    """Samples event-loop scheduling lag at a fixed interval"""
+
+    def __init__(self):
+        self.running = False
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.slow_ticks = 0
+
+    async def run(self):
+        """Sample lag until stopped"""
+        self.running = True
+        interval = realtime_config.loop_lag_check_interval
+        while self.running:
+            started = time.monotonic()
+            await asyncio.sleep(interval)
+            lag = max(time.monotonic() - started - interval, 0.0)
+
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            metrics.observe('event_loop_lag_seconds', lag, buckets=LAG_BUCKETS)
+            metrics.set_gauge('event_loop_lag_last_seconds', round(lag, 4))
+
+            if lag > realtime_config.loop_lag_warn_threshold:
+                self.slow_ticks += 1
+                logger.warning(f"Event loop blocked for {lag * 1000:.0f} ms")
+
+    def stop(self):
+        """Stop sampling"""
+        self.running = False
+
+    def get_status(self) -> Dict[str, Any]:
+        """Latest, worst and percentile lag"""
+        histogram = metrics.snapshot('event_loop_lag_seconds')['histograms'].get('event_loop_lag_seconds', {})
+        return {
+            'last_lag_ms': round(self.last_lag * 1000, 1),
+            'max_lag_ms': round(self.max_lag * 1000, 1),
+            'p99_lag_ms': round(histogram['p99'] * 1000, 1) if histogram.get('p99') is not None else None,
+            'slow_ticks': self.slow_ticks
+        }
+
+# Global monitor instance
+loop_monitor = EventLoopMonitor()
@@ -27,7 +27,9 @@ Topic = database_models.Topic
 SentimentAnalytic = database_models.SentimentAnalytic
 GovernmentFeedback = database_models.GovernmentFeedback
 Alert = database_models.Alert
-from api.endpoints import router as api_router, get_db
+from api.endpoints import router as api_router, get_db, init_db
+from migrations import migrate
+from rollups import article_values, backfill_if_empty, load_previous, update_rollups
 
 # Collectors
 from collectors.rss_collector import RSSCollector
@@ -104,9 +106,11 @@ async def startup_event():
     settings = get_settings()
     logger.info(f"Starting up NewsScope India Backend in {settings.environment} environment.")
 
-    # Initialize Database
-    db_manager = DatabaseManager(settings.database_url)
+    # Initialize Database: the shared engine the API endpoints also use
+    db_manager = init_db()
     db_manager.create_all_tables()
+    migrate(db_manager.engine)
+    backfill_if_empty(db_manager.engine)
     logger.info("Database tables checked/created.")
 
     # Initialize NLP Pipeline components
@@ -219,7 +223,11 @@ async def process_article_data(article_data: Dict[str, Any], db: Session = Depen
             keywords=article_data.get('keywords'),
             topics=article_data.get('topics')
         )
+        # Dashboards read the rollups, so they are updated in the same transaction as the article
+        previous = load_previous(db.connection(), [db_article.url])
         db.add(db_article)
+        db.flush()
+        update_rollups(db.connection(), previous, [article_values(db_article)])
         db.commit()
         db.refresh(db_article)
 
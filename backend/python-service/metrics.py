@@ -0,0 +1,114 @@
+"""
+In-process metrics registry for the real-time news pipeline.
+Collects counters, gauges and histograms that are exposed through the system status.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Any, Optional, Sequence
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+class Histogram:
+    """Fixed-bucket histogram with running count and sum"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        """Record a single observation"""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile from bucket upper bounds"""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else float('inf')
+        return float('inf')
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get histogram state as a plain dict"""
+        return {
+            'count': self.count,
+            'sum': round(self.total, 6),
+            'avg': round(self.total / self.count, 6) if self.count else None,
+            'p50': self.quantile(0.5),
+            'p99': self.quantile(0.99),
+            'buckets': {str(b): c for b, c in zip(list(self.buckets) + ['+Inf'], self.counts)}
+        }
+
+class MetricsRegistry:
+    """Thread-safe registry of named counters, gauges and histograms"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self.started_at = time.time()
+
+    @staticmethod
+    def _key(name: str, labels: Optional[Dict[str, Any]]) -> str:
+        if not labels:
+            return name
+        label_str = ','.join(f"{k}={labels[k]}" for k in sorted(labels))
+        return f"{name}{{{label_str}}}"
+
+    def increment(self, name: str, value: float = 1, labels: Optional[Dict[str, Any]] = None):
+        """Increment a counter"""
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None):
+        """Set a gauge to an absolute value"""
+        key = self._key(name, labels)
+        with self._lock:
+            self.gauges[key] = value
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None,
+                buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """Record a histogram observation"""
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def get_counter(self, name: str, labels: Optional[Dict[str, Any]] = None) -> float:
+        """Get current counter value"""
+        return self.counters.get(self._key(name, labels), 0)
+
+    def get_gauge(self, name: str, labels: Optional[Dict[str, Any]] = None) -> Optional[float]:
+        """Get current gauge value"""
+        return self.gauges.get(self._key(name, labels))
+
+    def snapshot(self, prefix: str = "") -> Dict[str, Any]:
+        """Get all metrics, optionally filtered by name prefix"""
+        with self._lock:
+            return {
+                'uptime_seconds': round(time.time() - self.started_at, 1),
+                'counters': {k: v for k, v in self.counters.items() if k.startswith(prefix)},
+                'gauges': {k: v for k, v in self.gauges.items() if k.startswith(prefix)},
+                'histograms': {k: h.snapshot() for k, h in self.histograms.items() if k.startswith(prefix)}
+            }
+
+    def names(self) -> List[str]:
+        """List all registered metric keys"""
+        with self._lock:
+            return sorted(set(self.counters) | set(self.gauges) | set(self.histograms))
+
+# Global registry
+metrics = MetricsRegistry()
@@ -0,0 +1,193 @@
+"""
+Versioned schema migrations for the article databases.
+Applies pending migrations in order, records them in schema_migrations, and checks that hot queries stay indexed.
+Usage: python migrations.py migrate|status|check [--database-url URL]
+"""
+
+import argparse
+import logging
+import os
+import re
+import sys
+from datetime import datetime
+from typing import Dict, List, Any, NamedTuple, Tuple
+
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+logger = logging.getLogger(__name__)
+
+class Migration(NamedTuple):
+    """One schema change; it stays pending while its table does not exist in the database"""
+    version: int
+    description: str
+    table: str
+    statements: Tuple[str, ...]
+    dialects: Tuple[str, ...] = ()  # Empty means every dialect
+
+# Append only: applied versions are never re-run, so released migrations must not be edited
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Composite indexes for the articles endpoint queries", 'articles', (
+        "CREATE INDEX IF NOT EXISTS ix_articles_government_publish_date ON articles (is_government_related, publish_date)",
+        "CREATE INDEX IF NOT EXISTS ix_articles_source_title ON articles (source, title)",
+        "CREATE INDEX IF NOT EXISTS ix_articles_language_region_publish_date ON articles (language, region, publish_date)",
+    )),
+    Migration(2, "Indexes for news_articles duplicate checks and recency ordering", 'news_articles', (
+        "CREATE INDEX IF NOT EXISTS idx_news_articles_source_title ON news_articles (source, title)",
+        "CREATE INDEX IF NOT EXISTS idx_news_articles_publish_created ON news_articles (publish_date, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_news_articles_language_region_publish ON news_articles (language, region, publish_date)",
+    )),
+    Migration(3, "Covering indexes for dashboard counts", 'articles', (
+        "CREATE INDEX IF NOT EXISTS ix_articles_region ON articles (region)",
+        "CREATE INDEX IF NOT EXISTS ix_articles_government_source_language ON articles (is_government_related, source, language)",
+    )),
+    # Expression indexes for the sentiment GROUP BY; the expression must match the endpoints' query text exactly
+    Migration(4, "Sentiment label expression indexes (SQLite)", 'articles', (
+        "CREATE INDEX IF NOT EXISTS ix_articles_sentiment_label ON articles (json_extract(sentiment, '$.sentiment'))",
+        "CREATE INDEX IF NOT EXISTS ix_articles_government_sentiment_label "
+        "ON articles (is_government_related, json_extract(sentiment, '$.sentiment'))",
+    ), ('sqlite',)),
+    Migration(5, "Sentiment label expression indexes (PostgreSQL)", 'articles', (
+        "CREATE INDEX IF NOT EXISTS ix_articles_sentiment_label ON articles ((sentiment ->> 'sentiment'))",
+        "CREATE INDEX IF NOT EXISTS ix_articles_government_sentiment_label "
+        "ON articles (is_government_related, (sentiment ->> 'sentiment'))",
+    ), ('postgresql',)),
+]
+
+class HotQuery(NamedTuple):
+    """A query the API or collectors run often enough that a full scan is a regression"""
+    name: str
+    table: str
+    sql: str
+    params: Dict[str, Any]
+
+HOT_QUERIES: List[HotQuery] = [
+    HotQuery('government_articles', 'articles',
+             "SELECT * FROM articles WHERE is_government_related = :flag ORDER BY publish_date DESC LIMIT 100",
+             {'flag': True}),
+    HotQuery('article_by_source_title', 'articles',
+             "SELECT id FROM articles WHERE source = :source AND title = :title",
+             {'source': 'PIB', 'title': 'x'}),
+    HotQuery('articles_by_language_region', 'articles',
+             "SELECT * FROM articles WHERE language = :language AND region = :region ORDER BY publish_date DESC LIMIT 100",
+             {'language': 'en', 'region': 'National'}),
+    HotQuery('rollup_dimension', 'article_rollups',
+             "SELECT value, SUM(article_count) FROM article_rollups WHERE granularity = :granularity "
+             "AND dimension = :dimension GROUP BY value",
+             {'granularity': 'day', 'dimension': 'source'}),
+    HotQuery('rollup_window', 'article_rollups',
+             "SELECT period_start, SUM(article_count) FROM article_rollups WHERE granularity = :granularity "
+             "AND dimension = :dimension AND period_start >= :since AND value = :value GROUP BY period_start",
+             {'granularity': 'hour', 'dimension': 'total', 'since': '2026-01-01 00:00:00', 'value': ''}),
+    HotQuery('news_article_exists', 'news_articles',
+             "SELECT COUNT(*) AS count FROM news_articles WHERE title = :title AND source = :source",
+             {'title': 'x', 'source': 'PIB'}),
+    HotQuery('recent_news_articles', 'news_articles',
+             "SELECT * FROM news_articles ORDER BY publish_date DESC, created_at DESC LIMIT 100",
+             {}),
+    HotQuery('news_articles_by_language_region', 'news_articles',
+             "SELECT * FROM news_articles WHERE language = :language AND region = :region ORDER BY publish_date DESC LIMIT 100",
+             {'language': 'en', 'region': 'National'}),
+]
+
+def _ensure_version_table(engine: Engine):
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER PRIMARY KEY, description TEXT NOT NULL, applied_at TIMESTAMP NOT NULL)"
+        ))
+
+def applied_versions(engine: Engine) -> Dict[int, Any]:
+    """Applied migration versions and when they were applied"""
+    _ensure_version_table(engine)
+    with engine.connect() as conn:
+        return {row[0]: row[1] for row in conn.execute(text("SELECT version, applied_at FROM schema_migrations"))}
+
+def _applies(migration: Migration, engine: Engine) -> bool:
+    return not migration.dialects or engine.dialect.name in migration.dialects
+
+def migrate(engine: Engine) -> List[int]:
+    """Apply pending migrations whose tables exist, each in its own transaction; returns the versions applied"""
+    applied = applied_versions(engine)
+    tables = set(inspect(engine).get_table_names())
+    done = []
+    for migration in MIGRATIONS:
+        if migration.version in applied or migration.table not in tables or not _applies(migration, engine):
+            continue
+        try:
+            with engine.begin() as conn:
+                for statement in migration.statements:
+                    conn.execute(text(statement))
+                conn.execute(
+                    text("INSERT INTO schema_migrations (version, description, applied_at) VALUES (:version, :description, :applied_at)"),
+                    {'version': migration.version, 'description': migration.description, 'applied_at': datetime.now()}
+                )
+        except IntegrityError:
+            # Another process applied it first; the statements themselves are idempotent
+            logger.debug(f"Migration {migration.version} was applied concurrently")
+            continue
+        logger.info(f"Applied migration {migration.version}: {migration.description}")
+        done.append(migration.version)
+    return done
+
+def _is_full_scan(detail: str, table: str) -> bool:
+    # "SCAN articles" (or "SCAN TABLE articles" before SQLite 3.36) without an index is a full table scan
+    return bool(re.match(rf"SCAN (TABLE )?{table}\b", detail)) and 'INDEX' not in detail
+
+def explain(engine: Engine, query: HotQuery) -> List[str]:
+    """SQLite query plan lines for a hot query"""
+    with engine.connect() as conn:
+        return [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {query.sql}"), query.params)]
+
+def check_query_plans(engine: Engine) -> Dict[str, List[str]]:
+    """Hot queries that full-scan their table or sort it for ORDER BY, with the offending plan lines"""
+    if engine.dialect.name != 'sqlite':
+        logger.warning(f"Query plan check supports SQLite only, skipping {engine.dialect.name}")
+        return {}
+    tables = set(inspect(engine).get_table_names())
+    problems = {}
+    for query in HOT_QUERIES:
+        if query.table not in tables:
+            continue
+        bad = [
+            detail for detail in explain(engine, query)
+            if _is_full_scan(detail, query.table) or 'USE TEMP B-TREE FOR ORDER BY' in detail
+        ]
+        if bad:
+            problems[query.name] = bad
+    return problems
+
+def main():
+    from config.settings import get_settings
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('command', choices=['migrate', 'status', 'check'])
+    parser.add_argument('--database-url', help='Defaults to DATABASE_URL from settings')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    engine = create_engine(args.database_url or get_settings().database_url)
+    if args.command == 'migrate':
+        done = migrate(engine)
+        print(f"Applied {len(done)} migrations" + (f": {done}" if done else ""))
+    elif args.command == 'status':
+        applied = applied_versions(engine)
+        for migration in MIGRATIONS:
+            if migration.version in applied:
+                state = f"applied {applied[migration.version]}"
+            else:
+                state = 'pending' if _applies(migration, engine) else f"n/a ({engine.dialect.name})"
+            print(f"{migration.version:4d}  {state:<36} {migration.description}")
+    else:
+        problems = check_query_plans(engine)
+        for name, details in problems.items():
+            print(f"{name}: {'; '.join(details)}")
+        if problems:
+            sys.exit(1)
+        print("All hot queries use indexes")
+
+if __name__ == '__main__':
+    main()
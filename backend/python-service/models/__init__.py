@@ -1,12 +1,27 @@
 # Models package
+import importlib.util
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-from models import RSSSource, NewsArticle, ProcessingJob, JobStatus, SentimentLabel, Alert, ProcessingResult
+# This package shadows models.py next to it, so load the dataclasses from that file directly
+_spec = importlib.util.spec_from_file_location(
+    'models_dataclasses', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'models.py')
+)
+_dataclasses = sys.modules.setdefault(_spec.name, importlib.util.module_from_spec(_spec))
+if not hasattr(_dataclasses, 'RSSSource'):
+    _spec.loader.exec_module(_dataclasses)
+
+RSSSource = _dataclasses.RSSSource
+NewsArticle = _dataclasses.NewsArticle
+ProcessingJob = _dataclasses.ProcessingJob
+JobStatus = _dataclasses.JobStatus
+SentimentLabel = _dataclasses.SentimentLabel
+Alert = _dataclasses.Alert
+ProcessingResult = _dataclasses.ProcessingResult
 from database_models import DatabaseManager, Article, Video, SocialMediaPost, Entity, Topic, SentimentAnalytic, GovernmentFeedback, Alert as DBAlert
 
 __all__ = [
     'RSSSource', 'NewsArticle', 'ProcessingJob', 'JobStatus', 'SentimentLabel', 'Alert', 'ProcessingResult',
     'DatabaseManager', 'Article', 'Video', 'SocialMediaPost', 'Entity', 'Topic', 'SentimentAnalytic', 'GovernmentFeedback', 'DBAlert'
-]
\ No newline at end of file
+]
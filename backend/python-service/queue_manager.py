@@ -6,6 +6,7 @@ Handles queuing, processing, and distribution of news articles.
 import asyncio
 import json
 import logging
+import time
 from typing import Dict, List, Optional, Any, Callable
 
 # Try to import Redis, fallback to mock if not available
@@ -18,10 +19,18 @@ except ImportError:
     logger.warning("Redis not available, using in-memory storage")
 
 from config.realtime_config import realtime_config
-from advanced_nlp import process_articles_batch
+from advanced_nlp import process_articles_batch, nlp_processor
+from load_shedding import LoadShedder
+from metrics import metrics
+from sharding import ShardAssigner, all_stream_keys, consumer_identity, shard_stream_key, stream_for_article
+from storage_writer import ArticleWriter
+from tracing import start_trace, mark_stage, finish_trace
 
 logger = logging.getLogger(__name__)
 
+# Most undelivered entries counted when Redis does not report lag; larger lags read as this cap
+LAG_SCAN_LIMIT = 10000
+
 class MockRedis:
     """Mock Redis implementation for testing without Redis"""
 
@@ -33,8 +42,11 @@ class MockRedis:
     async def ping(self):
         return True
 
-    async def set(self, key, value):
+    async def set(self, key, value, nx=False, px=None):
+        if nx and key in self.data:
+            return None
         self.data[key] = value
+        return True
 
     async def get(self, key):
         return self.data.get(key)
@@ -43,6 +55,29 @@ class MockRedis:
         if key in self.data:
             del self.data[key]
 
+    async def pexpire(self, key, milliseconds):
+        return key in self.data
+
+    async def zadd(self, key, mapping):
+        self.data.setdefault(key, {}).update(mapping)
+        return len(mapping)
+
+    async def zrem(self, key, *members):
+        zset = self.data.get(key, {})
+        return sum(1 for m in members if zset.pop(m, None) is not None)
+
+    async def zremrangebyscore(self, key, min_score, max_score):
+        zset = self.data.get(key, {})
+        expired = [m for m, score in zset.items() if min_score <= score <= max_score]
+        for member in expired:
+            del zset[member]
+        return len(expired)
+
+    async def zrangebyscore(self, key, min_score, max_score):
+        zset = self.data.get(key, {})
+        upper = float(max_score)
+        return [m for m, score in sorted(zset.items(), key=lambda x: x[1]) if min_score <= score <= upper]
+
     async def close(self):
         pass
 
@@ -71,9 +106,17 @@ class MockRedis:
             return messages
         return []
 
-    async def xack(self, stream_key, group, message_id):
+    async def xack(self, stream_key, group, *message_ids):
         """Mock xack"""
-        return 1
+        return len(message_ids)
+
+    async def xautoclaim(self, stream_key, group, consumer, min_idle_time, start_id="0-0", count=None):
+        """Mock xautoclaim - the mock keeps no pending entries list"""
+        return ["0-0", [], []]
+
+    async def xtrim(self, stream_key, maxlen=None, approximate=True, minid=None):
+        """Mock xtrim - consumed messages are already removed by xreadgroup"""
+        return 0
 
     async def xinfo_stream(self, stream_key):
         """Mock xinfo_stream"""
@@ -102,8 +145,14 @@ class QueueManager:
     def __init__(self):
         self.redis: Optional[redis.Redis] = None
         self.consumer_group = "news_processors"
-        self.consumer_name = "processor_1"
-        self.processing_tasks: List[asyncio.Task] = []
+        self.consumer_name = consumer_identity()
+        self.assigner: Optional[ShardAssigner] = None
+        self.processing_tasks: Dict[int, asyncio.Task] = {}
+        self.writer = ArticleWriter(self._on_batch_committed, on_dead_letter=self._on_dead_letter)
+        self.load_shedder = LoadShedder(self)
+        self.reenrich_stream_key = f"{realtime_config.redis_stream_key}:reenrich"
+        self.dead_letter_stream_key = f"{realtime_config.redis_stream_key}:dead"
+        self.reenrich_task: Optional[asyncio.Task] = None
         self.running = False
 
     async def connect(self):
@@ -121,51 +170,72 @@ class QueueManager:
                 await self.redis.ping()
                 logger.info("Connected to Redis")
 
-                # Create consumer group if it doesn't exist
-                try:
-                    await self.redis.xgroup_create(
-                        realtime_config.redis_stream_key,
-                        self.consumer_group,
-                        "$",
-                        mkstream=True
-                    )
-                    logger.info(f"Created consumer group: {self.consumer_group}")
-                except redis.ResponseError as e:
-                    if "BUSYGROUP" not in str(e):
-                        raise
+                # Create consumer group on every shard stream if it doesn't exist
+                for stream_key in all_stream_keys() + [self.reenrich_stream_key]:
+                    try:
+                        await self.redis.xgroup_create(
+                            stream_key,
+                            self.consumer_group,
+                            "$",
+                            mkstream=True
+                        )
+                        logger.info(f"Created consumer group {self.consumer_group} on {stream_key}")
+                    except redis.ResponseError as e:
+                        if "BUSYGROUP" not in str(e):
+                            raise
             else:
                 # Use mock Redis for in-memory storage
                 self.redis = MockRedis()
                 logger.info("Using mock Redis (in-memory storage)")
 
+            self.assigner = ShardAssigner(self.redis, self.consumer_name)
+
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {e}")
             raise
 
     async def disconnect(self):
         """Disconnect from Redis"""
+        # Commit and acknowledge anything still buffered before the connection goes away
+        await self.writer.close()
         if self.redis:
             await self.redis.close()
             logger.info("Disconnected from Redis")
 
-    async def start_processing(self, num_workers: int = None):
-        """Start processing workers"""
-        if num_workers is None:
-            num_workers = realtime_config.processing_workers
-
+    async def start_processing(self):
+        """Start shard workers and keep shard ownership balanced across processes"""
         self.running = True
-        logger.info(f"Starting {num_workers} processing workers")
+        logger.info(
+            f"Consumer {self.consumer_name} joining {realtime_config.stream_shards} shards "
+            f"(shard key: {realtime_config.shard_key})"
+        )
+
+        self.writer.start()
+        self.reenrich_task = asyncio.create_task(self._reenrich_worker())
 
-        # Start worker tasks
-        for i in range(num_workers):
-            task = asyncio.create_task(self._processing_worker(i))
-            self.processing_tasks.append(task)
+        # Renew leases well within their TTL
+        rebalance_interval = max(realtime_config.shard_lease_ttl / 3, 1)
 
-        # Wait for all tasks
         try:
-            await asyncio.gather(*self.processing_tasks, return_exceptions=True)
-        except Exception as e:
-            logger.error(f"Processing error: {e}")
+            while self.running:
+                try:
+                    owned = await self.assigner.rebalance()
+
+                    # Drop finished workers, start workers for newly acquired shards
+                    for shard, task in list(self.processing_tasks.items()):
+                        if task.done():
+                            del self.processing_tasks[shard]
+                    for shard in owned:
+                        if shard not in self.processing_tasks:
+                            self.processing_tasks[shard] = asyncio.create_task(self._shard_worker(shard))
+
+                except Exception as e:
+                    logger.error(f"Shard rebalance error: {e}")
+
+                await asyncio.sleep(rebalance_interval)
+        finally:
+            await asyncio.gather(self.reenrich_task, *self.processing_tasks.values(), return_exceptions=True)
+            await self.assigner.leave()
 
     def stop_processing(self):
         """Stop all processing workers"""
@@ -173,94 +243,243 @@ class QueueManager:
         logger.info("Stopping processing workers")
 
         # Cancel all tasks
-        for task in self.processing_tasks:
-            if not task.done():
+        for task in list(self.processing_tasks.values()) + [self.reenrich_task]:
+            if task and not task.done():
                 task.cancel()
 
-    async def _processing_worker(self, worker_id: int):
-        """Individual processing worker"""
-        logger.info(f"Worker {worker_id} started")
+    def _owns(self, shard: int) -> bool:
+        """Whether this process should keep consuming a shard"""
+        return self.running and shard in self.assigner.owned and shard in self.assigner.desired
 
-        while self.running:
-            try:
-                # Read from stream
-                messages = await self.redis.xreadgroup(
-                    self.consumer_group,
-                    f"processor_{worker_id}",
-                    {realtime_config.redis_stream_key: ">"},
-                    count=realtime_config.queue_prefetch_count,
-                    block=1000  # Block for 1 second
-                )
-
-                if not messages:
-                    continue
+    async def _shard_worker(self, shard: int):
+        """Consume one shard sequentially so per-shard ordering is preserved"""
+        stream_key = shard_stream_key(shard)
+        logger.info(f"Worker for shard {shard} ({stream_key}) started")
 
-                # Process messages
-                for stream_name, message_list in messages:
-                    for message_id, message_data in message_list:
-                        try:
-                            await self._process_message(message_id, message_data)
-                        except Exception as e:
-                            logger.error(f"Error processing message {message_id}: {e}")
+        try:
+            # Take over entries a previous owner read but never acknowledged
+            await self._claim_orphaned(stream_key)
 
-            except Exception as e:
-                logger.error(f"Worker {worker_id} error: {e}")
-                await asyncio.sleep(1)
+            while self._owns(shard):
+                try:
+                    await self.load_shedder.update()
 
-        logger.info(f"Worker {worker_id} stopped")
+                    # Read from stream
+                    messages = await self.redis.xreadgroup(
+                        self.consumer_group,
+                        self.consumer_name,
+                        {stream_key: ">"},
+                        count=realtime_config.queue_prefetch_count,
+                        block=1000  # Block for 1 second
+                    )
 
-    async def _process_message(self, message_id: str, message_data: Dict[str, Any]):
+                    if not messages:
+                        continue
+
+                    # Process messages in stream order
+                    for stream_name, message_list in messages:
+                        for message_id, message_data in message_list:
+                            try:
+                                await self._process_message(stream_key, message_id, message_data)
+                            except Exception as e:
+                                logger.error(f"Error processing message {message_id}: {e}")
+
+                except Exception as e:
+                    logger.error(f"Shard {shard} worker error: {e}")
+                    await asyncio.sleep(1)
+        finally:
+            # Hand the shard over only once in-flight messages are done
+            if self.assigner and shard not in self.assigner.desired:
+                await self.assigner.release(shard)
+
+        logger.info(f"Worker for shard {shard} stopped")
+
+    async def _claim_orphaned(self, stream_key: str, handler: Optional[Callable] = None, min_idle_time: int = 0):
+        """Claim and reprocess pending entries left by a previous owner or a dead consumer"""
+        handler = handler or self._process_message
+        start_id = "0-0"
+        while True:
+            result = await self.redis.xautoclaim(
+                stream_key,
+                self.consumer_group,
+                self.consumer_name,
+                min_idle_time,  # 0 for shards: the shard lease already guarantees exclusivity
+                start_id=start_id,
+                count=realtime_config.queue_prefetch_count
+            )
+            start_id, claimed = result[0], result[1]
+            for message_id, message_data in claimed:
+                if message_data:
+                    await handler(stream_key, message_id, message_data)
+            if claimed:
+                metrics.increment('queue_messages_reclaimed_total', len(claimed))
+            if not claimed or start_id in ("0-0", b"0-0"):
+                break
+
+    async def _process_message(self, stream_key: str, message_id: str, message_data: Dict[str, Any]):
         """Process a single message from the queue"""
         try:
             # Parse article data
             article_data = json.loads(message_data['data'])
+            trace = start_trace(article_data)
+            mark_stage(article_data, 'dequeued')
 
-            # Process through NLP pipeline
-            processed_articles = await process_articles_batch([article_data])
-            processed_article = processed_articles[0] if processed_articles else article_data
+            # Deadline is measured from collection, so stale backlog gets the cheap path
+            deadline = article_data.setdefault(
+                'processing_deadline',
+                trace['stages']['collected'] + realtime_config.processing_timeout
+            )
 
-            # Store in database (placeholder - integrate with existing database)
-            await self._store_processed_article(processed_article)
+            # Process through NLP pipeline
+            processed_article = await self._run_nlp(article_data, deadline)
 
-            # Broadcast to WebSocket clients
-            await self._broadcast_to_clients(processed_article)
-
-            # Acknowledge message
-            await self.redis.xack(
-                realtime_config.redis_stream_key,
-                self.consumer_group,
-                message_id
-            )
+            # Store in database; the message is acknowledged and broadcast once its batch commits
+            await self._store_processed_article(processed_article, (stream_key, message_id))
 
             logger.debug(f"Processed article: {processed_article.get('title', 'Unknown')}")
 
         except Exception as e:
             logger.error(f"Error processing message {message_id}: {e}")
 
-    async def _store_processed_article(self, article: Dict[str, Any]):
-        """Store processed article in database"""
-        # Placeholder - integrate with existing database models
-        # This would use the existing DatabaseManager and Article model
+    async def _run_nlp(self, article: Dict[str, Any], deadline: float) -> Dict[str, Any]:
+        """Run NLP within the article's deadline at the current degradation level"""
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            metrics.increment('nlp_deadline_exceeded_total', labels={'phase': 'queued'})
+            return nlp_processor.fallback_enrichment(article)
+
+        try:
+            # Work on a copy: a timed-out executor thread keeps running in the background
+            processed_articles = await asyncio.wait_for(
+                process_articles_batch([dict(article)], self.load_shedder.skip_stages),
+                timeout=remaining
+            )
+        except asyncio.TimeoutError:
+            metrics.increment('nlp_deadline_exceeded_total', labels={'phase': 'processing'})
+            logger.warning(f"NLP deadline exceeded for: {article.get('title', 'Unknown')}")
+            return nlp_processor.fallback_enrichment(article)
+
+        processed_article = processed_articles[0] if processed_articles else article
+        for stage in processed_article.get('skipped_stages', []):
+            metrics.increment('nlp_stages_skipped_total', labels={'stage': stage})
+        return processed_article
+
+    async def _reenrich_worker(self):
+        """Fully re-process degraded articles once the backlog has cleared"""
+        while self.running:
+            try:
+                await asyncio.sleep(realtime_config.reenrich_interval)
+                if self.load_shedder.level > 0:
+                    continue
+
+                # The stream is shared by every process, so only entries idle long enough to be orphaned are taken over
+                await self._claim_orphaned(
+                    self.reenrich_stream_key,
+                    self._reenrich_message,
+                    realtime_config.reenrich_claim_idle * 1000
+                )
+
+                messages = await self.redis.xreadgroup(
+                    self.consumer_group,
+                    self.consumer_name,
+                    {self.reenrich_stream_key: ">"},
+                    count=realtime_config.reenrich_batch_size
+                )
+
+                for stream_name, message_list in messages or []:
+                    for message_id, message_data in message_list:
+                        await self._reenrich_message(self.reenrich_stream_key, message_id, message_data)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Re-enrichment worker error: {e}")
+
+    async def _reenrich_message(self, stream_key: str, message_id: str, message_data: Dict[str, Any]):
+        """Fully process one degraded article and store it over its earlier version"""
+        article = json.loads(message_data['data'])
+        processed_articles = await process_articles_batch([article])
+        if processed_articles:
+            metrics.increment('nlp_reenriched_total')
+            await self._store_processed_article(processed_articles[0], (stream_key, message_id))
+
+    async def _schedule_reenrichment(self, article: Dict[str, Any]):
+        """Queue a degraded article for full processing later"""
+        pending = {
+            k: v for k, v in article.items()
+            if k not in ('trace', 'skipped_stages', 'processing_deadline')
+        }
+        # Re-enrichment is best effort, so a long overload may drop the oldest entries
+        await self.redis.xadd(
+            self.reenrich_stream_key,
+            {'data': json.dumps(pending)},
+            maxlen=realtime_config.redis_max_len
+        )
+        metrics.increment('nlp_reenrich_queued_total')
+
+    async def _store_processed_article(self, article: Dict[str, Any], ack_token=None):
+        """Store processed article in database via the group-commit writer"""
         logger.debug(f"Storing article: {article.get('title', 'Unknown')}")
+        await self.writer.submit(article, ack_token)
+
+    async def _on_batch_committed(self, batch: List[Any]):
+        """Acknowledge and broadcast articles whose batch has been committed"""
+        by_stream: Dict[str, List[str]] = {}
+        for article, ack_token in batch:
+            mark_stage(article, 'stored')
+            if ack_token is not None:
+                stream_key, message_id = ack_token
+                by_stream.setdefault(stream_key, []).append(message_id)
+
+        for stream_key, message_ids in by_stream.items():
+            try:
+                await self.redis.xack(stream_key, self.consumer_group, *message_ids)
+            except Exception as e:
+                logger.error(f"Error acknowledging {len(message_ids)} messages on {stream_key}: {e}")
 
-        # TODO: Implement database storage
-        # db_manager = DatabaseManager()
-        # article_obj = Article(**article)
-        # db_manager.insert_news_article(article_obj)
+        for article, ack_token in batch:
+            if article.get('skipped_stages'):
+                try:
+                    await self._schedule_reenrichment(article)
+                except Exception as e:
+                    logger.error(f"Error scheduling re-enrichment: {e}")
+            # Clients already saw re-enriched articles when they were first stored
+            reenriched = ack_token is not None and ack_token[0] == self.reenrich_stream_key
+            await self._broadcast_to_clients(article, 'article_update' if reenriched else 'new_article')
+
+    async def _on_dead_letter(self, items: List[Any]):
+        """Park articles the writer could not store on the dead-letter stream and acknowledge their messages"""
+        by_stream: Dict[str, List[str]] = {}
+        for article, ack_token, reason in items:
+            await self.redis.xadd(
+                self.dead_letter_stream_key,
+                {'data': json.dumps(article, default=str), 'error': reason, 'stream': ack_token[0] if ack_token else ''},
+                maxlen=realtime_config.redis_max_len
+            )
+            if ack_token is not None:
+                stream_key, message_id = ack_token
+                by_stream.setdefault(stream_key, []).append(message_id)
+
+        for stream_key, message_ids in by_stream.items():
+            await self.redis.xack(stream_key, self.consumer_group, *message_ids)
 
-    async def _broadcast_to_clients(self, article: Dict[str, Any]):
+    async def _broadcast_to_clients(self, article: Dict[str, Any], event_type: str = 'new_article'):
         """Broadcast processed article to WebSocket clients"""
-        # This will be handled by the WebSocket server
-        # For now, just log
         logger.debug(f"Broadcasting article: {article.get('title', 'Unknown')}")
+        try:
+            await websocket_broadcaster.broadcast_article(article, event_type)
+        except Exception as e:
+            logger.error(f"Error broadcasting article: {e}")
+        mark_stage(article, 'broadcast')
+        finish_trace(article)
 
     async def enqueue_article(self, article: Dict[str, Any]) -> str:
         """Add article to processing queue"""
         try:
+            # No maxlen here: unprocessed entries are never trimmed, see trim_processed()
             message_id = await self.redis.xadd(
-                realtime_config.redis_stream_key,
-                {'data': json.dumps(article)},
-                maxlen=realtime_config.redis_max_len
+                stream_for_article(article),
+                {'data': json.dumps(article)}
             )
             logger.debug(f"Enqueued article: {article.get('title', 'Unknown')}")
             return message_id
@@ -268,38 +487,108 @@ class QueueManager:
             logger.error(f"Error enqueuing article: {e}")
             raise
 
-    async def get_queue_stats(self) -> Dict[str, Any]:
-        """Get queue statistics"""
+    async def _get_stream_stats(self, stream_key: str) -> Dict[str, Any]:
+        """Get length, lag and pending counts for one shard stream"""
+        # Get stream info
+        stream_info = await self.redis.xinfo_stream(stream_key)
+
+        # Get consumer group info
         try:
-            # Get stream info
-            stream_info = await self.redis.xinfo_stream(realtime_config.redis_stream_key)
+            group_info = await self.redis.xinfo_groups(stream_key)
+            consumer_info = await self.redis.xinfo_consumers(stream_key, self.consumer_group)
+        except:
+            group_info = []
+            consumer_info = []
+
+        stream_length = stream_info.get('length', 0)
+        group = next((g for g in group_info if g.get('name') == self.consumer_group), None)
+
+        # Lag = entries not yet delivered to the group, pending = delivered but not acked
+        pending = group.get('pending', 0) if group else 0
+        lag = group.get('lag') if group else None
+        if lag is None and group:
+            # Redis < 7 does not report lag; count entries after the group's last delivered one
+            undelivered = await self.redis.xrange(
+                stream_key, min=f"({group.get('last-delivered-id', '0-0')}", max='+', count=LAG_SCAN_LIMIT
+            )
+            lag = len(undelivered)
+        elif lag is None:
+            lag = stream_length
 
-            # Get consumer group info
-            try:
-                group_info = await self.redis.xinfo_groups(realtime_config.redis_stream_key)
-                consumer_info = await self.redis.xinfo_consumers(
-                    realtime_config.redis_stream_key,
-                    self.consumer_group
-                )
-            except:
-                group_info = []
-                consumer_info = []
+        return {
+            'stream_length': stream_length,
+            'groups': len(group_info),
+            'consumers': len(consumer_info),
+            'last_generated_id': stream_info.get('last-generated-id', '0-0'),
+            'lag': lag,
+            'pending': pending,
+            'backlog': lag + pending,
+            'last_delivered_id': group.get('last-delivered-id') if group else None
+        }
+
+    async def get_queue_stats(self) -> Dict[str, Any]:
+        """Get queue statistics aggregated across all shards"""
+        try:
+            shards = {}
+            for stream_key in all_stream_keys():
+                try:
+                    shards[stream_key] = await self._get_stream_stats(stream_key)
+                except Exception as e:
+                    # Stream not created yet
+                    logger.debug(f"No stats for {stream_key}: {e}")
+                    shards[stream_key] = {'stream_length': 0, 'lag': 0, 'pending': 0, 'backlog': 0, 'consumers': 0}
 
             return {
-                'stream_length': stream_info.get('length', 0),
-                'groups': len(group_info),
-                'consumers': len(consumer_info),
-                'last_generated_id': stream_info.get('last-generated-id', '0-0')
+                'stream_length': sum(s['stream_length'] for s in shards.values()),
+                'consumers': max((s['consumers'] for s in shards.values()), default=0),
+                'lag': sum(s['lag'] for s in shards.values()),
+                'pending': sum(s['pending'] for s in shards.values()),
+                'backlog': sum(s['backlog'] for s in shards.values()),
+                'shards': shards,
+                'assignment': self.assigner.get_status() if self.assigner else None
             }
 
         except Exception as e:
             logger.error(f"Error getting queue stats: {e}")
             return {}
 
+    async def trim_processed(self) -> int:
+        """Trim acknowledged entries beyond redis_max_len without touching unprocessed ones"""
+        trimmed_total = 0
+        per_shard_max = max(realtime_config.redis_max_len // max(realtime_config.stream_shards, 1), 1)
+
+        for stream_key in all_stream_keys() + [self.reenrich_stream_key]:
+            try:
+                stats = await self._get_stream_stats(stream_key)
+                if stats['stream_length'] <= per_shard_max:
+                    continue
+
+                last_delivered = stats.get('last_delivered_id')
+                if not last_delivered:
+                    continue
+
+                # Everything older than the oldest pending entry (or the last delivered
+                # entry when nothing is pending) has been acknowledged by the group
+                min_id = last_delivered
+                if stats.get('pending'):
+                    pending_info = await self.redis.xpending(stream_key, self.consumer_group)
+                    min_id = pending_info.get('min') or last_delivered
+
+                trimmed = await self.redis.xtrim(stream_key, minid=min_id, approximate=True)
+                if trimmed:
+                    logger.info(f"Trimmed {trimmed} processed entries from {stream_key}")
+                trimmed_total += trimmed or 0
+
+            except Exception as e:
+                logger.error(f"Error trimming processed entries from {stream_key}: {e}")
+
+        return trimmed_total
+
     async def clear_queue(self):
         """Clear all messages from the queue"""
         try:
-            await self.redis.delete(realtime_config.redis_stream_key)
+            for stream_key in all_stream_keys():
+                await self.redis.delete(stream_key)
             logger.info("Queue cleared")
         except Exception as e:
             logger.error(f"Error clearing queue: {e}")
@@ -323,10 +612,10 @@ class WebSocketBroadcaster:
         else:
             self.redis = MockRedis()
 
-    async def broadcast_article(self, article: Dict[str, Any]):
+    async def broadcast_article(self, article: Dict[str, Any], event_type: str = 'new_article'):
         """Broadcast article to all connected WebSocket clients"""
         message = {
-            'type': 'new_article',
+            'type': event_type,
             'data': article,
             'timestamp': asyncio.get_event_loop().time()
         }
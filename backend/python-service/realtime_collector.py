@@ -12,7 +12,6 @@ import sys
 import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Set, Any
-from urllib.parse import urljoin, urlparse
 
 # Add current directory to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -50,79 +49,228 @@ except ImportError:
 
     redis = MockRedis()
 
-from bs4 import BeautifulSoup
-from newspaper import Article as NewspaperArticle
 
 from config.realtime_config import realtime_config
+from checkpoints import CheckpointStore
+from conditional_fetch import ValidatorStore
+from content_fetcher import ContentFetcher
+from feed_parser import parse_feed_async
+from html_extractor import extract_listing, run_extraction
+from http_client import ACCEPT_ENCODING, create_session
+from metrics import metrics
+from seen_index import SeenIndex
+from source_health import HealthTracker, is_failure_status
+from source_scheduler import SourceScheduler
+from sharding import stream_for_article
+from tracing import start_trace, mark_stage
 # Import database models directly
 from database_models import Article, Video, SocialMediaPost, Entity, Topic, SentimentAnalytic, GovernmentFeedback, Alert
 
 logger = logging.getLogger(__name__)
 
 class ChangeDetector:
-    """Detects changes in web pages using content hashing"""
-
-    def __init__(self, redis_client: redis.Redis):
-        self.redis = redis_client
-        self.hash_key_prefix = "page_hash:"
-
-    async def get_page_hash(self, url: str) -> Optional[str]:
-        """Get stored hash for a URL"""
-        key = f"{self.hash_key_prefix}{hashlib.md5(url.encode()).hexdigest()}"
-        return await self.redis.get(key)
+    """Detects new items on listing pages from a fingerprint of their article list"""
+
+    def __init__(self):
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def _source_stats(self, source: str) -> Dict[str, int]:
+        return self.stats.setdefault(source, {
+            'checks': 0, 'identical': 0, 'false_changes': 0, 'changes': 0, 'new_items': 0
+        })
+
+    def is_identical(self, html: str, checkpoint: Dict[str, Any], update: Dict[str, Any], source: str) -> bool:
+        """Cheap pre-check: byte-identical pages need no parsing at all"""
+        stats = self._source_stats(source)
+        stats['checks'] += 1
+        new_hash = hashlib.md5(html.encode('utf-8')).hexdigest()
+        if checkpoint.get('page_hash') == new_hash:
+            stats['identical'] += 1
+            return True
+        update['page_hash'] = new_hash
+        return False
 
-    async def set_page_hash(self, url: str, content_hash: str):
-        """Store hash for a URL with expiration"""
-        key = f"{self.hash_key_prefix}{hashlib.md5(url.encode()).hexdigest()}"
-        await self.redis.setex(key, 86400 * 7, content_hash)  # 7 days expiration
+    @staticmethod
+    def fingerprint(items: List[Dict[str, str]]) -> str:
+        """Fingerprint of the ordered item URLs and titles, ignoring ads, tokens and counters"""
+        listing = '\n'.join(f"{item.get('url', '')}\t{item.get('title', '')}" for item in items)
+        return hashlib.md5(listing.encode('utf-8')).hexdigest()
+
+    def new_items(self, items: List[Dict[str, str]], checkpoint: Dict[str, Any], update: Dict[str, Any],
+                  source: str) -> List[Dict[str, str]]:
+        """Items not present in the last committed listing; the new listing is staged in update"""
+        stats = self._source_stats(source)
+        fingerprint = self.fingerprint(items)
+
+        if checkpoint.get('fingerprint') == fingerprint:
+            # The raw page changed but the article list did not
+            stats['false_changes'] += 1
+            metrics.increment('listing_false_changes_total', labels={'source': source})
+            self._log_rates(source, stats)
+            return []
 
-    async def has_changed(self, url: str, new_content: str) -> bool:
-        """Check if page content has changed"""
-        new_hash = hashlib.md5(new_content.encode('utf-8')).hexdigest()
-        old_hash = await self.get_page_hash(url)
+        known = set(checkpoint.get('listing_urls', ()))
+        new = [item for item in items if item.get('url') not in known]
+        update['fingerprint'] = fingerprint
+        update['listing_urls'] = [item.get('url') for item in items]
+
+        stats['changes'] += 1
+        stats['new_items'] += len(new)
+        metrics.increment('listing_changes_total', labels={'source': source})
+        self._log_rates(source, stats)
+        return new
+
+    def _false_change_rate(self, stats: Dict[str, int]) -> float:
+        # Share of raw-hash changes that were not real listing changes
+        raw_changes = stats['checks'] - stats['identical']
+        return stats['false_changes'] / raw_changes if raw_changes else 0.0
+
+    def _log_rates(self, source: str, stats: Dict[str, int]):
+        if stats['checks'] % 20 == 0:
+            logger.info(
+                f"{source}: {stats['checks']} listing checks, "
+                f"false-change rate {self._false_change_rate(stats):.0%}, {stats['new_items']} new items"
+            )
+
+    def get_report(self) -> Dict[str, Dict[str, Any]]:
+        """Per-source listing check outcomes and false-change rate"""
+        return {
+            source: {**stats, 'false_change_rate': round(self._false_change_rate(stats), 3)}
+            for source, stats in self.stats.items()
+        }
 
-        if old_hash != new_hash:
-            await self.set_page_hash(url, new_hash)
-            return True
-        return False
+class FlowController:
+    """Adaptive backpressure between the collector and the processing queue"""
+
+    def __init__(self, queue_manager=None):
+        self.queue_manager = queue_manager
+        self.throttled = False
+        self.backlog = 0
+        self.last_check = 0.0
+
+    async def update(self) -> bool:
+        """Refresh queue lag and apply high/low watermark hysteresis"""
+        if self.queue_manager is None:
+            return self.throttled
+
+        now = time.monotonic()
+        if now - self.last_check < realtime_config.backpressure_check_interval:
+            return self.throttled
+        self.last_check = now
+
+        stats = await self.queue_manager.get_queue_stats()
+        if not stats:
+            return self.throttled
+
+        self.backlog = stats.get('backlog', stats.get('stream_length', 0))
+        metrics.set_gauge('queue_backlog', self.backlog)
+        metrics.set_gauge('queue_lag', stats.get('lag', 0))
+        metrics.set_gauge('queue_pending', stats.get('pending', 0))
+
+        if not self.throttled and self.backlog >= realtime_config.backpressure_high_watermark:
+            self.throttled = True
+            metrics.increment('backpressure_watermark_crossings_total', labels={'watermark': 'high'})
+            logger.warning(
+                f"Queue backlog {self.backlog} crossed high watermark "
+                f"({realtime_config.backpressure_high_watermark}), slowing low-priority sources"
+            )
+        elif self.throttled and self.backlog <= realtime_config.backpressure_low_watermark:
+            self.throttled = False
+            metrics.increment('backpressure_watermark_crossings_total', labels={'watermark': 'low'})
+            logger.info(
+                f"Queue backlog {self.backlog} fell below low watermark "
+                f"({realtime_config.backpressure_low_watermark}), resuming normal polling"
+            )
+
+        metrics.set_gauge('backpressure_throttled', int(self.throttled))
+
+        # Reclaim space from acknowledged entries only
+        if stats.get('stream_length', 0) > realtime_config.redis_max_len:
+            await self.queue_manager.trim_processed()
+
+        return self.throttled
+
+    def slowdown_for(self, source: Dict[str, Any]) -> float:
+        """Polling interval multiplier for a source under current backpressure"""
+        if self.throttled and source.get('priority', 'normal') == 'low':
+            return realtime_config.backpressure_slowdown_factor
+        return 1.0
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get current flow control state"""
+        return {
+            'throttled': self.throttled,
+            'backlog': self.backlog,
+            'high_watermark': realtime_config.backpressure_high_watermark,
+            'low_watermark': realtime_config.backpressure_low_watermark
+        }
 
 class RealTimeCollector:
     """Real-time news collector with change detection"""
 
-    def __init__(self, redis_client: redis.Redis):
+    def __init__(self, redis_client: redis.Redis, queue_manager=None, session_factory=None):
         self.redis = redis_client
-        self.change_detector = ChangeDetector(redis_client)
+        # Overridable so benchmarks can substitute recorded HTTP fixtures
+        self.session_factory = session_factory
+        self.change_detector = ChangeDetector()
+        self.flow_controller = FlowController(queue_manager)
+        self.validators = ValidatorStore()
+        self.seen_index = SeenIndex()
+        self.checkpoints = CheckpointStore()
+        self.health = HealthTracker()
+        self.content_fetcher: Optional[ContentFetcher] = None
         self.session: Optional[aiohttp.ClientSession] = None
         self.running = False
-        self.last_check_times: Dict[str, datetime] = {}
+        self.scheduler = SourceScheduler(realtime_config.news_sources)
+        self.scheduler.restore(self.checkpoints.load_scheduler_state())
+        self.active_polls: Set[asyncio.Task] = set()
 
         # Setup headers
         self.headers = {
             'User-Agent': realtime_config.user_agent,
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
+            'Accept-Encoding': ACCEPT_ENCODING,
             'Upgrade-Insecure-Requests': '1',
         }
 
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession(headers=self.headers)
+        self.session = (self.session_factory or create_session)(headers=self.headers)
+        if realtime_config.content_fetch_enabled:
+            self.content_fetcher = ContentFetcher(self.headers, self.session_factory)
+            await self.content_fetcher.start()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.session:
             await self.session.close()
+        if self.content_fetcher:
+            await self.content_fetcher.close()
 
     async def start_collection(self):
         """Start the real-time collection process"""
         self.running = True
         logger.info("Starting real-time news collection...")
+        semaphore = asyncio.Semaphore(realtime_config.max_concurrent_scrapers)
 
         while self.running:
             try:
-                await self._collect_from_all_sources()
-                await asyncio.sleep(realtime_config.change_detection_interval)
+                await self.flow_controller.update()
+
+                for source in self.scheduler.pop_due():
+                    # Sources with an open circuit wait for their probe without taking a scraper slot
+                    if not self.health.allow(source['name']):
+                        self.scheduler.defer(source['name'], self.health.retry_in(source['name']))
+                        continue
+                    task = asyncio.create_task(self._poll_source(source, semaphore))
+                    self.active_polls.add(task)
+                    task.add_done_callback(self.active_polls.discard)
+
+                # Wake for the next due source, but keep flow control fresh
+                await asyncio.sleep(min(
+                    self.scheduler.seconds_until_next(),
+                    realtime_config.backpressure_check_interval
+                ))
             except Exception as e:
                 logger.error(f"Error in collection cycle: {e}")
                 await asyncio.sleep(5)  # Brief pause before retry
@@ -130,108 +278,189 @@ class RealTimeCollector:
     def stop_collection(self):
         """Stop the collection process"""
         self.running = False
+        for task in self.active_polls:
+            task.cancel()
         logger.info("Stopping real-time news collection...")
 
-    async def _collect_from_all_sources(self):
-        """Collect from all configured news sources"""
-        tasks = []
-        semaphore = asyncio.Semaphore(realtime_config.max_concurrent_scrapers)
-
-        for source in realtime_config.news_sources:
-            # Rate limiting: don't check too frequently
-            if self._should_check_source(source['name']):
-                tasks.append(self._collect_from_source(source, semaphore))
-
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
-
-    def _should_check_source(self, source_name: str) -> bool:
-        """Check if source should be checked based on timing"""
-        now = datetime.now()
-        last_check = self.last_check_times.get(source_name)
-
-        if not last_check or (now - last_check).seconds >= realtime_config.change_detection_interval:
-            self.last_check_times[source_name] = now
-            return True
-        return False
-
-    async def _collect_from_source(self, source: Dict[str, Any], semaphore: asyncio.Semaphore):
-        """Collect news from a single source"""
+    async def _poll_source(self, source: Dict[str, Any], semaphore: asyncio.Semaphore):
+        """Poll one source and schedule its next poll from the result"""
+        new_articles = []
+        try:
+            new_articles = await self._collect_from_source(source, semaphore)
+        finally:
+            slowdown = self.flow_controller.slowdown_for(source)
+            if slowdown > 1:
+                metrics.increment('collector_polls_deferred_total', labels={'source': source['name']})
+            self.scheduler.record_poll(source['name'], new_articles, slowdown)
+            if self.health.is_open(source['name']):
+                self.scheduler.defer(source['name'], self.health.retry_in(source['name']))
+            self.checkpoints.save_scheduler_state(source['name'], self.scheduler.export_state(source['name']))
+
+    async def _collect_from_source(self, source: Dict[str, Any], semaphore: asyncio.Semaphore) -> List[Dict[str, Any]]:
+        """Collect news from a single source, returning the articles queued"""
         async with semaphore:
             try:
                 logger.debug(f"Checking source: {source['name']}")
-
-                # First try RSS feed for quick updates
-                rss_articles = await self._collect_from_rss(source)
-                if rss_articles:
-                    await self._queue_articles(rss_articles)
-                    return
-
-                # Fall back to web scraping
-                articles = await self._scrape_website(source)
-                if articles:
-                    await self._queue_articles(articles)
+                checkpoint = self.checkpoints.get(source['name'])
+                # Checkpoint changes are staged here and only committed once items are queued
+                update: Dict[str, Any] = {'validators': {}}
+
+                # First try RSS feed for quick updates; an unchanged feed is not a reason to scrape
+                articles = await self._collect_from_rss(source, checkpoint, update)
+                if articles is None:
+                    # Fall back to web scraping, unless the failed feed request just opened the circuit
+                    if self.health.is_open(source['name']):
+                        articles = []
+                    else:
+                        articles = await self._scrape_website(source, checkpoint, update)
+
+                # Feeds and listing pages repeat the same items until they roll off
+                articles = self.seen_index.filter_new(articles, source['name'])
 
             except Exception as e:
                 logger.error(f"Error collecting from {source['name']}: {e}")
+                return []
 
-    async def _collect_from_rss(self, source: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Collect articles from RSS feed"""
-        if 'rss_url' not in source:
+        # Article pages are fetched in their own stage so slow pages do not hold a source slot
+        try:
+            if articles and self.content_fetcher:
+                results = await asyncio.gather(*(self._fill_and_queue(article) for article in articles))
+                queued = [article for article in results if article]
+            else:
+                queued = await self._queue_articles(articles) if articles else []
+            if queued:
+                logger.info(f"Queued {len(queued)} articles from {source['name']}")
+
+            self._commit_checkpoint(source, update, queued, complete=len(queued) == len(articles))
+            return queued
+
+        except Exception as e:
+            logger.error(f"Error collecting from {source['name']}: {e}")
             return []
 
+    async def _fill_and_queue(self, article: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Fetch one article's full text, then queue it without waiting for the rest of its source"""
+        await self.content_fetcher.fill_content([article])
+        queued = await self._queue_articles([article])
+        return queued[0] if queued else None
+
+    def _commit_checkpoint(self, source: Dict[str, Any], update: Dict[str, Any],
+                           queued: List[Dict[str, Any]], complete: bool):
+        """Persist what a poll learned together with the items it queued"""
+        if not complete:
+            # Keep the old validators and listing so the unqueued items are seen again next poll
+            update = {}
+        self.checkpoints.commit(source['name'], update, queued, self.seen_index.entries_for(queued))
+        self.seen_index.remember(queued)
+
+    async def _collect_from_rss(self, source: Dict[str, Any], checkpoint: Dict[str, Any],
+                                update: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """Collect articles from RSS feed (None when the feed is unavailable)"""
+        if 'rss_url' not in source:
+            return None
+
+        rss_url = source['rss_url']
+        started = time.monotonic()
+        responded = False
         try:
-            async with self.session.get(source['rss_url'], timeout=aiohttp.ClientTimeout(total=10)) as response:
-                if response.status != 200:
+            async with self.session.get(
+                rss_url,
+                headers=self.validators.request_headers(rss_url),
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                responded = True
+                self._record_health(source, response.status, started)
+                if response.status == 304:
+                    # Unchanged since the last poll: nothing downloaded or parsed
+                    self.validators.record_not_modified(rss_url, source['name'])
                     return []
+                if response.status != 200:
+                    return None
 
-                import feedparser
-                content = await response.text()
-                feed = feedparser.parse(content)
+                body = await response.read()
+                validators = self.validators.record_response(
+                    rss_url, source['name'], response.headers, len(body), persist=False
+                )
+                if validators:
+                    update['validators'][rss_url] = validators
+                # Parsed off the event loop, and only as far as the newest entries
+                entries = await parse_feed_async(body, realtime_config.feed_max_entries)
 
                 articles = []
-                for entry in feed.entries[:10]:  # Limit to recent entries
+                for entry in entries:
                     article_data = self._parse_rss_entry(entry, source)
-                    if article_data:
-                        articles.append(article_data)
+                    if not article_data:
+                        continue
+                    # Entries covered by the last checkpoint were queued before a restart
+                    if self.checkpoints.is_known_entry(
+                        checkpoint, article_data['metadata'].get('guid'), article_data['publish_date']
+                    ):
+                        continue
+                    articles.append(article_data)
 
                 return articles
 
         except Exception as e:
+            if not responded:
+                self.health.record(source['name'], False, time.monotonic() - started, repr(e))
             logger.warning(f"RSS collection failed for {source['name']}: {e}")
-            return []
+            return None
 
-    async def _scrape_website(self, source: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def _scrape_website(self, source: Dict[str, Any], checkpoint: Dict[str, Any],
+                              update: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Scrape website for new articles"""
+        started = time.monotonic()
+        responded = False
         try:
-            async with self.session.get(source['url'], timeout=aiohttp.ClientTimeout(total=10)) as response:
+            async with self.session.get(
+                source['url'],
+                headers=self.validators.request_headers(source['url']),
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                responded = True
+                self._record_health(source, response.status, started)
+                if response.status == 304:
+                    self.validators.record_not_modified(source['url'], source['name'])
+                    return []
                 if response.status != 200:
                     return []
 
                 html = await response.text()
+                validators = self.validators.record_response(
+                    source['url'], source['name'], response.headers, len(html.encode('utf-8')), persist=False
+                )
+                if validators:
+                    update['validators'][source['url']] = validators
 
-                # Check if page has changed
-                if not await self.change_detector.has_changed(source['url'], html):
+                # Byte-identical pages are not parsed at all
+                if self.change_detector.is_identical(html, checkpoint, update, source['name']):
                     logger.debug(f"No changes detected for {source['name']}")
                     return []
 
-                # Parse HTML and extract articles
-                soup = BeautifulSoup(html, 'html.parser')
+                # Parse in the extraction pool; only the listing items are pulled out of the tree
+                items = await run_extraction(
+                    extract_listing, html, source['url'], source.get('selectors', {}), 5  # 5 most recent
+                )
+                items = self.change_detector.new_items(items, checkpoint, update, source['name'])
                 articles = []
-
-                # Find article containers
-                containers = soup.select(source['selectors'].get('article_container', 'article'))
-                for container in containers[:5]:  # Limit to 5 most recent
-                    article_data = self._extract_article_from_container(container, source)
+                for item in items:
+                    article_data = self._article_from_listing_item(item, source)
                     if article_data:
                         articles.append(article_data)
 
                 return articles
 
         except Exception as e:
+            if not responded:
+                self.health.record(source['name'], False, time.monotonic() - started, repr(e))
             logger.error(f"Web scraping failed for {source['name']}: {e}")
             return []
 
+    def _record_health(self, source: Dict[str, Any], status: int, started: float):
+        """Count a response towards source health; server errors, throttling and dead or forbidden URLs are failures"""
+        failed = is_failure_status(status)
+        self.health.record(source['name'], not failed, time.monotonic() - started, f"HTTP {status}" if failed else None)
+
     def _parse_rss_entry(self, entry, source: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Parse RSS entry into article data"""
         try:
@@ -261,6 +490,7 @@ class RealTimeCollector:
                 'is_government_related': False,  # Will be determined by AI
                 'metadata': {
                     'source_type': 'rss',
+                    'guid': getattr(entry, 'id', None),
                     'selectors': source.get('selectors', {})
                 }
             }
@@ -269,69 +499,54 @@ class RealTimeCollector:
             logger.error(f"Error parsing RSS entry: {e}")
             return None
 
-    def _extract_article_from_container(self, container, source: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Extract article data from HTML container"""
-        try:
-            selectors = source.get('selectors', {})
-
-            # Extract title
-            title_elem = container.select_one(selectors.get('title', 'h1, h2, .title'))
-            title = title_elem.get_text().strip() if title_elem else ""
-
-            # Extract URL
-            url = ""
-            link_elem = container.find('a', href=True)
-            if link_elem:
-                url = urljoin(source['url'], link_elem['href'])
-
-            # Extract publish date
-            date_elem = container.select_one(selectors.get('publish_date', 'time, .date'))
-            publish_date = datetime.now()
-            if date_elem:
-                # Try to parse various date formats
-                date_text = date_elem.get_text() or date_elem.get('datetime', '')
-                # Basic parsing - could be enhanced
-                publish_date = datetime.now()  # Placeholder
-
-            if not title or not url:
-                return None
+    def _article_from_listing_item(self, item: Dict[str, str], source: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Build article data from an extracted listing item"""
+        title = item.get('title', '')
+        url = item.get('url', '')
+        if not title or not url:
+            return None
 
-            return {
-                'title': title,
-                'url': url,
-                'source': source['name'],
-                'language': source.get('language', 'en'),
-                'category': source.get('category', 'General'),
-                'region': source.get('region', 'National'),
-                'publish_date': publish_date.isoformat(),
-                'collected_date': datetime.now().isoformat(),
-                'content': '',  # Will be fetched later
-                'is_government_related': False,
-                'metadata': {
-                    'source_type': 'scrape',
-                    'selectors': selectors
-                }
+        # Listing dates come in too many formats to trust; use collection time
+        publish_date = datetime.now()
+
+        return {
+            'title': title,
+            'url': url,
+            'source': source['name'],
+            'language': source.get('language', 'en'),
+            'category': source.get('category', 'General'),
+            'region': source.get('region', 'National'),
+            'publish_date': publish_date.isoformat(),
+            'collected_date': datetime.now().isoformat(),
+            'content': '',  # Filled by the content fetcher
+            'is_government_related': False,
+            'metadata': {
+                'source_type': 'scrape',
+                'selectors': source.get('selectors', {})
             }
+        }
 
-        except Exception as e:
-            logger.error(f"Error extracting article from container: {e}")
-            return None
-
-    async def _queue_articles(self, articles: List[Dict[str, Any]]):
-        """Queue articles for processing"""
+    async def _queue_articles(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Queue articles for processing, returning those added to the stream"""
+        queued = []
         try:
             for article in articles:
-                # Add to Redis stream
+                start_trace(article)
+                mark_stage(article, 'enqueued')
+
+                # Add to Redis stream; trimming is left to the queue manager so
+                # unprocessed entries are never dropped
                 await self.redis.xadd(
-                    realtime_config.redis_stream_key,
-                    {'data': json.dumps(article)},
-                    maxlen=realtime_config.redis_max_len
+                    stream_for_article(article),
+                    {'data': json.dumps(article)}
                 )
+                queued.append(article)
 
-            logger.info(f"Queued {len(articles)} articles for processing")
+            logger.debug(f"Queued {len(queued)} articles for processing")
 
         except Exception as e:
             logger.error(f"Error queuing articles: {e}")
+        return queued
 
 async def main():
     """Main function for testing"""
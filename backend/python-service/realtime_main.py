@@ -28,6 +28,11 @@ except ImportError:
     logger.warning("Redis not available, using in-memory storage")
 
 from config.realtime_config import realtime_config
+from html_extractor import shutdown_extraction_pool
+from http_client import host_stats
+from loop_monitor import loop_monitor
+from metrics import metrics
+from tracing import trace_store
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +51,9 @@ class MockRedis:
     async def get(self, key):
         return self.data.get(key)
 
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+
     async def delete(self, key):
         if key in self.data:
             del self.data[key]
@@ -87,7 +95,7 @@ class RealTimeNewsSystem:
             await initialize_queue_system()
 
             # Initialize collector
-            self.collector = RealTimeCollector(self.redis_client)
+            self.collector = RealTimeCollector(self.redis_client, queue_manager)
 
             # Get model info
             model_info = await nlp_processor.get_model_info()
@@ -105,13 +113,16 @@ class RealTimeNewsSystem:
             self.running = True
             logger.info("Starting real-time news monitoring system...")
 
+            # Watch for blocking work on the shared event loop
+            self.tasks.append(asyncio.create_task(loop_monitor.run()))
+
             # Start WebSocket server
             websocket_task = asyncio.create_task(start_websocket_server())
             self.tasks.append(websocket_task)
 
             # Start queue processing
             processing_task = asyncio.create_task(
-                queue_manager.start_processing(realtime_config.processing_workers)
+                queue_manager.start_processing()
             )
             self.tasks.append(processing_task)
 
@@ -140,6 +151,7 @@ class RealTimeNewsSystem:
 
         # Stop queue processing
         queue_manager.stop_processing()
+        loop_monitor.stop()
 
         # Stop WebSocket server
         stop_websocket_server()
@@ -151,6 +163,7 @@ class RealTimeNewsSystem:
 
         # Shutdown queue system
         await shutdown_queue_system()
+        shutdown_extraction_pool()
 
         # Close Redis connection
         if self.redis_client:
@@ -170,9 +183,24 @@ class RealTimeNewsSystem:
             return {
                 'running': self.running,
                 'queue_stats': queue_stats,
+                'backpressure': self.collector.flow_controller.get_status() if self.collector else None,
+                'load_shedding': queue_manager.load_shedder.get_status(),
+                'conditional_fetch': self.collector.validators.get_report() if self.collector else None,
+                'polling': self.collector.scheduler.get_report() if self.collector else None,
+                'source_health': self.collector.health.get_report() if self.collector else None,
+                'seen_index': self.collector.seen_index.get_report() if self.collector else None,
+                'change_detection': self.collector.change_detector.get_report() if self.collector else None,
+                'checkpoints': self.collector.checkpoints.get_report() if self.collector else None,
+                'event_loop': loop_monitor.get_status(),
+                'http_client': host_stats.get_report(),
+                'metrics': metrics.snapshot(),
+                'slowest_traces': trace_store.get_slowest(10),
                 'model_info': model_info,
+                # Processing runs one consumer per owned shard, so this member's shards are its worker count
+                'sharding': queue_manager.assigner.get_status() if queue_manager.assigner else None,
                 'config': {
-                    'workers': realtime_config.processing_workers,
+                    'stream_shards': realtime_config.stream_shards,
+                    'shard_key': realtime_config.shard_key,
                     'batch_size': realtime_config.ai_batch_size,
                     'websocket_port': realtime_config.websocket_port,
                     'redis_host': realtime_config.redis_host
@@ -0,0 +1,207 @@
+"""
+Incrementally maintained hourly and daily rollups of the articles table.
+Every article write applies count deltas per dimension in the same transaction, so dashboards read rollup rows instead of articles.
+Usage: python rollups.py rebuild [--database-url URL]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Iterable, Mapping, Tuple
+
+from sqlalchemy import delete, select, text, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database_models import Article, ArticleRollup
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = ('hour', 'day')
+SENTIMENT_LABELS = ('positive', 'negative', 'neutral')
+KEY_COLUMNS = ('granularity', 'dimension', 'period_start', 'is_government_related', 'value')
+COUNTERS = ('article_count', 'positive_count', 'negative_count', 'neutral_count',
+            'sentiment_score_sum', 'sentiment_score_count')
+# Article columns the rollups are derived from
+SOURCE_COLUMNS = ('url', 'publish_date', 'collected_date', 'is_government_related', 'source', 'language',
+                  'region', 'sentiment', 'keywords', 'departments')
+
+# Rows per statement, well under SQLite's bound-parameter limit
+CHUNK_SIZE = 500
+# Rebuilds write out accumulated deltas once this many rollup rows are pending
+REBUILD_FLUSH_ROWS = 100000
+
+Deltas = Dict[Tuple, List[float]]
+
+def period_start(moment: datetime, granularity: str) -> datetime:
+    """Start of the hour or day containing a moment, as stored (naive wall-clock time)"""
+    start = moment.replace(tzinfo=None, minute=0, second=0, microsecond=0)
+    return start.replace(hour=0) if granularity == 'day' else start
+
+def article_values(article: Article) -> Dict[str, Any]:
+    """The rollup source columns of an ORM article"""
+    return {column: getattr(article, column) for column in SOURCE_COLUMNS}
+
+def _dimensions(article: Mapping[str, Any]) -> List[Tuple[str, str]]:
+    """(dimension, value) pairs an article counts towards; a repeated keyword or department counts each time"""
+    pairs = [
+        ('total', ''),
+        ('source', article.get('source') or 'Unknown'),
+        ('language', article.get('language') or 'Unknown'),
+        ('region', article.get('region') or 'Unknown')
+    ]
+    pairs += [('keyword', keyword) for keyword in article.get('keywords') or [] if isinstance(keyword, str)]
+    pairs += [
+        ('department', department.get('department') or 'unknown')
+        for department in article.get('departments') or [] if isinstance(department, dict)
+    ]
+    return pairs
+
+def sentiment_score(sentiment: Mapping[str, Any]) -> Optional[float]:
+    """Signed score in [-1, 1]: an explicit score, else positive minus negative class probability"""
+    score = sentiment.get('score')
+    if isinstance(score, (int, float)) and not isinstance(score, bool):
+        return float(score)
+    # The realtime NLP output carries only per-label class probabilities
+    scores = sentiment.get('scores')
+    if isinstance(scores, dict) and ('positive' in scores or 'negative' in scores):
+        return float(scores.get('positive', 0.0)) - float(scores.get('negative', 0.0))
+    return None
+
+def _counters(sentiment: Any) -> List[float]:
+    """One article's contribution to each counter"""
+    counters = [1, 0, 0, 0, 0.0, 0]
+    if isinstance(sentiment, dict) and sentiment:
+        label = sentiment.get('sentiment', 'neutral')
+        if label in SENTIMENT_LABELS:
+            counters[1 + SENTIMENT_LABELS.index(label)] = 1
+        score = sentiment_score(sentiment)
+        if score is not None:
+            counters[4] = score
+            counters[5] = 1
+    return counters
+
+def add_deltas(deltas: Deltas, article: Mapping[str, Any], sign: int = 1):
+    """Accumulate an article's contribution, or with sign=-1 its removal, into per-row deltas"""
+    moment = article.get('publish_date') or article.get('collected_date')
+    if moment is None:
+        return
+    counters = _counters(article.get('sentiment'))
+    government = bool(article.get('is_government_related'))
+    dimensions = _dimensions(article)
+    for granularity in GRANULARITIES:
+        start = period_start(moment, granularity)
+        for dimension, value in dimensions:
+            delta = deltas.setdefault((granularity, dimension, start, government, value), [0] * len(COUNTERS))
+            for i, amount in enumerate(counters):
+                delta[i] += sign * amount
+
+def _chunks(items: List, size: int = CHUNK_SIZE) -> Iterable[List]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def apply_deltas(connection: Connection, deltas: Deltas):
+    """Add deltas onto the rollup rows, creating missing rows and dropping rows that fall to zero"""
+    table = ArticleRollup.__table__
+    rows = [
+        {**dict(zip(KEY_COLUMNS, key)), **dict(zip(COUNTERS, delta))}
+        for key, delta in deltas.items() if any(delta)
+    ]
+    dialect = connection.dialect.name
+    for chunk in _chunks(rows):
+        if dialect in ('sqlite', 'postgresql'):
+            insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+            stmt = insert(table).values(chunk)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(KEY_COLUMNS),
+                set_={column: table.c[column] + stmt.excluded[column] for column in COUNTERS}
+            )
+            connection.execute(stmt)
+        else:
+            for row in chunk:
+                key = [table.c[column] == row[column] for column in KEY_COLUMNS]
+                updated = connection.execute(
+                    table.update().where(*key).values({column: table.c[column] + row[column] for column in COUNTERS})
+                )
+                if not updated.rowcount:
+                    connection.execute(table.insert(), row)
+
+    emptied = [key for key, delta in deltas.items() if delta[0] < 0]
+    for chunk in _chunks(emptied):
+        connection.execute(
+            delete(table).where(tuple_(*(table.c[column] for column in KEY_COLUMNS)).in_(chunk), table.c.article_count <= 0)
+        )
+
+def load_previous(connection: Connection, urls: List[str]) -> List[Dict[str, Any]]:
+    """Stored versions of articles about to be overwritten, so their contribution can be subtracted"""
+    table = Article.__table__
+    columns = [table.c[column] for column in SOURCE_COLUMNS]
+    previous = []
+    for chunk in _chunks(urls):
+        previous.extend(dict(row._mapping) for row in connection.execute(select(*columns).where(table.c.url.in_(chunk))))
+    return previous
+
+def update_rollups(connection: Connection, previous: List[Mapping[str, Any]], current: List[Mapping[str, Any]]):
+    """Move the rollups from the previous versions of articles to their current versions"""
+    deltas: Deltas = {}
+    for article in previous:
+        add_deltas(deltas, article, -1)
+    for article in current:
+        add_deltas(deltas, article)
+    apply_deltas(connection, deltas)
+
+def rebuild(engine: Engine) -> int:
+    """Recompute all rollups from the articles table in one transaction; returns the articles counted"""
+    started = time.perf_counter()
+    table = Article.__table__
+    articles = 0
+    with engine.begin() as connection:
+        if connection.dialect.name == 'postgresql':
+            # Hold off article writes so none lands between the scan and the commit
+            connection.execute(text("LOCK TABLE articles IN SHARE MODE"))
+        connection.execute(delete(ArticleRollup.__table__))
+        deltas: Deltas = {}
+        rows = connection.execution_options(yield_per=5000).execute(select(*(table.c[c] for c in SOURCE_COLUMNS)))
+        for row in rows:
+            add_deltas(deltas, row._mapping)
+            articles += 1
+            # Deltas are additive, so flushing part-way bounds memory without changing the result
+            if len(deltas) >= REBUILD_FLUSH_ROWS:
+                apply_deltas(connection, deltas)
+                deltas = {}
+        apply_deltas(connection, deltas)
+    logger.info(f"Rebuilt rollups from {articles} articles in {time.perf_counter() - started:.1f}s")
+    return articles
+
+def backfill_if_empty(engine: Engine) -> Optional[int]:
+    """Rebuild once for databases whose articles predate the rollups"""
+    with engine.connect() as connection:
+        has_rollups = connection.execute(select(ArticleRollup.__table__.c.granularity).limit(1)).first()
+        has_articles = connection.execute(select(Article.__table__.c.id).limit(1)).first()
+    if has_rollups or not has_articles:
+        return None
+    logger.info("Article rollups are empty; backfilling from existing articles")
+    return rebuild(engine)
+
+def main():
+    from config.settings import get_settings
+    from database_models import DatabaseManager
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('command', choices=['rebuild'])
+    parser.add_argument('--database-url', help='Defaults to DATABASE_URL from settings')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    db_manager = DatabaseManager(args.database_url or get_settings().database_url)
+    db_manager.create_all_tables()
+    articles = rebuild(db_manager.engine)
+    print(f"Rebuilt rollups from {articles} articles")
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,16 @@
 import feedparser
-import requests
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict
 from urllib.parse import urljoin
 import re
 import time
 import logging
-from bs4 import BeautifulSoup
 
-from models import RSSSource, NewsArticle, ProcessingJob, JobStatus
+from models import RSSSource, NewsArticle
 from database import DatabaseManager
+from conditional_fetch import ValidatorStore
+from html_extractor import html_to_text, extract_article_text
+from http_client import get_sync_session
 import sys
 import os
 sys.path.append(os.path.dirname(__file__))
@@ -24,10 +25,11 @@ logger = logging.getLogger(__name__)
 class RSSCollector:
     def __init__(self, db_manager: DatabaseManager):
         self.db = db_manager
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.session = get_sync_session()
+        self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        }
+        self.validators = ValidatorStore()
     
     def initialize_rss_sources(self):
         """Initialize RSS sources from config if they don't exist"""
@@ -73,51 +75,60 @@ class RSSCollector:
     def fetch_source(self, source: RSSSource) -> List[NewsArticle]:
         """Fetch articles from a single RSS source"""
         try:
-            # Parse RSS feed
-            feed = feedparser.parse(source.url)
-            
-            if feed.bozo:
-                logger.warning(f"RSS feed {source.name} has parsing issues: {feed.bozo_exception}")
-            
-            new_articles = []
-            processed_count = 0
-            
-            for entry in feed.entries[:MAX_ARTICLES_PER_FETCH]:
-                try:
-                    # Check if article already exists
-                    if self.db.article_exists(entry.title, source.name):
-                        continue
-                    
-                    # Extract article content
-                    article = self._parse_feed_entry(entry, source)
-                    
-                    # Filter for government-related content
-                    if self._is_government_related(article):
-                        article_id = self.db.insert_news_article(article)
-                        article.id = article_id
-                        new_articles.append(article)
-                        
-                        # Create processing job for AI/ML analysis
-                        job = ProcessingJob(
-                            id=None,
-                            job_type="analyze_article",
-                            article_id=article_id,
-                            source_id=source.id
-                        )
-                        self.db.create_processing_job(job)
-                    
-                    processed_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error processing entry from {source.name}: {str(e)}")
-                    continue
-            
-            return new_articles
+            # Conditional GET: a 304 means the feed is unchanged since the last poll
+            response = self.session.get(
+                source.url, headers={**self.headers, **self.validators.request_headers(source.url)}, timeout=10
+            )
+            if response.status_code == 304:
+                self.validators.record_not_modified(source.url, source.name)
+                return []
+            response.raise_for_status()
+            self.validators.record_response(source.url, source.name, response.headers, len(response.content))
+
+            return self.ingest_feed(source, response.content)
             
         except Exception as e:
             logger.error(f"Error fetching RSS feed {source.name}: {str(e)}")
             return []
     
+    def ingest_feed(self, source: RSSSource, content: bytes) -> List[NewsArticle]:
+        """Parse a downloaded feed and store its new government-related articles"""
+        feed = feedparser.parse(content)
+        
+        if feed.bozo:
+            logger.warning(f"RSS feed {source.name} has parsing issues: {feed.bozo_exception}")
+        
+        return self.ingest_entries(source, feed.entries[:MAX_ARTICLES_PER_FETCH])
+    
+    def ingest_entries(self, source: RSSSource, entries) -> List[NewsArticle]:
+        """Store new government-related articles from parsed feed entries"""
+        candidates = []
+        for entry in entries:
+            try:
+                candidates.append(self._parse_feed_entry(entry, source))
+            except Exception as e:
+                logger.error(f"Error processing entry from {source.name}: {str(e)}")
+        
+        # One indexed lookup for the whole feed instead of a query per entry
+        existing = self.db.existing_titles(source.name, [article.title for article in candidates])
+        
+        new_articles = []
+        for article in candidates:
+            if article.title in existing:
+                continue
+            existing.add(article.title)
+            
+            # Filter for government-related content
+            if self._is_government_related(article):
+                new_articles.append(article)
+        
+        # Articles and their processing jobs for AI/ML analysis go in one transaction
+        article_ids = self.db.insert_articles_with_jobs(new_articles, "analyze_article", source.id)
+        for article, article_id in zip(new_articles, article_ids):
+            article.id = article_id
+        
+        return new_articles
+    
     def _should_fetch_source(self, source: RSSSource) -> bool:
         """Check if source should be fetched based on frequency"""
         if not source.last_fetched_at:
@@ -176,20 +187,7 @@ class RSSCollector:
         if not html_content:
             return ""
         
-        # Use BeautifulSoup to clean HTML
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(["script", "style"]):
-            script.decompose()
-        
-        # Get text and clean whitespace
-        text = soup.get_text()
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = ' '.join(chunk for chunk in chunks if chunk)
-        
-        return text
+        return html_to_text(html_content)
     
     def _is_government_related(self, article: NewsArticle) -> bool:
         """Check if article is related to government based on keywords"""
@@ -211,33 +209,19 @@ class RSSCollector:
     def get_full_article_content(self, url: str) -> Optional[str]:
         """Attempt to fetch full article content from URL"""
         try:
-            response = self.session.get(url, timeout=10)
+            response = self.session.get(url, headers=self.headers, timeout=10)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Common article content selectors
-            selectors = [
+            # Common article content selectors, tried in order
+            selectors = (
                 'article',
                 '.article-content',
                 '.post-content',
                 '.entry-content',
                 '.content',
                 'main'
-            ]
-            
-            for selector in selectors:
-                content_elem = soup.select_one(selector)
-                if content_elem:
-                    # Remove unwanted elements
-                    for unwanted in content_elem.find_all(['script', 'style', 'nav', 'header', 'footer', 'aside']):
-                        unwanted.decompose()
-                    
-                    text = content_elem.get_text()
-                    if len(text.strip()) > 200:  # Only return if substantial content
-                        return self._clean_html_content(str(content_elem))
-            
-            return None
+            )
+            return extract_article_text(response.text, selectors, min_length=200)
             
         except Exception as e:
             logger.warning(f"Could not fetch full content from {url}: {str(e)}")
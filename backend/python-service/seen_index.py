@@ -0,0 +1,146 @@
+"""
+Seen-item index for the real-time collector.
+Bloom filter in front of a persistent TTL store so unchanged feeds stop producing duplicate queue messages.
+"""
+
+import hashlib
+import logging
+import math
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from config.realtime_config import realtime_config
+from metrics import metrics
+from state_store import StateStore, get_state_store
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE = "seen_items"
+
+# Query parameters that identify a campaign, not an article
+TRACKING_PARAMS = {'fbclid', 'gclid', 'ref', 'cmp', 'ito'}
+
+def normalize_url(url: str) -> str:
+    """Canonical form of an article URL for duplicate detection"""
+    parts = urlsplit(url.strip())
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    ]
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((
+        parts.scheme.lower() or 'http',
+        parts.netloc.lower().removeprefix('www.'),
+        path,
+        urlencode(sorted(query)),
+        ''  # Fragments never identify a different article
+    ))
+
+def item_keys(article: Dict[str, Any]) -> List[str]:
+    """Index keys for an article: normalized URL and, for RSS items, the feed GUID"""
+    keys = []
+    if article.get('url'):
+        keys.append('url:' + normalize_url(article['url']))
+    guid = article.get('metadata', {}).get('guid')
+    if guid:
+        keys.append(f"guid:{article.get('source', '')}:{guid}")
+    return keys
+
+class BloomFilter:
+    """Fixed-size Bloom filter using double hashing over one SHA-1 digest"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.hash_count = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.sha1(key.encode('utf-8')).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:16], 'big') | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+class SeenIndex:
+    """Persistent, bounded index of collected items keyed on normalized URL and GUID"""
+
+    def __init__(self, store: Optional[StateStore] = None):
+        self.store = store or get_state_store()
+        self.ttl = realtime_config.seen_item_ttl
+        self.duplicates: Dict[str, int] = {}
+        self.bloom_false_positives = 0
+        self._rebuild()
+
+    def _rebuild(self):
+        """Rebuild the Bloom filter from live keys in the exact store"""
+        self.store.purge_expired()
+        keys = self.store.keys(NAMESPACE)
+        capacity = max(realtime_config.seen_bloom_capacity, len(keys) * 2)
+        self.bloom = BloomFilter(capacity, realtime_config.seen_bloom_error_rate)
+        for key in keys:
+            self.bloom.add(key)
+        logger.info(f"Seen-item index loaded with {len(keys)} keys")
+
+    def filter_new(self, articles: List[Dict[str, Any]], source: str) -> List[Dict[str, Any]]:
+        """Drop articles already seen, including repeats within the batch"""
+        # Bloom misses are definitely new; only hits need the exact store
+        to_check = {key for article in articles for key in item_keys(article) if key in self.bloom}
+        known = set(self.store.get_many(NAMESPACE, to_check)) if to_check else set()
+        self.bloom_false_positives += len(to_check - known)
+
+        new_articles = []
+        batch_keys = set()
+        for article in articles:
+            keys = item_keys(article)
+            if any(key in known or key in batch_keys for key in keys):
+                continue
+            batch_keys.update(keys)
+            new_articles.append(article)
+
+        suppressed = len(articles) - len(new_articles)
+        if suppressed:
+            self.duplicates[source] = self.duplicates.get(source, 0) + suppressed
+            metrics.increment('collector_duplicates_suppressed_total', suppressed, labels={'source': source})
+            logger.debug(f"{source}: suppressed {suppressed} already-seen items")
+        return new_articles
+
+    def entries_for(self, articles: List[Dict[str, Any]]) -> List[Tuple[str, str, Any, float]]:
+        """State store entries recording articles as seen, for committing with other state"""
+        return [(NAMESPACE, key, 1, self.ttl) for article in articles for key in item_keys(article)]
+
+    def remember(self, articles: List[Dict[str, Any]]):
+        """Add committed articles to the in-memory filter"""
+        for article in articles:
+            for key in item_keys(article):
+                self.bloom.add(key)
+
+        # Expired keys stay set in the filter, so rebuild before it saturates
+        if self.bloom.count > self.bloom.capacity:
+            self._rebuild()
+
+    def mark_seen(self, articles: List[Dict[str, Any]]):
+        """Record articles as seen once they have been queued"""
+        entries = self.entries_for(articles)
+        if not entries:
+            return
+        self.store.write_batch(entries)
+        self.remember(articles)
+
+    def get_report(self) -> Dict[str, Any]:
+        """Duplicates suppressed per source and Bloom filter load"""
+        return {
+            'duplicates_suppressed': dict(self.duplicates),
+            'bloom_entries': self.bloom.count,
+            'bloom_capacity': self.bloom.capacity,
+            'bloom_false_positives': self.bloom_false_positives
+        }
@@ -0,0 +1,149 @@
+"""
+Stream sharding and shard assignment for multi-process news processing.
+Routes articles to N Redis streams and distributes shards across worker processes using leases.
+"""
+
+import hashlib
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Dict, List, Set, Any
+
+from config.realtime_config import realtime_config
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+SHARD_KEYS = ('source', 'language', 'url')
+
+def _stable_hash(value: str) -> int:
+    """Process-independent hash (Python's hash() is salted per process)"""
+    return int.from_bytes(hashlib.md5(value.encode('utf-8')).digest()[:8], 'big')
+
+def shard_stream_key(shard: int) -> str:
+    """Get the Redis stream key for a shard"""
+    if realtime_config.stream_shards <= 1:
+        return realtime_config.redis_stream_key
+    return f"{realtime_config.redis_stream_key}:{shard}"
+
+def all_stream_keys() -> List[str]:
+    """Get stream keys for every shard"""
+    return [shard_stream_key(i) for i in range(max(realtime_config.stream_shards, 1))]
+
+def shard_for_article(article: Dict[str, Any]) -> int:
+    """Pick the shard for an article based on the configured shard key"""
+    num_shards = max(realtime_config.stream_shards, 1)
+    if num_shards == 1:
+        return 0
+
+    key = realtime_config.shard_key
+    if key not in SHARD_KEYS:
+        logger.warning(f"Unknown shard key '{key}', falling back to 'url'")
+        key = 'url'
+
+    value = article.get(key) or article.get('url') or article.get('title', '')
+    return _stable_hash(str(value)) % num_shards
+
+def stream_for_article(article: Dict[str, Any]) -> str:
+    """Get the stream key an article should be published to"""
+    return shard_stream_key(shard_for_article(article))
+
+def consumer_identity() -> str:
+    """Consumer name unique across hosts, processes and restarts"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+class ShardAssigner:
+    """Lease-based shard ownership with rendezvous hashing across live members"""
+
+    def __init__(self, redis_client, member_id: str):
+        self.redis = redis_client
+        self.member_id = member_id
+        self.members_key = f"{realtime_config.redis_stream_key}:members"
+        self.lease_prefix = f"{realtime_config.redis_stream_key}:lease:"
+        self.owned: Set[int] = set()
+        self.desired: Set[int] = set()
+
+    def _lease_key(self, shard: int) -> str:
+        return f"{self.lease_prefix}{shard}"
+
+    async def heartbeat(self) -> List[str]:
+        """Register this member and return all live members"""
+        now = time.time()
+        await self.redis.zadd(self.members_key, {self.member_id: now})
+        await self.redis.zremrangebyscore(self.members_key, 0, now - realtime_config.shard_lease_ttl)
+        members = await self.redis.zrangebyscore(self.members_key, now - realtime_config.shard_lease_ttl, '+inf')
+        return sorted(members) or [self.member_id]
+
+    def _preferred_shards(self, members: List[str]) -> Set[int]:
+        """Shards for which this member has the highest rendezvous score"""
+        preferred = set()
+        for shard in range(max(realtime_config.stream_shards, 1)):
+            winner = max(members, key=lambda m: _stable_hash(f"{m}:{shard}"))
+            if winner == self.member_id:
+                preferred.add(shard)
+        return preferred
+
+    async def _try_acquire(self, shard: int) -> bool:
+        acquired = await self.redis.set(
+            self._lease_key(shard),
+            self.member_id,
+            nx=True,
+            px=realtime_config.shard_lease_ttl * 1000
+        )
+        return bool(acquired)
+
+    async def _renew(self, shard: int) -> bool:
+        key = self._lease_key(shard)
+        if await self.redis.get(key) != self.member_id:
+            return False
+        await self.redis.pexpire(key, realtime_config.shard_lease_ttl * 1000)
+        return True
+
+    async def rebalance(self) -> Set[int]:
+        """Heartbeat, renew held leases and acquire newly preferred shards"""
+        members = await self.heartbeat()
+        self.desired = self._preferred_shards(members)
+
+        # Renew what we hold; a lost lease means another member took over
+        for shard in list(self.owned):
+            if not await self._renew(shard):
+                logger.warning(f"Lost lease on shard {shard}")
+                self.owned.discard(shard)
+                metrics.increment('shard_leases_lost_total')
+
+        # Shards held by a departed member become free once their lease expires
+        for shard in self.desired - self.owned:
+            if await self._try_acquire(shard):
+                self.owned.add(shard)
+                metrics.increment('shard_leases_acquired_total')
+                logger.info(f"Member {self.member_id} acquired shard {shard}")
+
+        metrics.set_gauge('shards_owned', len(self.owned), labels={'member': self.member_id})
+        metrics.set_gauge('shard_members', len(members))
+        return self.owned
+
+    async def release(self, shard: int):
+        """Release a shard lease after its worker has drained"""
+        key = self._lease_key(shard)
+        if await self.redis.get(key) == self.member_id:
+            await self.redis.delete(key)
+        self.owned.discard(shard)
+        logger.info(f"Member {self.member_id} released shard {shard}")
+
+    async def leave(self):
+        """Release all leases and deregister this member"""
+        for shard in list(self.owned):
+            await self.release(shard)
+        await self.redis.zrem(self.members_key, self.member_id)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get assignment state for this member"""
+        return {
+            'member_id': self.member_id,
+            'owned_shards': sorted(self.owned),
+            'desired_shards': sorted(self.desired),
+            'total_shards': realtime_config.stream_shards,
+            'shard_key': realtime_config.shard_key
+        }
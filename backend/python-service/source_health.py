@@ -0,0 +1,139 @@
+"""
+Per-source health tracking and circuit breaking for the real-time collector.
+Failing sources are backed off exponentially and probed one poll at a time, so they stop holding scraper slots.
+"""
+
+import logging
+import random
+import time
+from typing import Dict, Optional, Any
+
+from config.realtime_config import realtime_config
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Client errors that will not clear up by the next poll: the feed or page is gone or refused
+PERSISTENT_CLIENT_ERRORS = frozenset({401, 403, 404, 410, 451})
+
+def is_failure_status(status: int) -> bool:
+    """Whether an HTTP status counts against a source's health"""
+    return status >= 500 or status == 429 or status in PERSISTENT_CLIENT_ERRORS
+
+class SourceHealth:
+    """Request outcomes and breaker state of one source"""
+
+    def __init__(self):
+        self.state = CLOSED
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.success_rate = 1.0  # EWMA over requests
+        self.latency: Optional[float] = None  # EWMA of time to response headers
+        self.open_for = 0.0
+        self.retry_at = 0.0
+        self.trips = 0
+        self.probing = False
+        self.last_error: Optional[str] = None
+
+class HealthTracker:
+    """Tracks source health and decides which sources may be polled"""
+
+    def __init__(self):
+        self.sources: Dict[str, SourceHealth] = {}
+
+    def _health(self, source: str) -> SourceHealth:
+        if source not in self.sources:
+            self.sources[source] = SourceHealth()
+        return self.sources[source]
+
+    def allow(self, source: str) -> bool:
+        """Whether a poll may run now; an expired open breaker admits a single probe"""
+        health = self._health(source)
+        if health.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if health.state == OPEN and now >= health.retry_at:
+            health.state = HALF_OPEN
+            health.probing = False
+        # A probe that never reported back is replaced once another open period has passed
+        if health.state == HALF_OPEN and (not health.probing or now >= health.retry_at):
+            health.probing = True
+            health.retry_at = now + health.open_for
+            logger.info(f"Probing {source} after {health.open_for:.0f}s open")
+            return True
+        return False
+
+    def is_open(self, source: str) -> bool:
+        """Whether requests to the source are currently being refused"""
+        return self._health(source).state == OPEN
+
+    def retry_in(self, source: str) -> float:
+        """Seconds until an open source may be probed"""
+        return max(self._health(source).retry_at - time.monotonic(), 0.0)
+
+    def record(self, source: str, success: bool, latency: float, error: Optional[str] = None):
+        """Record one request outcome and move the breaker accordingly"""
+        health = self._health(source)
+        alpha = realtime_config.source_health_alpha
+        health.requests += 1
+        health.success_rate = alpha * (1.0 if success else 0.0) + (1 - alpha) * health.success_rate
+        health.latency = latency if health.latency is None else alpha * latency + (1 - alpha) * health.latency
+        metrics.observe('collector_source_latency_seconds', latency, labels={'source': source}, buckets=LATENCY_BUCKETS)
+
+        if success:
+            if health.state != CLOSED:
+                logger.info(f"{source} recovered; closing circuit")
+            health.state = CLOSED
+            health.consecutive_failures = 0
+            health.open_for = 0.0
+            health.probing = False
+        else:
+            health.failures += 1
+            health.consecutive_failures += 1
+            health.last_error = error
+            metrics.increment('collector_source_failures_total', labels={'source': source})
+            if health.state == HALF_OPEN or (
+                    health.state == CLOSED and health.consecutive_failures >= realtime_config.circuit_failure_threshold):
+                self._open(source, health)
+
+        metrics.set_gauge('collector_source_circuit_open', int(health.state != CLOSED), labels={'source': source})
+
+    def _open(self, source: str, health: SourceHealth):
+        # Double the open period on every failed probe, with jitter so sources do not probe in lockstep
+        if health.open_for:
+            health.open_for = min(health.open_for * 2, realtime_config.circuit_max_open_seconds)
+        else:
+            health.open_for = realtime_config.circuit_open_seconds
+        health.state = OPEN
+        health.probing = False
+        health.retry_at = time.monotonic() + health.open_for * random.uniform(1.0, 1.2)
+        health.trips += 1
+        metrics.increment('collector_circuit_trips_total', labels={'source': source})
+        logger.warning(
+            f"Circuit open for {source} after {health.consecutive_failures} consecutive failures; "
+            f"next probe in {health.open_for:.0f}s ({health.last_error})"
+        )
+
+    def get_report(self) -> Dict[str, Dict[str, Any]]:
+        """Breaker state, success rate and latency per source"""
+        return {
+            source: {
+                'state': health.state,
+                'success_rate': round(health.success_rate, 3),
+                'latency_ms': round(health.latency * 1000, 1) if health.latency is not None else None,
+                'requests': health.requests,
+                'failures': health.failures,
+                'consecutive_failures': health.consecutive_failures,
+                'trips': health.trips,
+                'retry_in': round(self.retry_in(source), 1) if health.state == OPEN else None,
+                'last_error': health.last_error
+            }
+            for source, health in self.sources.items()
+        }
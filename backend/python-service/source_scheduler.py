@@ -0,0 +1,170 @@
+"""
+Adaptive per-source polling scheduler for the real-time collector.
+Learns each source's publish rate from observed new items and keeps due times in a timer heap.
+"""
+
+import heapq
+import itertools
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Any, Iterable
+
+from config.realtime_config import realtime_config
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+DETECTION_BUCKETS = (5, 15, 30, 60, 120, 300, 600, 1800, 3600, 7200, 21600, 86400)
+
+class SourceState:
+    """Observed update behaviour of one source"""
+
+    def __init__(self, source: Dict[str, Any]):
+        self.source = source
+        self.interval = float(realtime_config.change_detection_interval)
+        self.rate = 0.0  # EWMA of new items per second
+        self.last_poll: Optional[float] = None
+        self.next_due = 0.0
+        self.fetches = 0
+        self.new_items = 0
+        self.detection_latency_total = 0.0
+        self.detection_latency_count = 0
+
+    @property
+    def min_interval(self) -> float:
+        return self.source.get('min_interval', realtime_config.scheduler_min_interval)
+
+    @property
+    def max_interval(self) -> float:
+        return self.source.get('max_interval', realtime_config.scheduler_max_interval)
+
+class SourceScheduler:
+    """Timer heap of source due times with intervals adapted to observed publish rates"""
+
+    def __init__(self, sources: Iterable[Dict[str, Any]]):
+        self.states: Dict[str, SourceState] = {}
+        self._heap: List[tuple] = []
+        self._counter = itertools.count()
+        now = time.monotonic()
+        for source in sources:
+            state = SourceState(source)
+            self.states[source['name']] = state
+            self._push(state, now)
+
+    def _push(self, state: SourceState, due: float):
+        state.next_due = due
+        heapq.heappush(self._heap, (due, next(self._counter), state.source['name']))
+
+    def pop_due(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Remove and return every source whose poll is due"""
+        now = time.monotonic() if now is None else now
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due_at, _, name = heapq.heappop(self._heap)
+            state = self.states.get(name)
+            # Skip stale heap entries left behind by a reschedule
+            if state is None or state.next_due != due_at:
+                continue
+            due.append(state.source)
+        return due
+
+    def seconds_until_next(self, now: Optional[float] = None) -> float:
+        """Time until the next source is due"""
+        now = time.monotonic() if now is None else now
+        if not self._heap:
+            return float(realtime_config.scheduler_max_interval)
+        return max(self._heap[0][0] - now, 0.0)
+
+    def record_poll(self, source_name: str, new_articles: List[Dict[str, Any]], slowdown: float = 1.0):
+        """Update the rate estimate from a poll result and schedule the next poll"""
+        state = self.states[source_name]
+        now = time.monotonic()
+        new_count = len(new_articles)
+
+        if state.last_poll is not None:
+            elapsed = max(now - state.last_poll, 1.0)
+            alpha = realtime_config.scheduler_rate_alpha
+            state.rate = alpha * (new_count / elapsed) + (1 - alpha) * state.rate
+        state.last_poll = now
+        state.fetches += 1
+        state.new_items += new_count
+
+        # Aim for about target_items_per_poll new items per fetch
+        if state.rate > 0:
+            interval = realtime_config.scheduler_target_items_per_poll / state.rate
+        else:
+            interval = state.interval * realtime_config.scheduler_idle_backoff
+        interval = min(max(interval, state.min_interval), state.max_interval)
+
+        # A change often precedes more changes (breaking news, Parliament sessions)
+        if new_count:
+            interval = max(min(interval, state.interval) * realtime_config.scheduler_change_boost, state.min_interval)
+        state.interval = interval
+
+        self._push(state, now + interval * slowdown)
+        self._record_detection_latency(state, new_articles)
+
+        metrics.increment('collector_fetches_total', labels={'source': source_name})
+        if new_count:
+            metrics.increment('collector_new_items_total', new_count, labels={'source': source_name})
+        metrics.set_gauge('collector_poll_interval_seconds', round(interval * slowdown, 1), labels={'source': source_name})
+
+    def defer(self, source_name: str, delay: float):
+        """Push a source's next poll back by at least delay seconds"""
+        state = self.states[source_name]
+        due = time.monotonic() + delay
+        if due > state.next_due:
+            self._push(state, due)
+
+    def export_state(self, source_name: str) -> Dict[str, float]:
+        """Learned interval and rate of a source, for checkpointing"""
+        state = self.states[source_name]
+        return {'interval': state.interval, 'rate': state.rate}
+
+    def restore(self, saved: Dict[str, Dict[str, float]]):
+        """Resume learned intervals and rates after a restart"""
+        for name, values in saved.items():
+            state = self.states.get(name)
+            if state is None or not values:
+                continue
+            state.interval = min(max(values.get('interval', state.interval), state.min_interval), state.max_interval)
+            state.rate = values.get('rate', 0.0)
+
+    def _record_detection_latency(self, state: SourceState, new_articles: List[Dict[str, Any]]):
+        """Latency between an item's publish time and our seeing it (RSS items only)"""
+        now = datetime.now(timezone.utc).timestamp()
+        for article in new_articles:
+            if article.get('metadata', {}).get('source_type') != 'rss':
+                continue
+            try:
+                # RSS publish dates are parsed from UTC struct_time into naive datetimes
+                published = datetime.fromisoformat(article['publish_date']).replace(tzinfo=timezone.utc).timestamp()
+            except (KeyError, TypeError, ValueError):
+                continue
+            latency = now - published
+            if latency < 0:
+                continue
+            state.detection_latency_total += latency
+            state.detection_latency_count += 1
+            metrics.observe(
+                'collector_detection_latency_seconds', latency,
+                labels={'source': state.source['name']}, buckets=DETECTION_BUCKETS
+            )
+
+    def get_report(self) -> Dict[str, Dict[str, Any]]:
+        """Per-source interval, learned rate, fetch efficiency and detection latency"""
+        now = time.monotonic()
+        report = {}
+        for name, state in self.states.items():
+            report[name] = {
+                'interval_seconds': round(state.interval, 1),
+                'next_poll_in': round(max(state.next_due - now, 0), 1),
+                'items_per_hour': round(state.rate * 3600, 2),
+                'fetches': state.fetches,
+                'new_items': state.new_items,
+                'fetches_per_new_article': round(state.fetches / state.new_items, 2) if state.new_items else None,
+                'avg_detection_latency_seconds': round(state.detection_latency_total / state.detection_latency_count, 1)
+                if state.detection_latency_count else None
+            }
+        return report
@@ -0,0 +1,155 @@
+"""
+Persistent key-value state for the collectors.
+SQLite-backed so collector state survives restarts even when Redis is disabled.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+
+from config.realtime_config import realtime_config
+
+logger = logging.getLogger(__name__)
+
+class StateStore:
+    """Namespaced JSON key-value store with optional per-key TTL"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(os.path.abspath(self.db_path))
+            os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS collector_state (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_collector_state_expires ON collector_state (expires_at)"
+            )
+        return self._conn
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        """Get a value, ignoring expired entries"""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value, expires_at FROM collector_state WHERE namespace = ? AND key = ?",
+                (namespace, key)
+            ).fetchone()
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            return default
+        return json.loads(row[0])
+
+    def get_many(self, namespace: str, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get several values from one namespace in a single query"""
+        keys = list(keys)
+        if not keys:
+            return {}
+        now = time.time()
+        result = {}
+        with self._lock:
+            conn = self._connection()
+            # Stay well under SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, value, expires_at FROM collector_state "
+                    f"WHERE namespace = ? AND key IN ({placeholders})",
+                    (namespace, *chunk)
+                ).fetchall()
+                for key, value, expires_at in rows:
+                    if expires_at is None or expires_at >= now:
+                        result[key] = json.loads(value)
+        return result
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None):
+        """Set a value, optionally expiring after ttl seconds"""
+        self.set_many(namespace, [(key, value)], ttl)
+
+    def set_many(self, namespace: str, items: Iterable[Tuple[str, Any]], ttl: Optional[float] = None):
+        """Set several values atomically in one transaction"""
+        self.write_batch((namespace, key, value, ttl) for key, value in items)
+
+    def write_batch(self, entries: Iterable[Tuple[str, str, Any, Optional[float]]]):
+        """Write (namespace, key, value, ttl) entries across namespaces in one transaction"""
+        now = time.time()
+        rows = [
+            (namespace, key, json.dumps(value, default=str), now + ttl if ttl else None, now)
+            for namespace, key, value, ttl in entries
+        ]
+        if not rows:
+            return
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO collector_state (namespace, key, value, expires_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def delete(self, namespace: str, key: str):
+        """Delete a value"""
+        with self._lock:
+            self._connection().execute(
+                "DELETE FROM collector_state WHERE namespace = ? AND key = ?",
+                (namespace, key)
+            )
+
+    def keys(self, namespace: str) -> List[str]:
+        """List live keys in a namespace"""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT key FROM collector_state WHERE namespace = ? AND (expires_at IS NULL OR expires_at >= ?)",
+                (namespace, time.time())
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def purge_expired(self) -> int:
+        """Delete expired entries across all namespaces"""
+        with self._lock:
+            cursor = self._connection().execute(
+                "DELETE FROM collector_state WHERE expires_at IS NOT NULL AND expires_at < ?",
+                (time.time(),)
+            )
+        if cursor.rowcount:
+            logger.debug(f"Purged {cursor.rowcount} expired state entries")
+        return cursor.rowcount
+
+    def close(self):
+        """Close the underlying connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+_state_store: Optional[StateStore] = None
+
+def get_state_store() -> StateStore:
+    """Get the process-wide state store"""
+    global _state_store
+    if _state_store is None:
+        _state_store = StateStore(realtime_config.state_db_path)
+    return _state_store
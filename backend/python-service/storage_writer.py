@@ -0,0 +1,275 @@
+"""
+Group-commit storage writer for processed real-time articles.
+Buffers processed articles and upserts them into the articles table in batched transactions.
+Failed batches are bisected so rows with bad data are dead-lettered instead of blocking the rest.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Awaitable, Callable, Tuple
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import InterfaceError, OperationalError, StatementError
+
+from config.realtime_config import realtime_config
+from config.settings import get_settings
+from database_models import DatabaseManager, Article
+from migrations import migrate
+from rollups import backfill_if_empty, load_previous, update_rollups
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Columns refreshed when a redelivered article hits an existing url
+UPSERT_COLUMNS = [
+    'title', 'content', 'source', 'language', 'category', 'region', 'publish_date',
+    'author', 'sentiment', 'entities', 'summary', 'keywords', 'topics',
+    'is_government_related', 'departments', 'confidence_score'
+]
+
+def _parse_datetime(value) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+def _is_transient(error: Exception) -> bool:
+    """Connection and locking failures are retried; errors from the statement or its data are not"""
+    return isinstance(error, (OperationalError, InterfaceError)) or not isinstance(error, StatementError)
+
+def article_to_row(article: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a processed article dict onto articles table columns"""
+    url = article['url']
+    return {
+        'id': article.get('id') or hashlib.md5(url.encode('utf-8')).hexdigest(),
+        'title': article.get('title', ''),
+        'content': article.get('content') or '',
+        'source': article.get('source', 'Unknown'),
+        'language': article.get('language', 'en'),
+        'category': article.get('category'),
+        'region': article.get('region'),
+        'publish_date': _parse_datetime(article.get('publish_date')),
+        'collected_date': _parse_datetime(article.get('collected_date')) or datetime.now(),
+        'url': url,
+        'author': article.get('author'),
+        'sentiment': article.get('sentiment'),
+        'entities': article.get('entities'),
+        'summary': article.get('summary'),
+        'keywords': article.get('keywords'),
+        'topics': article.get('topics'),
+        'is_government_related': bool(article.get('is_government_related', False)),
+        'departments': article.get('departments'),
+        'confidence_score': article.get('ai_confidence_score') or 0.0
+    }
+
+class ArticleWriter:
+    """Buffers processed articles and flushes them in one transaction per batch"""
+
+    def __init__(self, on_committed: Callable[[List[Tuple[Dict[str, Any], Any]]], Awaitable[None]],
+                 database_url: Optional[str] = None,
+                 on_dead_letter: Optional[Callable[[List[Tuple[Dict[str, Any], Any, str]]], Awaitable[None]]] = None):
+        self.on_committed = on_committed
+        self.on_dead_letter = on_dead_letter
+        self.database_url = database_url or get_settings().database_url
+        self.db_manager: Optional[DatabaseManager] = None
+        self.buffer: List[Tuple[Dict[str, Any], Any]] = []
+        self.oldest_buffered_at: Optional[float] = None
+        self.flush_lock = asyncio.Lock()
+        self.flush_task: Optional[asyncio.Task] = None
+        self.running = False
+        # After a transient failure the unwritten rows go back into the buffer and flushes wait until retry_at
+        self.retry_backoff = 0.0
+        self.retry_at = 0.0
+
+    def _connect(self):
+        """Create the engine lazily so importing the module stays cheap"""
+        if self.db_manager is not None:
+            return
+        # SQLite connections get WAL + NORMAL sync from DatabaseManager: one fsync per checkpoint, not per commit
+        self.db_manager = DatabaseManager(self.database_url)
+        self.db_manager.create_all_tables()
+        migrate(self.db_manager.engine)
+        backfill_if_empty(self.db_manager.engine)
+
+    def start(self):
+        """Start the background time-based flush loop"""
+        self._connect()
+        self.running = True
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        """Stop the flush loop and write out whatever is buffered"""
+        self.running = False
+        if self.flush_task:
+            self.flush_task.cancel()
+            await asyncio.gather(self.flush_task, return_exceptions=True)
+        await self.flush(force=True)
+
+    async def submit(self, article: Dict[str, Any], ack_token: Any = None):
+        """Buffer a processed article; it is handed to on_committed only after its batch commits"""
+        if not article.get('url'):
+            logger.warning(f"Dropping article without url: {article.get('title', 'Unknown')}")
+            await self.on_committed([(article, ack_token)])
+            return
+
+        # Backpressure: hold the caller while the buffer is full, e.g. during a retry backoff
+        while len(self.buffer) >= realtime_config.storage_max_buffered:
+            await self.flush()
+            if len(self.buffer) >= realtime_config.storage_max_buffered:
+                metrics.increment('storage_backpressure_waits_total')
+                await asyncio.sleep(max(self.retry_at - time.monotonic(), realtime_config.storage_flush_interval / 4))
+
+        self.buffer.append((article, ack_token))
+        if self.oldest_buffered_at is None:
+            self.oldest_buffered_at = time.monotonic()
+        metrics.set_gauge('storage_buffered_rows', len(self.buffer))
+
+        if len(self.buffer) >= realtime_config.storage_batch_size:
+            await self.flush()
+
+    async def _flush_loop(self):
+        interval = realtime_config.storage_flush_interval
+        while self.running:
+            await asyncio.sleep(interval / 4)
+            if self.oldest_buffered_at is not None and time.monotonic() - self.oldest_buffered_at >= interval:
+                await self.flush()
+
+    async def flush(self, force: bool = False):
+        """Write the current buffer in a single transaction, then acknowledge it"""
+        async with self.flush_lock:
+            if not self.buffer:
+                return
+            if not force and time.monotonic() < self.retry_at:
+                return
+
+            batch, self.buffer = self.buffer, []
+            oldest_buffered_at, self.oldest_buffered_at = self.oldest_buffered_at, None
+            metrics.set_gauge('storage_buffered_rows', 0)
+
+            # Last write wins for duplicate urls inside one batch
+            rows_by_url = {}
+            items_by_url: Dict[str, List[Tuple[Dict[str, Any], Any]]] = {}
+            dead_letters = []
+            for article, ack_token in batch:
+                try:
+                    row = article_to_row(article)
+                except Exception as e:
+                    dead_letters.append((article, ack_token, f"Unmappable article: {e}"))
+                    continue
+                rows_by_url[row['url']] = row
+                items_by_url.setdefault(row['url'], []).append((article, ack_token))
+            rows = list(rows_by_url.values())
+
+            self._connect()
+            started = time.perf_counter()
+            loop = asyncio.get_event_loop()
+            written, rejected, unwritten, error = await loop.run_in_executor(None, self._write_isolating, rows)
+            elapsed = time.perf_counter() - started
+
+            for row, reason in rejected:
+                dead_letters += [(article, ack_token, reason) for article, ack_token in items_by_url[row['url']]]
+            if dead_letters:
+                await self._dead_letter(dead_letters)
+
+            if error is not None:
+                # The stream will not redeliver to this consumer, so keep the unwritten rows and retry them with backoff
+                self.buffer = [item for row in unwritten for item in items_by_url[row['url']]] + self.buffer
+                self.oldest_buffered_at = oldest_buffered_at
+                metrics.set_gauge('storage_buffered_rows', len(self.buffer))
+                self.retry_backoff = min(max(self.retry_backoff * 2, realtime_config.storage_retry_backoff),
+                                         realtime_config.storage_retry_max_backoff)
+                self.retry_at = time.monotonic() + self.retry_backoff
+                logger.error(f"Failed to commit {len(unwritten)} articles, retrying in {self.retry_backoff:.1f}s: {error}")
+                metrics.increment('storage_flush_failures_total')
+            else:
+                self.retry_backoff = 0.0
+                self.retry_at = 0.0
+
+            if written:
+                metrics.observe('storage_flush_size', len(written), buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000))
+                metrics.observe('storage_commit_seconds', elapsed)
+                metrics.increment('storage_rows_written_total', len(written))
+                metrics.set_gauge('storage_rows_per_second', round(len(written) / elapsed, 1) if elapsed > 0 else 0)
+                logger.debug(f"Committed {len(written)} articles in {elapsed * 1000:.1f} ms")
+                await self.on_committed([item for row in written for item in items_by_url[row['url']]])
+
+    async def _dead_letter(self, items: List[Tuple[Dict[str, Any], Any, str]]):
+        """Hand articles that can never be stored to on_dead_letter so they stop blocking the buffer"""
+        metrics.increment('storage_dead_lettered_total', len(items))
+        for article, _, reason in items:
+            logger.error(f"Dead-lettering article {article.get('url') or article.get('title', 'Unknown')}: {reason}")
+        if self.on_dead_letter:
+            try:
+                await self.on_dead_letter(items)
+            except Exception as e:
+                logger.error(f"Error dead-lettering {len(items)} articles: {e}")
+
+    def _write_isolating(self, rows: List[Dict[str, Any]]):
+        """Write rows, bisecting batches that hit a data error down to the offending rows (runs in a worker thread)
+
+        Returns (written rows, rejected (row, reason) pairs, unwritten rows, transient error); a transient
+        error stops the write and leaves the remaining rows unwritten.
+        """
+        written, rejected = [], []
+        pending = [rows] if rows else []
+        while pending:
+            chunk = pending.pop()
+            try:
+                self._write_rows(chunk)
+            except Exception as e:
+                if _is_transient(e):
+                    return written, rejected, [row for part in pending + [chunk] for row in part], e
+                if len(chunk) == 1:
+                    rejected.append((chunk[0], str(e).splitlines()[0]))
+                else:
+                    middle = len(chunk) // 2
+                    pending += [chunk[middle:], chunk[:middle]]
+                continue
+            written.extend(chunk)
+        return written, rejected, [], None
+
+    def _write_rows(self, rows: List[Dict[str, Any]]):
+        """Upsert rows on url and update the rollups in one transaction (runs in a worker thread)"""
+        engine = self.db_manager.engine
+        dialect = engine.dialect.name
+
+        with engine.begin() as connection:
+            # Overwritten articles are moved out of their old rollup buckets, not counted twice
+            previous = load_previous(connection, [row['url'] for row in rows])
+            if dialect in ('sqlite', 'postgresql'):
+                insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+                stmt = insert(Article.__table__).values(rows)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=['url'],
+                    set_={column: stmt.excluded[column] for column in UPSERT_COLUMNS}
+                )
+                connection.execute(stmt)
+            else:
+                # Generic fallback: update existing urls, insert the rest
+                table = Article.__table__
+                urls = [row['url'] for row in rows]
+                existing = {
+                    r.url for r in connection.execute(table.select().with_only_columns(table.c.url).where(table.c.url.in_(urls)))
+                }
+                for row in rows:
+                    if row['url'] in existing:
+                        connection.execute(
+                            table.update().where(table.c.url == row['url']).values({c: row[c] for c in UPSERT_COLUMNS})
+                        )
+                new_rows = [row for row in rows if row['url'] not in existing]
+                if new_rows:
+                    connection.execute(table.insert(), new_rows)
+            # collected_date is not in UPSERT_COLUMNS: overwritten rows keep their stored one, and so must the rollups
+            collected = {article['url']: article['collected_date'] for article in previous}
+            stored_rows = [
+                {**row, 'collected_date': collected[row['url']]} if row['url'] in collected else row for row in rows
+            ]
+            update_rollups(connection, previous, stored_rows)
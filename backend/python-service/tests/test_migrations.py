@@ -0,0 +1,49 @@
+"""
+Hot query plans against a freshly migrated SQLite schema.
+"""
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from database_models import Base
+from migrations import check_query_plans, migrate
+
+# news_articles is owned by the sqlite news database (database.py), not the SQLAlchemy models
+NEWS_ARTICLES = """
+CREATE TABLE news_articles (
+    id INTEGER PRIMARY KEY, title TEXT, content TEXT, source TEXT, source_url TEXT, language TEXT,
+    translated_content TEXT, author TEXT, publish_date TEXT, region TEXT, category TEXT,
+    sentiment_score REAL, sentiment_label TEXT, emotions TEXT, keywords TEXT, summary TEXT,
+    entities TEXT, is_government_related BOOLEAN, created_at TEXT, updated_at TEXT
+)
+"""
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'articles.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text(NEWS_ARTICLES))
+    migrate(engine)
+    yield engine
+    engine.dispose()
+
+def test_migrated_schema_indexes_every_hot_query(engine):
+    assert check_query_plans(engine) == {}
+
+def test_migrate_is_idempotent(engine):
+    assert migrate(engine) == []
+    assert check_query_plans(engine) == {}
+
+@pytest.mark.parametrize('index, query', [
+    ('ix_articles_source_title', 'article_by_source_title'),
+    ('idx_news_articles_publish_created', 'recent_news_articles'),
+])
+def test_missing_index_is_reported(engine, index, query):
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP INDEX {index}"))
+
+    problems = check_query_plans(engine)
+
+    assert list(problems) == [query]
+    assert problems[query]
@@ -0,0 +1,103 @@
+"""
+Rollup counters for articles enriched by the realtime NLP processor.
+"""
+
+import sys
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, select
+
+from database_models import ArticleRollup, Base
+from rollups import update_rollups
+
+PUBLISHED = datetime(2026, 10, 19, 10, 30)
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'articles.db'}")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+def _article(sentiment):
+    return {
+        'url': 'https://pib.gov.in/1', 'publish_date': PUBLISHED, 'collected_date': PUBLISHED,
+        'is_government_related': True, 'source': 'PIB', 'language': 'en', 'region': 'National',
+        'sentiment': sentiment, 'keywords': ['scheme'], 'departments': []
+    }
+
+def _total_row(engine):
+    table = ArticleRollup.__table__
+    with engine.connect() as conn:
+        return conn.execute(
+            select(table).where(table.c.granularity == 'hour', table.c.dimension == 'total')
+        ).one()._mapping
+
+def _roll_up(engine, sentiment):
+    with engine.begin() as conn:
+        update_rollups(conn, [], [_article(sentiment)])
+    return _total_row(engine)
+
+@pytest.fixture
+def nlp_processor(monkeypatch):
+    transformers = pytest.importorskip('transformers')
+    pytest.importorskip('torch')
+
+    # The module builds its processor on import; serve a raw classifier result instead of downloading models
+    def pipeline(task, **kwargs):
+        return lambda text: [[
+            {'label': 'LABEL_2', 'score': 0.7}, {'label': 'LABEL_1', 'score': 0.2}, {'label': 'LABEL_0', 'score': 0.1}
+        ]]
+
+    class OfflineTokenizer:
+        @staticmethod
+        def from_pretrained(*args, **kwargs):
+            raise OSError("offline")
+
+    monkeypatch.setattr(transformers, 'pipeline', pipeline)
+    monkeypatch.setattr(transformers, 'AutoTokenizer', OfflineTokenizer)
+    monkeypatch.delitem(sys.modules, 'advanced_nlp', raising=False)
+    import advanced_nlp
+    yield advanced_nlp.nlp_processor
+    sys.modules.pop('advanced_nlp', None)
+
+def test_realtime_nlp_result_counts_towards_score(engine, nlp_processor):
+    from advanced_nlp import SHEDDABLE_STAGES
+
+    article = _article(None)
+    article['content'] = "The ministry welcomed the new scheme for farmers across every district."
+    processed = nlp_processor._process_single_article(article, skip_stages=SHEDDABLE_STAGES)
+    assert processed['sentiment']['sentiment'] == 'positive'
+    assert 'score' not in processed['sentiment']
+
+    with engine.begin() as conn:
+        update_rollups(conn, [], [processed])
+    row = _total_row(engine)
+
+    assert row['positive_count'] == 1
+    assert row['sentiment_score_count'] == 1
+    assert row['sentiment_score_sum'] == pytest.approx(0.6)
+
+def test_label_and_class_scores_count_towards_score(engine):
+    # Shape of AdvancedNLPProcessor._analyze_sentiment output: label, confidence and per-label scores
+    sentiment = {'sentiment': 'negative', 'confidence': 0.8,
+                 'scores': {'negative': 0.8, 'neutral': 0.15, 'positive': 0.05}}
+
+    row = _roll_up(engine, sentiment)
+
+    assert row['article_count'] == 1
+    assert row['negative_count'] == 1
+    assert row['sentiment_score_count'] == 1
+    assert row['sentiment_score_sum'] == pytest.approx(-0.75)
+
+def test_explicit_score_takes_precedence(engine):
+    row = _roll_up(engine, {'sentiment': 'positive', 'score': 0.4, 'scores': {'positive': 0.9, 'negative': 0.1}})
+
+    assert row['sentiment_score_sum'] == pytest.approx(0.4)
+
+def test_label_only_sentiment_has_no_score(engine):
+    row = _roll_up(engine, {'sentiment': 'neutral'})
+
+    assert row['neutral_count'] == 1
+    assert row['sentiment_score_count'] == 0
@@ -0,0 +1,49 @@
+"""
+Circuit breaking on the HTTP statuses the real-time collector records per source.
+"""
+
+import time
+
+import pytest
+
+@pytest.fixture
+def collector(tmp_path, monkeypatch):
+    import state_store
+    monkeypatch.setattr(state_store, '_state_store', state_store.StateStore(str(tmp_path / 'state.db')))
+
+    from realtime_collector import RealTimeCollector
+    return RealTimeCollector(None)
+
+@pytest.mark.parametrize('status', [403, 404, 410, 429, 500, 503])
+def test_failing_status_opens_circuit(collector, status):
+    from config.realtime_config import realtime_config
+    source = {'name': f"Source {status}"}
+
+    for _ in range(realtime_config.circuit_failure_threshold):
+        assert not collector.health.is_open(source['name'])
+        collector._record_health(source, status, time.monotonic())
+
+    assert collector.health.is_open(source['name'])
+    assert collector.health.get_report()[source['name']]['last_error'] == f"HTTP {status}"
+
+@pytest.mark.parametrize('status', [200, 304, 400])
+def test_other_statuses_keep_circuit_closed(collector, status):
+    from config.realtime_config import realtime_config
+    source = {'name': f"Source {status}"}
+
+    for _ in range(realtime_config.circuit_failure_threshold * 2):
+        collector._record_health(source, status, time.monotonic())
+
+    assert not collector.health.is_open(source['name'])
+    assert collector.health.get_report()[source['name']]['failures'] == 0
+
+def test_success_resets_consecutive_client_errors(collector):
+    from config.realtime_config import realtime_config
+    source = {'name': 'Moved feed'}
+
+    for _ in range(realtime_config.circuit_failure_threshold - 1):
+        collector._record_health(source, 404, time.monotonic())
+    collector._record_health(source, 200, time.monotonic())
+    collector._record_health(source, 404, time.monotonic())
+
+    assert not collector.health.is_open(source['name'])
@@ -0,0 +1,113 @@
+"""
+Lightweight per-article tracing through the real-time pipeline.
+Each article carries a trace ID and stage timestamps from collection to WebSocket broadcast.
+"""
+
+import heapq
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+
+from metrics import metrics
+
+# Canonical stage order; latencies are measured between consecutive recorded stages
+STAGES = ('collected', 'enqueued', 'dequeued', 'nlp_started', 'nlp_completed', 'stored', 'broadcast')
+
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+def start_trace(article: Dict[str, Any]) -> Dict[str, Any]:
+    """Attach a trace to an article if it does not have one yet"""
+    trace = article.get('trace')
+    if trace:
+        return trace
+
+    collected_at = time.time()
+    collected_date = article.get('collected_date')
+    if collected_date:
+        try:
+            collected_at = datetime.fromisoformat(str(collected_date)).timestamp()
+        except ValueError:
+            pass
+
+    trace = {
+        'trace_id': uuid.uuid4().hex,
+        'stages': {'collected': collected_at}
+    }
+    article['trace'] = trace
+    return trace
+
+def mark_stage(article: Dict[str, Any], stage: str, timestamp: Optional[float] = None):
+    """Record a stage timestamp and export the latency since the previous stage"""
+    trace = article.get('trace')
+    if not trace:
+        return
+
+    now = timestamp if timestamp is not None else time.time()
+    stages = trace['stages']
+
+    previous = None
+    for name in STAGES:
+        if name == stage:
+            break
+        if name in stages:
+            previous = name
+
+    stages[stage] = now
+    if previous is not None:
+        metrics.observe(
+            'pipeline_stage_seconds',
+            max(now - stages[previous], 0),
+            labels={'stage': f"{previous}->{stage}"},
+            buckets=LATENCY_BUCKETS
+        )
+
+def finish_trace(article: Dict[str, Any]):
+    """Export end-to-end latency and offer the trace to the slow-trace store"""
+    trace = article.get('trace')
+    if not trace or not trace['stages']:
+        return
+
+    stages = trace['stages']
+    total = max(stages.values()) - min(stages.values())
+    metrics.observe('pipeline_end_to_end_seconds', total, buckets=LATENCY_BUCKETS)
+    trace_store.record(trace, total, article)
+
+class SlowTraceStore:
+    """Retains the slowest recent traces for inspection"""
+
+    def __init__(self, capacity: int = 50, window: int = 1000):
+        self.capacity = capacity
+        self.recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, trace: Dict[str, Any], total: float, article: Dict[str, Any]):
+        entry = {
+            'trace_id': trace['trace_id'],
+            'total_seconds': round(total, 3),
+            'title': article.get('title'),
+            'source': article.get('source'),
+            'stages': dict(trace['stages'])
+        }
+        with self._lock:
+            self.recent.append(entry)
+
+    def get_slowest(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Slowest traces among the most recent window, with per-stage deltas"""
+        with self._lock:
+            entries = heapq.nlargest(limit or self.capacity, self.recent, key=lambda e: e['total_seconds'])
+
+        result = []
+        for entry in entries:
+            ordered = [(name, entry['stages'][name]) for name in STAGES if name in entry['stages']]
+            deltas = {
+                f"{a}->{b}": round(tb - ta, 3)
+                for (a, ta), (b, tb) in zip(ordered, ordered[1:])
+            }
+            result.append({**entry, 'stage_seconds': deltas})
+        return result
+
+# Global store
+trace_store = SlowTraceStore()